@@ -1,16 +1,23 @@
 """
 Module containing the `Board` class.
 """
+from gog.components.contact import ContactMap
+from gog.components.events import EventBus, PiecePlaced
 from gog.components.piece import Flag, Piece, challenge_icon
 from gog.config import constants as con
 
 
 class Board:
     """
-    Class representing the game board.
+    Class representing the game board. Every change of a square is reported to the listeners of
+    the board (see `add_listener`), the first of which is its `ContactMap`. Placements, moves and
+    their outcomes are reported to the subscribers of its `events` (see `gog.components.events`).
     """
     def __init__(self) -> None:
         self.list_repr: list[list[Piece | None]] = []
+        self.contacts = ContactMap()
+        self.events = EventBus()
+        self.__listeners: list = [self.contacts]
         self.__cache: list[tuple[int, int]] = []
         self.__challenge_cache: Piece | None = None
         self.__opp_flag: Flag = None
@@ -22,6 +29,26 @@ class Board:
             for _ in range(con.BOARD_WID):
                 curr_row.append(None)
 
+    def add_listener(self, listener) -> None:
+        """
+        Register `listener`, whose method `on_square(x, y, old, new)` is called after each change
+        of the `Piece` object on a square from `old` to `new` (either may be `None`). The
+        temporary challenge icon (see `challenge`) isn't reported.
+        """
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        """
+        Unregister `listener` (see `add_listener`).
+        """
+        self.__listeners.remove(listener)
+
+    def __set(self, x: int, y: int, piece: Piece | None) -> None:
+        old = self.list_repr[y][x]
+        self.list_repr[y][x] = piece
+        for listener in self.__listeners:
+            listener.on_square(x, y, old, piece)
+
     def print_board(self) -> None:
         """
         Print the game board to `stdout`.
@@ -62,6 +89,24 @@ class Board:
         Place a `Piece` object at position (`x`, `y`). Returns a status code indicating the current
         game status. Also manages the bulk of game elimination logic.
         """
+        code = self.__put(piece, x, y)
+        if self.events.active:
+            self.events.emit(PiecePlaced(piece, x, y))
+        return code
+
+    def move(self, x: int, y: int, to_x: int, to_y: int) -> int:
+        """
+        Move the `Piece` object at position (`x`, `y`) to (`to_x`, `to_y`), challenging any piece
+        there (see `place`). Returns a status code indicating the current game status.
+        """
+        piece, target = self.list_repr[y][x], self.list_repr[to_y][to_x]
+        self.__set(x, y, None)
+        code = self.__put(piece, to_x, to_y)
+        if self.events.active:
+            self.events.emit_move(piece, target, x, y, to_x, to_y, code)
+        return code
+
+    def __put(self, piece: Piece, x: int, y: int) -> int:
         code = con.MOVE_MADE
         src = piece
         dest = self.get_at(x, y)
@@ -80,7 +125,7 @@ class Board:
             if isinstance(self.__last_killed, Flag):
                 code *= -1
 
-        self.list_repr[y][x] = src
+        self.__set(x, y, src)
         self.__cache.append((x, y))
         piece.set_pos(x, y)
 
@@ -96,7 +141,7 @@ class Board:
         """
         Clear position (`x`, `y`) on the board.
         """
-        self.list_repr[y][x] = None
+        self.__set(x, y, None)
 
     def get_last_killed(self) -> Piece | None:
         """
@@ -111,6 +156,12 @@ class Board:
         """
         return self.__opp_flag
 
+    def get_history(self) -> list[tuple[int, int]]:
+        """
+        Returns the positions at which `Piece` objects have been placed, from oldest to newest.
+        """
+        return list(self.__cache)
+
     def undo_place(self) -> Piece | None:
         """
         Remove the last `Piece` object placed on the board and return it. If there's nothing to
@@ -123,6 +174,20 @@ class Board:
         self.clear(x, y)
         return piece
 
+    def undo_move(self, x: int, y: int, piece: Piece, target: Piece | None) -> None:
+        """
+        Revert the last move, made by `piece` from position (`x`, `y`) onto `target` (`None` if
+        the destination was empty), restoring both pieces as they were. Used by searches to unmake
+        the moves they make; the most recently killed piece isn't restored.
+        """
+        dest_x, dest_y = self.__cache.pop()
+        self.__set(dest_x, dest_y, target)
+        self.__set(x, y, piece)
+        piece.set_pos(x, y)
+        piece.active = True
+        if target is not None:
+            target.active = True
+
     def challenge(self, restore=False) -> None:
         """
         Set a challenge icon at the position where the last elimination occurred. After the
@@ -140,42 +205,24 @@ class Board:
             self.__challenge_cache = loc
             self.list_repr[y][x] = challenge_icon()
 
-    def __get_adjacent(self, piece: Piece) -> dict[str, Piece | None]:
-        x, y = piece.get_pos()
-        return {
-            "right": self.get_at(x + 1, y),
-            "left": self.get_at(x - 1, y),
-            "up": self.get_at(x, y + 1),
-            "down": self.get_at(x, y - 1)
-        }
-
     def is_surrounded(self, piece: Piece) -> bool:
         """
         Returns whether an opponent piece is surrounded by other opponent pieces (or walls, which
         have `self.opp = True` by default).
         """
-        adjacent = list(self.__get_adjacent(piece).values())
-        return all(adj_piece is not None and adj_piece.opp for adj_piece in adjacent)
+        return self.contacts.is_enclosed(*piece.get_pos())
 
     def can_be_challenged(self, piece: Piece) -> list[str]:
         """
         Indicates whether a piece can be challenged by an adjacent opposing piece.
         """
-        adjacent = self.__get_adjacent(piece)
-        return [
-            move for move in list(adjacent)
-            if (p_adj := adjacent.get(move)) is not None and not p_adj.opp
-        ]
+        return self.contacts.challenge_moves(*piece.get_pos())
 
     def get_valid_moves(self, piece: Piece) -> list[str]:
         """
         Returns a list of valid moves `piece` may make.
         """
-        adjacent = self.__get_adjacent(piece)
-        return [
-            move for move in list(adjacent)
-            if adjacent.get(move) is None or not adjacent.get(move).opp
-        ]
+        return self.contacts.free_moves(*piece.get_pos())
 
     def set_opp_flag(self, flag: Flag) -> None:
         """
@@ -0,0 +1,150 @@
+"""
+Module containing the compact binary encoding of boards and games.
+
+Every square is encoded as a single byte: `0` if empty, otherwise the rank of the piece plus one,
+with `OPP_BIT` set for opposing pieces.
+"""
+import struct
+from gog.components.board import Board
+from gog.components.game import Game
+from gog.components.opponent import DEFAULT_BIASES
+from gog.components.piece import Flag, Piece, PIECES
+from gog.components.rng import SeedSequence
+from gog.config import constants as con
+
+
+OPP_BIT = 0x20
+RANK_MASK = 0x1f
+DEAD = 0xff
+N_SQUARES = con.BOARD_LEN * con.BOARD_WID
+GAME_VERSION = 4
+# Magic, version, started, final state, winner, turn, setup and opponent generator states, no. of
+# opponent pieces, no. of history entries
+GAME_HEADER = struct.Struct("<2sBBbbIQQBB")
+# Root entropy of the seed, length of its spawn key (followed by the spawn key, see `SPAWN_INDEX`)
+SEED_HEADER = struct.Struct("<16sB")
+SPAWN_INDEX = struct.Struct("<I")
+# Whether the game has biases, then their values (in the order of `DEFAULT_BIASES`)
+BIASES = struct.Struct(f"<B{len(DEFAULT_BIASES)}d")
+PIECE_NAMES = list(PIECES)
+
+
+def encode_square(piece: Piece | None) -> int:
+    """
+    Returns the byte encoding `piece` (see module docstring).
+    """
+    if piece is None:
+        return 0
+    return (piece.rank + 1) | (OPP_BIT if piece.opp else 0)
+
+
+def decode_square(code: int) -> Piece | None:
+    """
+    Returns a new `Piece` object encoded by the byte `code`, or `None` if the square is empty.
+    """
+    if not code:
+        return None
+    piece = PIECES.get(PIECE_NAMES[(code & RANK_MASK) - 1]).generate_piece()
+    if code & OPP_BIT:
+        piece.set_opp()
+    return piece
+
+
+def encode_board(board: Board) -> bytes:
+    """
+    Returns the encoding of all squares of `board`, indexed by `y * BOARD_WID + x`.
+    """
+    return bytes(encode_square(piece) for row in board.list_repr for piece in row)
+
+
+def serialize_game(game: Game) -> bytes:
+    """
+    Returns the compact binary form of `game`: its header (including the states of its random
+    number generators, so a resumed game draws the same numbers), seed, opponent biases, board,
+    remaining pieces, opponent pieces (in order, as their square or `DEAD` and their rank) and,
+    during setup, the placement history needed for undoing. The seed's entropy must fit in 128
+    bits, as `SeedSequence` draws it.
+    """
+    opp_pieces = bytearray()
+    for piece in game.opp_pieces:
+        x, y = piece.get_pos()
+        on_board = piece.active and game.board.get_at(x, y) is piece
+        opp_pieces += bytes((y * con.BOARD_WID + x if on_board else DEAD, piece.rank))
+
+    history = b"" if game.started else bytes(
+        y * con.BOARD_WID + x for x, y in game.board.get_history()
+    )
+    header = GAME_HEADER.pack(
+        b"GG", GAME_VERSION, game.started, game.final_state, game.winner, game.turn,
+        game.setup_rng.getstate(), game.opp_rng.getstate(), len(game.opp_pieces), len(history)
+    )
+    seed = SEED_HEADER.pack(game.seed.entropy.to_bytes(16, "little"), len(game.seed.spawn_key)) \
+        + b"".join(SPAWN_INDEX.pack(index) for index in game.seed.spawn_key)
+    biases = BIASES.pack(False, *DEFAULT_BIASES.values()) if game.biases is None \
+        else BIASES.pack(True, *(DEFAULT_BIASES | game.biases).values())
+    return b"".join((
+        header, seed, biases, encode_board(game.board), bytes(game.remaining_pieces.values()),
+        bytes(opp_pieces), history
+    ))
+
+
+def deserialize_game(data: bytes) -> Game:
+    """
+    Rebuild a `Game` object from its binary form (see `serialize_game`).
+    """
+    (magic, version, started, final_state, winner, turn, setup_state, opp_state, n_opp,
+     n_history) = GAME_HEADER.unpack_from(data)
+    if magic != b"GG" or version != GAME_VERSION:
+        raise ValueError("Not a serialized game.")
+
+    offset = GAME_HEADER.size
+    entropy, n_spawn = SEED_HEADER.unpack_from(data, offset)
+    offset += SEED_HEADER.size
+    spawn_key = tuple(
+        SPAWN_INDEX.unpack_from(data, offset + i * SPAWN_INDEX.size)[0] for i in range(n_spawn)
+    )
+    offset += n_spawn * SPAWN_INDEX.size
+    has_biases, *bias_values = BIASES.unpack_from(data, offset)
+    offset += BIASES.size
+    # The biases which are integers by default multiply lists of moves, so they are turned back
+    # into integers (unless they were given as fractions)
+    biases = {
+        name: int(value) if isinstance(default, int) and value.is_integer() else value
+        for (name, default), value in zip(DEFAULT_BIASES.items(), bias_values)
+    }
+
+    game = Game(SeedSequence(int.from_bytes(entropy, "little"), spawn_key),
+                biases if has_biases else None)
+    game.started, game.final_state, game.winner, game.turn = \
+        bool(started), final_state, winner, turn
+    game.setup_rng.setstate(setup_state)
+    game.opp_rng.setstate(opp_state)
+
+    squares = data[offset:offset + N_SQUARES]
+    offset += N_SQUARES
+    game.remaining_pieces = dict(zip(con.PIECE_COUNTS, data[offset:offset + len(PIECE_NAMES)]))
+    offset += len(PIECE_NAMES)
+    opp_entries = data[offset:offset + 2 * n_opp]
+    offset += 2 * n_opp
+    history = data[offset:offset + n_history]
+
+    pieces: dict[int, Piece] = {}
+    for idx, code in enumerate(squares):
+        if code and code & OPP_BIT == 0:
+            pieces[idx] = decode_square(code)
+
+    for i in range(n_opp):
+        idx, rank = opp_entries[2 * i], opp_entries[2 * i + 1]
+        piece = decode_square((rank + 1) | OPP_BIT)
+        if idx == DEAD:
+            piece.active = False
+        else:
+            pieces[idx] = piece
+        if isinstance(piece, Flag):
+            game.board.set_opp_flag(piece)
+        game.opp_pieces.append(piece)
+
+    # Place pieces in the order of the placement history last, so undoing still works
+    for idx in [idx for idx in pieces if idx not in history] + list(history):
+        game.board.place(pieces[idx], idx % con.BOARD_WID, idx // con.BOARD_WID)
+    return game
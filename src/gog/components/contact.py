@@ -0,0 +1,127 @@
+"""
+Module containing the `ContactMap` class, which tracks which pieces are in contact with enemy
+pieces.
+
+For each side and square, the map holds a 4-bit mask of the directions (`right`, `left`, `up`,
+`down`, as in `DIRECTION_BITS`) in which a piece of that side is adjacent. The masks are updated
+on every change of a square (see `Board.add_listener`), so every query is a table lookup.
+"""
+from gog.config import constants as con
+
+
+USER = 0
+OPP = 1
+DIRECTION_BITS: dict[str, int] = {"right": 1, "left": 2, "up": 4, "down": 8}
+ALL_DIRECTIONS = 0b1111
+N_SQUARES = con.BOARD_LEN * con.BOARD_WID
+OFFSETS: dict[str, tuple[int, int]] = {
+    "right": (1, 0), "left": (-1, 0), "up": (0, 1), "down": (0, -1)
+}
+OPPOSITE: dict[str, str] = {"right": "left", "left": "right", "up": "down", "down": "up"}
+
+# Moves (in the order of `DIRECTION_BITS`) of each mask
+MASK_MOVES: list[tuple[str, ...]] = [
+    tuple(move for move, bit in DIRECTION_BITS.items() if mask & bit)
+    for mask in range(ALL_DIRECTIONS + 1)
+]
+
+
+def neighbours_of(square: int) -> tuple[list[tuple[int, int]], int]:
+    """
+    Returns the neighbours of `square`, each with the bit of the direction of `square` as seen
+    from the neighbour, and the mask of the directions from `square` leading off the board.
+    """
+    y, x = divmod(square, con.BOARD_WID)
+    neighbours, wall_mask = [], 0
+    for move, (dx, dy) in OFFSETS.items():
+        if 0 <= x + dx < con.BOARD_WID and 0 <= y + dy < con.BOARD_LEN:
+            neighbours.append(((y + dy) * con.BOARD_WID + x + dx, DIRECTION_BITS[OPPOSITE[move]]))
+        else:
+            wall_mask |= DIRECTION_BITS[move]
+    return neighbours, wall_mask
+
+
+NEIGHBOURS, WALL_MASKS = zip(*(neighbours_of(square) for square in range(N_SQUARES)))
+
+
+class ContactMap:
+    """
+    Class representing the contact map of a board. Squares are indexed by `y * BOARD_WID + x`.
+    """
+    def __init__(self) -> None:
+        # Side -> square -> mask of the directions in which a piece of the side is adjacent
+        self.adjacent: list[list[int]] = [[0] * N_SQUARES, [0] * N_SQUARES]
+        # Square -> side of the piece on it (`None` if empty)
+        self.sides: list[int | None] = [None] * N_SQUARES
+        # Side -> squares of the pieces of the side in contact with an enemy piece
+        self.touching: list[set[int]] = [set(), set()]
+
+    def on_square(self, x: int, y: int, old, new) -> None:
+        """
+        Update the map after the `Piece` object on (`x`, `y`) changed from `old` to `new` (either
+        may be `None`).
+        """
+        if old is new:
+            return
+        square = y * con.BOARD_WID + x
+        adjacent, touching = self.adjacent, self.touching
+        neighbours = NEIGHBOURS[square]
+        # Only enemy pieces of the removed or added piece may come in or out of contact
+        if old is not None:
+            side = OPP if old.opp else USER
+            masks, enemy_masks = adjacent[side], adjacent[1 - side]
+            for neighbour, bit in neighbours:
+                masks[neighbour] &= ~bit
+                if not masks[neighbour]:
+                    touching[1 - side].discard(neighbour)
+            touching[side].discard(square)
+        if new is not None:
+            side = OPP if new.opp else USER
+            masks, enemy_masks = adjacent[side], adjacent[1 - side]
+            sides = self.sides
+            for neighbour, bit in neighbours:
+                masks[neighbour] |= bit
+                if sides[neighbour] == 1 - side:
+                    touching[1 - side].add(neighbour)
+            if enemy_masks[square]:
+                touching[side].add(square)
+            sides[square] = side
+        else:
+            self.sides[square] = None
+
+    def challenge_moves(self, x: int, y: int) -> list[str]:
+        """
+        Returns the moves from (`x`, `y`) leading to a user piece (see `Board.can_be_challenged`).
+        """
+        return list(MASK_MOVES[self.adjacent[USER][y * con.BOARD_WID + x]])
+
+    def free_moves(self, x: int, y: int) -> list[str]:
+        """
+        Returns the moves from (`x`, `y`) leading to an empty square or a user piece (see
+        `Board.get_valid_moves`).
+        """
+        square = y * con.BOARD_WID + x
+        return list(MASK_MOVES[ALL_DIRECTIONS & ~(self.adjacent[OPP][square] | WALL_MASKS[square])])
+
+    def is_enclosed(self, x: int, y: int) -> bool:
+        """
+        Returns whether (`x`, `y`) is surrounded by opponent pieces or walls (see
+        `Board.is_surrounded`).
+        """
+        square = y * con.BOARD_WID + x
+        return self.adjacent[OPP][square] | WALL_MASKS[square] == ALL_DIRECTIONS
+
+    def in_contact(self, x: int, y: int) -> bool:
+        """
+        Returns whether the piece on (`x`, `y`) is adjacent to an enemy piece.
+        """
+        square = y * con.BOARD_WID + x
+        side = self.sides[square]
+        return side is not None and bool(self.adjacent[1 - side][square])
+
+    def touching_enemy(self, opp: bool) -> set[int]:
+        """
+        Returns the squares of the opponent (if `opp` is `True`) or user pieces adjacent to an
+        enemy piece. The set is owned by the map and must not be modified.
+        """
+        return self.touching[OPP if opp else USER]
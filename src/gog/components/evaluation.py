@@ -0,0 +1,227 @@
+"""
+Module containing the `Evaluator` class, which scores full-information positions.
+
+A position is scored from the user's point of view as the weighted sum of the differences between
+the user's and the opponent's values of each component of `COMPONENTS`:
+- `material`: the total value (in `PIECE_VALUES`) of the pieces on the board;
+- `mobility`: the number of moves the pieces can make (onto empty squares or enemy pieces);
+- `flag_safety`: the number of friendly minus enemy pieces next to the flag;
+- `flag_advancement`: the number of rows the flag has advanced;
+- `flag_race`: how close the flag is to the end of the board through empty squares (see
+  `gog.components.race`), or 0 if it can't get there without a challenge;
+- `contact`: the value of the enemy pieces the side would eliminate, over every pair of adjacent
+  enemy pieces.
+
+The running sums of every component are updated on every change of a square (see
+`Board.add_listener`), touching only the square and its neighbours, so scoring a position never
+rescans the board.
+"""
+from gog.components.board import Board
+from gog.components.contact import NEIGHBOURS, N_SQUARES, OPP, USER, WALL_MASKS
+from gog.components.piece import Flag, PIECES
+from gog.components.race import FlagRace, UNREACHABLE
+from gog.config import constants as con
+
+
+COMPONENTS = (
+    "material", "mobility", "flag_safety", "flag_advancement", "flag_race", "contact"
+)
+DEFAULT_WEIGHTS: dict[str, float] = {
+    "material": 1.0, "mobility": 0.05, "flag_safety": 0.5, "flag_advancement": 0.25,
+    "flag_race": 1.0, "contact": 0.2
+}
+# Rank -> value of a piece (the flag's is covered by the game being over once it's captured)
+PIECE_VALUES: list[float] = [0.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 11.0, 12.0,
+                             13.0, 7.5]
+# Mask -> number of set bits
+BIT_COUNTS: list[int] = [bin(mask).count("1") for mask in range(16)]
+
+
+def challenge_outcome(attacker_rank: int, target_rank: int) -> int:
+    """
+    Returns 1 if a piece of `attacker_rank` eliminates a piece of `target_rank` when challenging
+    it, -1 if it's eliminated and 0 if both are.
+    """
+    factories = list(PIECES.values())
+    attacker = factories[attacker_rank].generate_piece()
+    target = factories[target_rank].generate_piece()
+    winner = attacker.attack(target)
+    return 0 if winner is None else 1 if winner is attacker else -1
+
+
+# User rank -> opponent rank -> value (for the user) of the pair in contact
+CONTACT_VALUES: list[list[float]] = [
+    [
+        PIECE_VALUES[opp_rank] if outcome > 0 else -PIECE_VALUES[user_rank] if outcome < 0
+        else PIECE_VALUES[opp_rank] - PIECE_VALUES[user_rank]
+        for opp_rank in range(len(PIECES))
+        for outcome in (challenge_outcome(user_rank, opp_rank),)
+    ]
+    for user_rank in range(len(PIECES))
+]
+
+
+class Evaluator:
+    """
+    Class representing the evaluation of a board. Must be notified of changes after the board's
+    `ContactMap`, whose masks it reads (see `attach`).
+    """
+    def __init__(self, board: Board, weights: dict[str, float] = None) -> None:
+        self.board = board
+        self.race = FlagRace(board)
+        self.set_weights(weights or DEFAULT_WEIGHTS)
+        self.recompute()
+
+    @classmethod
+    def attach(cls, board: Board, weights: dict[str, float] = None) -> "Evaluator":
+        """
+        Returns the evaluation of `board`, registered (with its `FlagRace`) as a listener of
+        `board` to stay up to date.
+        """
+        evaluator = cls(board, weights)
+        board.add_listener(evaluator.race)
+        board.add_listener(evaluator)
+        return evaluator
+
+    def detach(self) -> None:
+        """
+        Unregister the evaluation and its `FlagRace` from the board (see `attach`).
+        """
+        self.board.remove_listener(self)
+        self.board.remove_listener(self.race)
+
+    def set_weights(self, weights: dict[str, float]) -> None:
+        """
+        Sets the weight of each component (a key of `COMPONENTS`), missing components weighing 0.
+        """
+        self.weights = tuple(weights.get(component, 0.0) for component in COMPONENTS)
+
+    def recompute(self) -> None:
+        """
+        Compute the running sums from scratch.
+        """
+        # Side -> total value of the pieces of the side
+        self.material = [0.0, 0.0]
+        # Side -> number of moves of the pieces of the side
+        self.mobility = [0, 0]
+        # Square -> number of moves of the piece on it
+        self.moves = [0] * N_SQUARES
+        self.contact = 0.0
+        self.flags: list[int | None] = [None, None]
+        for square in range(N_SQUARES):
+            piece = self.__piece(square)
+            if piece is None:
+                continue
+            side = OPP if piece.opp else USER
+            self.material[side] += PIECE_VALUES[piece.rank]
+            self.moves[square] = self.__count_moves(square, side)
+            self.mobility[side] += self.moves[square]
+            if isinstance(piece, Flag):
+                self.flags[side] = square
+            if side == USER:
+                self.contact += self.__contact_of(square, piece)
+
+    def __piece(self, square: int):
+        return self.board.list_repr[square // con.BOARD_WID][square % con.BOARD_WID]
+
+    def __count_moves(self, square: int, side: int) -> int:
+        return 4 - BIT_COUNTS[self.board.contacts.adjacent[side][square] | WALL_MASKS[square]]
+
+    def __contact_of(self, square: int, piece) -> float:
+        # Value of the pairs between `piece` and the adjacent enemy pieces
+        total = 0.0
+        for neighbour, _ in NEIGHBOURS[square]:
+            other = self.__piece(neighbour)
+            if other is None or other.opp == piece.opp:
+                continue
+            total += CONTACT_VALUES[other.rank][piece.rank] if piece.opp \
+                else CONTACT_VALUES[piece.rank][other.rank]
+        return total
+
+    def on_square(self, x: int, y: int, old, new) -> None:
+        """
+        Update the running sums after the `Piece` object on (`x`, `y`) changed from `old` to `new`
+        (either may be `None`).
+        """
+        if old is new:
+            return
+        square = y * con.BOARD_WID + x
+        moves, mobility, sides = self.moves, self.mobility, self.board.contacts.sides
+        if old is not None:
+            side = OPP if old.opp else USER
+            self.material[side] -= PIECE_VALUES[old.rank]
+            mobility[side] -= moves[square]
+            moves[square] = 0
+            if isinstance(old, Flag) and self.flags[side] == square:
+                self.flags[side] = None
+            self.contact -= self.__contact_of(square, old)
+        if new is not None:
+            side = OPP if new.opp else USER
+            self.material[side] += PIECE_VALUES[new.rank]
+            moves[square] = self.__count_moves(square, side)
+            mobility[side] += moves[square]
+            if isinstance(new, Flag):
+                self.flags[side] = square
+            self.contact += self.__contact_of(square, new)
+
+        # The neighbours gained or lost a friendly piece next to them
+        for neighbour, _ in NEIGHBOURS[square]:
+            side = sides[neighbour]
+            if side is not None:
+                count = self.__count_moves(neighbour, side)
+                mobility[side] += count - moves[neighbour]
+                moves[neighbour] = count
+
+    def __flag_terms(self, side: int) -> tuple[int, int, int]:
+        # Safety, advancement and race of the flag of `side`
+        square = self.flags[side]
+        if square is None:
+            return 0, 0, 0
+        adjacent = self.board.contacts.adjacent
+        safety = BIT_COUNTS[adjacent[side][square]] - BIT_COUNTS[adjacent[1 - side][square]]
+        row = square // con.BOARD_WID
+        advancement = con.BOARD_LEN - 1 - row if side == OPP else row
+        distance = self.race.flag_distance(side == OPP)
+        return safety, advancement, 0 if distance == UNREACHABLE else con.BOARD_LEN - distance
+
+    def components(self) -> tuple[float, ...]:
+        """
+        Returns the difference between the user's and the opponent's value of each component of
+        `COMPONENTS`.
+        """
+        user_flag, opp_flag = self.__flag_terms(USER), self.__flag_terms(OPP)
+        return (
+            self.material[USER] - self.material[OPP],
+            self.mobility[USER] - self.mobility[OPP],
+            user_flag[0] - opp_flag[0],
+            user_flag[1] - opp_flag[1],
+            user_flag[2] - opp_flag[2],
+            self.contact,
+        )
+
+    def evaluate(self, opp=False) -> float:
+        """
+        Returns the score of the position from the point of view of the opponent (if `opp` is
+        `True`) or the user.
+        """
+        score = sum(weight * value for weight, value in zip(self.weights, self.components()))
+        return -score if opp else score
+
+
+def evaluate_boards(boards: list[Board], weights: dict[str, float] = None,
+                    opp=False) -> "np.ndarray":
+    """
+    Returns the scores of the positions on `boards` from the point of view of the opponent (if
+    `opp` is `True`) or the user, computing the components of all positions at once with array
+    operations (see `gog.components.scoring`) rather than an `Evaluator` per board.
+    """
+    # Imported here as the game itself (which scores positions for hints) runs without `numpy`
+    import numpy as np
+    from gog.components.scoring import components, encode_boards
+
+    if not boards:
+        return np.zeros(0)
+    weights = weights or DEFAULT_WEIGHTS
+    scores = components(encode_boards(boards)) \
+        @ np.array([weights.get(component, 0.0) for component in COMPONENTS])
+    return -scores if opp else scores
@@ -0,0 +1,190 @@
+"""
+Module containing the game events and the `EventBus` class, which delivers them to subscribers
+(such as logging, telemetry, spectators or recording) without them hooking into the game logic.
+
+Every board has its own bus (`Board.events`), which reports:
+- `PiecePlaced`: a piece was placed on the board outside of a move (e.g. during setup);
+- `PieceMoved`: a piece moved, with the resulting game code (see `Board.place`);
+- `ChallengeResolved`: a move challenged an enemy piece, with the outcome (`con.OPP_ELIM`,
+  `con.USR_ELIM` or `con.SPLIT`, eliminating a flag ending the game);
+- `FlagReachedEnd`: a flag reached the far end of the board, with the game code
+  (`con.USR_END`/`con.OPP_END` if it can still be challenged, otherwise an automatic win);
+- `GameOver`: the game was won, by `con.USR_WINNER` or `con.OPP_WINNER`.
+Subscribers either receive events synchronously, as they happen, or through an `EventQueue` which
+never blocks the game. Events are only built if anyone subscribed (see `EventBus.active`), so the
+bus costs a single attribute check per move otherwise.
+"""
+from collections import deque
+from collections.abc import Callable
+from typing import NamedTuple
+from gog.components.piece import Piece
+from gog.config import constants as con
+
+
+# Events an `EventQueue` holds before dropping the oldest
+QUEUE_SIZE = 1024
+
+
+class PiecePlaced(NamedTuple):
+    """
+    Event of `piece` placed on (`x`, `y`).
+    """
+    piece: Piece
+    x: int
+    y: int
+
+
+class PieceMoved(NamedTuple):
+    """
+    Event of `piece` moved from (`x`, `y`) to (`to_x`, `to_y`), resulting in the game code
+    `result`.
+    """
+    piece: Piece
+    x: int
+    y: int
+    to_x: int
+    to_y: int
+    result: int
+
+
+class ChallengeResolved(NamedTuple):
+    """
+    Event of the piece `attacker` challenging the piece `defender` on (`x`, `y`), with the outcome
+    `result` (`con.OPP_ELIM`, `con.USR_ELIM` or `con.SPLIT`).
+    """
+    attacker: Piece
+    defender: Piece
+    x: int
+    y: int
+    result: int
+
+
+class FlagReachedEnd(NamedTuple):
+    """
+    Event of the flag `flag` reaching the far end of the board on (`x`, `y`), with the game code
+    `result`.
+    """
+    flag: Piece
+    x: int
+    y: int
+    result: int
+
+
+class GameOver(NamedTuple):
+    """
+    Event of the game won by `winner` (`con.USR_WINNER` or `con.OPP_WINNER`).
+    """
+    winner: int
+
+
+EVENT_TYPES = (PiecePlaced, PieceMoved, ChallengeResolved, FlagReachedEnd, GameOver)
+# Game codes of a challenge (eliminating a flag negates them)
+CHALLENGE_RESULTS = {con.OPP_ELIM, con.USR_ELIM, con.SPLIT}
+END_RESULTS = {con.USR_END, con.OPP_END, con.USR_AUTO_WIN, con.OPP_AUTO_WIN}
+
+
+class EventQueue:
+    """
+    Class representing a bounded queue of events, read from an `asyncio` event loop (the same one
+    the game runs on). When the reader falls `size` events behind, the oldest are dropped rather
+    than blocking the game.
+    """
+    def __init__(self, size=QUEUE_SIZE) -> None:
+        self.dropped = 0
+        self.closed = False
+        self.__events: deque = deque(maxlen=size)
+        # Imported here as it takes a while and the terminal game never reads events from a loop
+        import asyncio
+
+        self.__ready = asyncio.Event()
+
+    def __call__(self, event) -> None:
+        if len(self.__events) == self.__events.maxlen:
+            self.dropped += 1
+        self.__events.append(event)
+        self.__ready.set()
+
+    def __len__(self) -> int:
+        return len(self.__events)
+
+    def get_nowait(self):
+        """
+        Returns the oldest pending event, or `None` if there is none.
+        """
+        return self.__events.popleft() if self.__events else None
+
+    async def get(self):
+        """
+        Returns the oldest pending event once there is one, or `None` once the queue is closed and
+        empty.
+        """
+        while not self.__events:
+            if self.closed:
+                return None
+            self.__ready.clear()
+            await self.__ready.wait()
+        return self.__events.popleft()
+
+    def close(self) -> None:
+        """
+        Stop the reader once all pending events have been read.
+        """
+        self.closed = True
+        self.__ready.set()
+
+
+class EventBus:
+    """
+    Class representing the stream of events of a game.
+    """
+    def __init__(self) -> None:
+        # Whether anyone subscribed, checked before building any event
+        self.active = False
+        self.__subscribers: dict[type, list[Callable]] = {event: [] for event in EVENT_TYPES}
+
+    def subscribe(self, callback: Callable, event_types: tuple[type, ...] = EVENT_TYPES) -> None:
+        """
+        Call `callback` with every event of the types `event_types` (all by default) as it
+        happens.
+        """
+        for event_type in event_types:
+            self.__subscribers[event_type].append(callback)
+        self.active = True
+
+    def subscribe_queue(self, event_types: tuple[type, ...] = EVENT_TYPES,
+                        size=QUEUE_SIZE) -> EventQueue:
+        """
+        Returns a new `EventQueue` of `size` events receiving every event of the types
+        `event_types` (all by default).
+        """
+        queue = EventQueue(size)
+        self.subscribe(queue, event_types)
+        return queue
+
+    def unsubscribe(self, callback: Callable) -> None:
+        """
+        Stop calling `callback` (or filling the `EventQueue`), see `subscribe`.
+        """
+        for subscribers in self.__subscribers.values():
+            if callback in subscribers:
+                subscribers.remove(callback)
+        self.active = any(self.__subscribers.values())
+
+    def emit(self, event) -> None:
+        """
+        Deliver `event` to its subscribers.
+        """
+        for callback in self.__subscribers[type(event)]:
+            callback(event)
+
+    def emit_move(self, piece: Piece, target: Piece | None, x: int, y: int, to_x: int, to_y: int,
+                  result: int) -> None:
+        """
+        Deliver the events of `piece` moving from (`x`, `y`) to (`to_x`, `to_y`), where the piece
+        `target` (if any) was, resulting in the game code `result`.
+        """
+        self.emit(PieceMoved(piece, x, y, to_x, to_y, result))
+        if target is not None and abs(result) in CHALLENGE_RESULTS:
+            self.emit(ChallengeResolved(piece, target, to_x, to_y, abs(result)))
+        elif result in END_RESULTS:
+            self.emit(FlagReachedEnd(piece, to_x, to_y, result))
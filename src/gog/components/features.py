@@ -0,0 +1,111 @@
+"""
+Module containing the feature planes of positions, as used for training and inference of models,
+and the shards of self-play data they are stored in.
+
+A position is encoded from the point of view of the side to move as `N_PLANES` planes of
+`BOARD_LEN` x `BOARD_WID` bytes, flipped for the opponent so that the side to move always advances
+up the board:
+- planes 0 to 14: the pieces of the side to move, one plane per rank;
+- planes 15 to 29: the enemy pieces whose rank is known, one plane per rank;
+- `HIDDEN_PLANE`: the enemy pieces whose rank is hidden;
+- `SIDE_PLANE`: all ones if the opponent is to move.
+Moves are indexed as in `gog.components.search.move_index`, on the flipped board for the opponent.
+
+A shard is a directory holding the arrays of a batch of positions as `.npy` files (see
+`SHARD_ARRAYS`), which `open_shard` maps into memory with `numpy.memmap`.
+"""
+import os
+import numpy as np
+from gog.components.codec import OPP_BIT, RANK_MASK
+from gog.components.piece import PIECES
+from gog.components.search import MOVE_NAMES
+from gog.config import constants as con
+
+
+N_RANKS = len(PIECES)
+HIDDEN_PLANE = 2 * N_RANKS
+SIDE_PLANE = HIDDEN_PLANE + 1
+N_PLANES = SIDE_PLANE + 1
+N_SQUARES = con.BOARD_LEN * con.BOARD_WID
+# Direction -> direction on the flipped board
+FLIPPED_DIRECTIONS = np.array([
+    MOVE_NAMES.index({"up": "down", "down": "up"}.get(name, name)) for name in MOVE_NAMES
+])
+# Arrays of a shard: the feature planes, the squares (as in `gog.components.codec`, unflipped and
+# with every rank), the move played and the result for the side to move (1 for a win, -1 for a
+# loss and 0 if unfinished)
+SHARD_ARRAYS = ("planes", "squares", "moves", "results")
+
+
+def encode_planes(squares: np.ndarray, opp_to_move: np.ndarray,
+                  known: np.ndarray | None = None) -> np.ndarray:
+    """
+    Returns the feature planes (one set per position) of the positions `squares` with the opponent
+    to move where `opp_to_move` is `True`. Enemy ranks are hidden except where `known` (of the
+    same shape as `squares`) is `True`.
+    """
+    n = len(squares)
+    grid = squares.reshape(n, con.BOARD_LEN, con.BOARD_WID)
+    flip = opp_to_move[:, None, None]
+    grid = np.where(flip, grid[:, ::-1], grid)
+    known_grid = np.zeros(grid.shape, dtype=bool) if known is None \
+        else np.where(flip, known.reshape(grid.shape)[:, ::-1], known.reshape(grid.shape))
+
+    occupied = grid != 0
+    own = occupied & ((grid & OPP_BIT != 0) == flip)
+    enemy = occupied & ~own
+    ranks = (grid & RANK_MASK).astype(np.int16) - 1
+
+    planes = np.zeros((n, N_PLANES, con.BOARD_LEN, con.BOARD_WID), dtype=np.uint8)
+    index, rows, cols = np.nonzero(own)
+    planes[index, ranks[index, rows, cols], rows, cols] = 1
+    index, rows, cols = np.nonzero(enemy & known_grid)
+    planes[index, N_RANKS + ranks[index, rows, cols], rows, cols] = 1
+    planes[:, HIDDEN_PLANE] = enemy & ~known_grid
+    planes[:, SIDE_PLANE] = flip
+    return planes
+
+
+def canonical_moves(moves: np.ndarray, opp_to_move: np.ndarray) -> np.ndarray:
+    """
+    Returns the indices of `moves` on the board as seen by the side to move (flipped where
+    `opp_to_move` is `True`). The flip is its own inverse.
+    """
+    square, direction = np.divmod(moves, len(MOVE_NAMES))
+    row, col = np.divmod(square, con.BOARD_WID)
+    flipped = ((con.BOARD_LEN - 1 - row) * con.BOARD_WID + col) * len(MOVE_NAMES) \
+        + FLIPPED_DIRECTIONS[direction]
+    return np.where(opp_to_move, flipped, moves).astype(moves.dtype)
+
+
+def write_shard(path: str, arrays: dict[str, np.ndarray]) -> None:
+    """
+    Write the shard of `arrays` (keyed by the names of `SHARD_ARRAYS`) to the directory `path`. The
+    shard only appears once complete, so an interrupted write leaves no partial shard behind.
+    """
+    partial = f"{path}.partial"
+    os.makedirs(partial, exist_ok=True)
+    for name in SHARD_ARRAYS:
+        np.save(os.path.join(partial, f"{name}.npy"), arrays[name])
+    os.replace(partial, path)
+
+
+def open_shard(path: str) -> dict[str, np.memmap]:
+    """
+    Returns the arrays of the shard in the directory `path`, mapped into memory read-only.
+    """
+    return {
+        name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in SHARD_ARRAYS
+    }
+
+
+def list_shards(directory: str) -> list[str]:
+    """
+    Returns the paths of the complete shards in `directory`, in order.
+    """
+    if not os.path.isdir(directory):
+        return []
+    return [
+        os.path.join(directory, name) for name in sorted(os.listdir(directory))
+        if name.startswith("shard-") and not name.endswith(".partial")
+    ]
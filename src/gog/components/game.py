@@ -0,0 +1,193 @@
+"""
+Module containing the `Game` class, a headless game session used outside of the terminal
+interface (e.g. by the game server).
+"""
+from gog.components.board import Board
+from gog.components.events import GameOver
+from gog.components.operation import MOVES
+from gog.components.opponent import choose_move
+from gog.components.piece import Piece, PIECES
+from gog.components.rng import SeedSequence
+from gog.components.setups import place_randomly, place_setup
+from gog.config import constants as con
+
+
+def parse_coords(raw_inp: str) -> tuple[int, int] | tuple[None, None]:
+    """
+    Parses `raw_input` for valid coordinates. Returns tuple of 0-indexed coordinates if successful
+    and tuple of `None` values if not.
+    """
+    inp = raw_inp.lower()
+    if len(inp) != 2:
+        return None, None
+    x = ord(inp[0]) - con.ORD_OFFSET
+    if x < 0 or x > 8 or not inp[1].isnumeric():
+        return None, None
+    y = int(inp[1])
+
+    if y < 1 or y > 8:
+        return None, None
+    return x, y - 1
+
+
+def indices_to_coords(x: int, y: int) -> str:
+    """
+    Convert zero-based indices `x` and `y` for accessing the list representation of the board into
+    valid, command-formatted coordinates.
+    """
+    return f"{chr(x + con.CHR_OFFSET)}{y + 1}"
+
+
+class Game:
+    """
+    Class representing a single game between the user and the simulated opponent, without any
+    terminal input/output. All randomness (setups and opponent moves) derives from `seed`, so a
+    game can be replayed exactly from its seed and the user's commands. The opponent plays with
+    the `biases` of `gog.components.opponent.DEFAULT_BIASES` (overriding the defaults).
+    """
+    def __init__(self, seed: SeedSequence | None = None,
+                 biases: dict[str, float] | None = None) -> None:
+        self.seed = SeedSequence() if seed is None else seed
+        self.biases = biases
+        setup_seed, opp_seed = self.seed.spawn(2)
+        self.setup_rng = setup_seed.rng()
+        self.opp_rng = opp_seed.rng()
+        self.board = Board()
+        self.opp_pieces: list[Piece] = []
+        self.remaining_pieces = dict(con.PIECE_COUNTS)
+        self.final_state = 0
+        self.winner = 0
+        self.turn = 0
+        self.started = False
+
+    def empty_box(self) -> bool:
+        """
+        Return whether there are leftover pieces to be placed or not.
+        """
+        return all(n_pieces == 0 for n_pieces in self.remaining_pieces.values())
+
+    def place(self, piece_input: str, x: int | None, y: int | None) -> int:
+        """
+        Place a user piece named `piece_input` (full name or abbreviation) at position (`x`, `y`)
+        with the same checks as manual piece placement. Returns a status code.
+        """
+        piece_name = con.KEYWORD_MAPPER.get(piece_input.upper())
+        if piece_name is None:
+            return con.INVALID_PIECE
+        if not self.remaining_pieces.get(piece_name):
+            return con.NO_PIECES_LEFT
+        if (x is None and y is None) or y > 2:
+            return con.FORBIDDEN_POS
+        if self.board.get_at(x, y) is not None:
+            return con.OCCUPIED_CELL
+
+        self.remaining_pieces[piece_name] -= 1
+        self.board.place(PIECES.get(piece_name).generate_piece(), x, y)
+        return con.SUCCESS
+
+    def undo(self) -> Piece | None:
+        """
+        Remove the last placed user piece and return it, or `None` if there's nothing to undo.
+        """
+        removed_piece = self.board.undo_place()
+        if removed_piece is not None:
+            self.remaining_pieces[removed_piece.name()] += 1
+        return removed_piece
+
+    def randomise(self) -> None:
+        """
+        Sets all remaining user pieces at random.
+        """
+        place_randomly(self.board, self.remaining_pieces, False, self.setup_rng)
+
+    def start(self, constraints: tuple[str, ...] = (),
+              opp_setup: list[tuple[int, int]] | None = None) -> None:
+        """
+        Arrange the opponent pieces (subject to the setup `constraints`, see
+        `gog.components.setups`) and begin the game. All user pieces must have been placed. If
+        given, `opp_setup` (a list of ranks and setup squares) is used instead of a random setup.
+        """
+        if opp_setup is None:
+            self.opp_pieces = place_randomly(
+                self.board, dict(con.PIECE_COUNTS), True, self.setup_rng, constraints
+            )
+        else:
+            ranks, squares = zip(*opp_setup)
+            self.opp_pieces = place_setup(self.board, list(ranks), list(squares), True)
+        self.started = True
+
+    def move(self, x: int, y: int, operation: str) -> tuple[int, int]:
+        """
+        Move the user piece at position (`x`, `y`) with `operation` (a key of `MOVES`). Returns a
+        tuple of the move status and the resulting game code (see `Move.execute`).
+        """
+        selected = self.board.get_at(x, y)
+        if selected is not None and selected.opp:
+            return con.ENEMY_SELECTED, -1
+
+        status, result = MOVES.get(operation).generate_move().execute(self.board, x, y)
+        if status == con.SUCCESS:
+            self.turn += 1
+            self.resolve(result)
+        return status, result
+
+    def opponent_move(self) -> tuple[int, int, str, int]:
+        """
+        Let the opponent make its move. Returns the original position of the moved piece, the name
+        of the move and the resulting game code.
+        """
+        opp_choice, chosen_move = choose_move(
+            self.board, self.opp_pieces, self.opp_rng, self.biases
+        )
+        opp_x, opp_y = opp_choice.get_pos()
+        return opp_x, opp_y, chosen_move, self.apply_opponent_move(opp_x, opp_y, chosen_move)
+
+    def apply_opponent_move(self, x: int, y: int, operation: str) -> int:
+        """
+        Move the opponent piece at position (`x`, `y`) with `operation` (a key of `MOVES`) and
+        return the resulting game code.
+        """
+        result = MOVES.get(operation).generate_move().execute(self.board, x, y)[1]
+        self.turn += 1
+        self.resolve(result)
+        return result
+
+    def resolve(self, result: int) -> int:
+        """
+        Update the final state of the game with the `result` code of a move, following the same
+        rules as `gog.run.handle_turn`. Returns `con.USR_WINNER` or `con.OPP_WINNER` once the game
+        is over and `0` otherwise.
+        """
+        match result:
+            case con.USR_END | con.OPP_END:
+                self.final_state = result
+                return 0
+            case con.USR_AUTO_WIN:
+                self.final_state = con.USR_END
+            case con.OPP_AUTO_WIN:
+                self.final_state = con.OPP_END
+
+        if result < 0: # i.e. if result == con.USR_WINNER or result == con.OPP_WINNER
+            self.winner = result
+        elif self.final_state == con.USR_END:
+            self.winner = con.USR_WINNER
+        elif self.final_state == con.OPP_END:
+            self.winner = con.OPP_WINNER
+        if self.winner and self.board.events.active:
+            self.board.events.emit(GameOver(self.winner))
+        return self.winner
+
+    def forfeit(self) -> None:
+        """
+        End the game with the user forfeiting it to the opponent.
+        """
+        self.winner = con.OPP_WINNER
+        if self.board.events.active:
+            self.board.events.emit(GameOver(self.winner))
+
+    def reveal_opp_pieces(self) -> None:
+        """
+        Reveal all opponent pieces with `Piece.reveal()`.
+        """
+        for piece in self.opp_pieces:
+            piece.reveal()
@@ -0,0 +1,195 @@
+"""
+Module containing the `PolicyValueModel` class, a small neural network trained on self-play data
+(see `gog.tools.selfplay`) that predicts, for a position, the probability of every move and the
+expected result for the side to move.
+
+The model reads the feature planes of `gog.components.features` through one hidden layer of
+rectified units, feeding a policy head (a softmax over the legal moves, indexed as in
+`gog.components.search.move_index` on the board as seen by the side to move) and a value head (a
+`tanh`, from -1 for a loss to 1 for a win). It is written with `numpy` alone and evaluates a batch
+of a few hundred positions in a few milliseconds on one core, so the opponent and the search can
+consult it at little more cost than a random choice.
+"""
+from random import Random
+import numpy as np
+from gog.components.board import Board
+from gog.components.features import N_PLANES, N_RANKS, canonical_moves, encode_planes
+from gog.components.scoring import MOVE_DELTAS, N_MOVES, N_SQUARES, encode_boards, shift
+from gog.components.search import index_move
+
+
+N_INPUTS = N_PLANES * N_SQUARES
+HIDDEN = 128
+LEARNING_RATE = 1e-3
+# Weight of the value loss relative to the policy loss
+VALUE_WEIGHT = 1.0
+# Decay rates of the moment estimates of Adam
+BETA1, BETA2 = 0.9, 0.999
+EPSILON = 1e-8
+# Logit of illegal moves
+ILLEGAL_LOGIT = -1e9
+PARAMETERS = ("w_hidden", "b_hidden", "w_policy", "b_policy", "w_value", "b_value")
+
+
+def legal_mask(planes: np.ndarray) -> np.ndarray:
+    """
+    Returns whether each move (one row of `N_MOVES` per position) of the side to move is legal in
+    the positions of feature planes `planes`.
+    """
+    own = planes[:, :N_RANKS].any(axis=1)
+    mask = np.empty(own.shape + (len(MOVE_DELTAS),), dtype=bool)
+    for direction, (dy, dx) in enumerate(MOVE_DELTAS):
+        on_board = shift(np.ones_like(own), dy, dx, False)
+        mask[..., direction] = own & on_board & ~shift(own, dy, dx, False)
+    return mask.reshape(len(planes), N_MOVES)
+
+
+class PolicyValueModel:
+    """
+    Class representing a policy/value network with `hidden` hidden units, initialised from the
+    seed `seed`.
+    """
+    def __init__(self, hidden=HIDDEN, seed: int | None = None) -> None:
+        rng = np.random.default_rng(seed)
+        self.params = {
+            # He initialisation for the rectified hidden layer
+            "w_hidden": rng.normal(0.0, np.sqrt(2 / N_INPUTS), (N_INPUTS, hidden)),
+            "b_hidden": np.zeros(hidden),
+            "w_policy": rng.normal(0.0, np.sqrt(1 / hidden), (hidden, N_MOVES)),
+            "b_policy": np.zeros(N_MOVES),
+            "w_value": rng.normal(0.0, np.sqrt(1 / hidden), (hidden, 1)),
+            "b_value": np.zeros(1),
+        }
+        self.params = {name: value.astype(np.float32) for name, value in self.params.items()}
+        # Moment estimates of Adam and the number of training steps taken
+        self.__moments = {name: (np.zeros_like(value), np.zeros_like(value))
+                          for name, value in self.params.items()}
+        self.steps = 0
+
+    @classmethod
+    def load(cls, path: str) -> "PolicyValueModel":
+        """
+        Returns the model saved at `path` (see `save`), ready to resume training.
+        """
+        with np.load(path) as data:
+            model = cls(data["w_hidden"].shape[1])
+            model.params = {name: data[name].astype(np.float32) for name in PARAMETERS}
+            model.steps = int(data["steps"])
+            # Models saved without their moment estimates resume with empty ones
+            if all(f"first_{name}" in data for name in PARAMETERS):
+                model.__moments = {
+                    name: (data[f"first_{name}"].astype(np.float32),
+                           data[f"second_{name}"].astype(np.float32))
+                    for name in PARAMETERS
+                }
+        return model
+
+    def save(self, path: str) -> None:
+        """
+        Save the parameters of the model, along with the state of Adam (the moment estimates and
+        the number of steps taken), to `path` (a `.npz` file).
+        """
+        moments = {}
+        for name, (first, second) in self.__moments.items():
+            moments[f"first_{name}"], moments[f"second_{name}"] = first, second
+        np.savez(path, steps=self.steps, **self.params, **moments)
+
+    def __forward(self, planes: np.ndarray) -> tuple[np.ndarray, ...]:
+        params = self.params
+        inputs = planes.reshape(len(planes), N_INPUTS).astype(np.float32)
+        hidden = inputs @ params["w_hidden"]
+        hidden += params["b_hidden"]
+        np.maximum(hidden, 0, out=hidden)
+        logits = hidden @ params["w_policy"] + params["b_policy"]
+        logits[~legal_mask(planes)] = ILLEGAL_LOGIT
+        logits -= logits.max(axis=1, keepdims=True)
+        priors = np.exp(logits)
+        priors /= priors.sum(axis=1, keepdims=True)
+        values = np.tanh(hidden @ params["w_value"] + params["b_value"])[:, 0]
+        return inputs, hidden, priors, values
+
+    def predict(self, planes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the move probabilities (one row of `N_MOVES` per position, 0 for illegal moves, on
+        the board as seen by the side to move) and the values of the positions of feature planes
+        `planes`.
+        """
+        _, _, priors, values = self.__forward(planes)
+        return priors, values
+
+    def move_priors(self, board: Board, opp: bool) -> dict[tuple[int, int, str], float]:
+        """
+        Returns the probability of every legal move (a position and move name) of the opponent (if
+        `opp` is `True`) or the user on `board`, ranks hidden from that side.
+        """
+        priors, _ = self.predict(encode_planes(encode_boards([board]), np.array([opp])))
+        indices = np.flatnonzero(priors[0])
+        moves = canonical_moves(indices, np.full(len(indices), opp))
+        return {index_move(int(move)): float(priors[0, index])
+                for move, index in zip(moves, indices)}
+
+    def choose_move(self, board: Board, rng: Random, opp=True) -> tuple[int, int, str] | None:
+        """
+        Returns the position and move name of a move of the opponent (if `opp` is `True`) or the
+        user on `board` drawn from the priors of the model (drawing from the generator `rng`), or
+        `None` if there is no legal move.
+        """
+        priors = self.move_priors(board, opp)
+        if not priors:
+            return None
+        draw, total = rng.random() * sum(priors.values()), 0.0
+        for move, prior in priors.items():
+            total += prior
+            if draw < total:
+                return move
+        return move
+
+    def losses(self, planes: np.ndarray, moves: np.ndarray,
+               results: np.ndarray) -> tuple[float, float, float]:
+        """
+        Returns the policy loss (cross-entropy), value loss (mean squared error) and policy
+        accuracy of the model on the positions of feature planes `planes`, with the moves `moves`
+        played from them and their results `results` (see `gog.components.features`).
+        """
+        _, _, priors, values = self.__forward(planes)
+        rows = np.arange(len(planes))
+        policy_loss = -np.log(np.maximum(priors[rows, moves], 1e-12)).mean()
+        value_loss = np.square(values - results).mean()
+        accuracy = (priors.argmax(axis=1) == moves).mean()
+        return float(policy_loss), float(value_loss), float(accuracy)
+
+    def train_step(self, planes: np.ndarray, moves: np.ndarray, results: np.ndarray,
+                   learning_rate=LEARNING_RATE) -> tuple[float, float]:
+        """
+        Take one step of Adam on the batch of positions of feature planes `planes` (see `losses`).
+        Returns the policy and value losses of the batch before the step.
+        """
+        params, n = self.params, len(planes)
+        inputs, hidden, priors, values = self.__forward(planes)
+        rows = np.arange(n)
+        policy_loss = -np.log(np.maximum(priors[rows, moves], 1e-12)).mean()
+        value_loss = np.square(values - results).mean()
+
+        d_logits = priors
+        d_logits[rows, moves] -= 1
+        d_logits /= n
+        d_values = (2 * VALUE_WEIGHT / n * (values - results) * (1 - values ** 2))[:, None] \
+            .astype(np.float32)
+        d_hidden = d_logits @ params["w_policy"].T + d_values @ params["w_value"].T
+        d_hidden[hidden <= 0] = 0
+        grads = {
+            "w_hidden": inputs.T @ d_hidden, "b_hidden": d_hidden.sum(axis=0),
+            "w_policy": hidden.T @ d_logits, "b_policy": d_logits.sum(axis=0),
+            "w_value": hidden.T @ d_values, "b_value": d_values.sum(axis=0),
+        }
+
+        self.steps += 1
+        correction = np.sqrt(1 - BETA2 ** self.steps) / (1 - BETA1 ** self.steps)
+        for name, grad in grads.items():
+            first, second = self.__moments[name]
+            first *= BETA1
+            first += (1 - BETA1) * grad
+            second *= BETA2
+            second += (1 - BETA2) * grad ** 2
+            params[name] -= learning_rate * correction * first / (np.sqrt(second) + EPSILON)
+        return float(policy_loss), float(value_loss)
@@ -0,0 +1,84 @@
+"""
+Module containing the text notation of full-information positions.
+
+A position is written as its rows from the opponent's back row (row 8) down to the user's (row 1),
+separated by `/`, followed by the side to move (`u` for the user, `o` for the opponent). Within a
+row, each piece is a letter from `a` (flag) to `o` (spy) in order of rank, uppercase for user
+pieces and lowercase for opponent pieces, and runs of empty squares are digits. For example, the
+position with only both flags on their back rows and the user to move is `4a4/9/9/9/9/9/9/4A4 u`.
+"""
+from gog.components.board import Board
+from gog.components.piece import Flag, PIECES
+from gog.config import constants as con
+
+
+RANK_LETTERS = "abcdefghijklmno"
+FACTORIES = list(PIECES.values())
+# Character standing for an empty square in an expanded row (see `expand_row`)
+EMPTY = "."
+ROW_CHARS = set(RANK_LETTERS + RANK_LETTERS.upper())
+
+
+def to_notation(board: Board, opp_to_move=False) -> str:
+    """
+    Returns the notation of `board` with the opponent (if `opp_to_move` is `True`) or the user to
+    move.
+    """
+    rows = []
+    for y in range(con.BOARD_LEN - 1, -1, -1):
+        row, empty = "", 0
+        for piece in board.list_repr[y]:
+            if piece is None:
+                empty += 1
+                continue
+            if empty:
+                row, empty = row + str(empty), 0
+            letter = RANK_LETTERS[piece.rank]
+            row += letter if piece.opp else letter.upper()
+        rows.append(row + (str(empty) if empty else ""))
+    return f"{'/'.join(rows)} {'o' if opp_to_move else 'u'}"
+
+
+def expand_row(row: str) -> str | None:
+    """
+    Returns the row `row` of a position in notation with its runs of empty squares written out as
+    `EMPTY`, or `None` if the row is malformed (a character other than a piece letter or a digit,
+    or not `BOARD_WID` squares wide).
+    """
+    expanded = ""
+    for char in row:
+        if char in "0123456789":
+            expanded += EMPTY * int(char)
+        elif char in ROW_CHARS:
+            expanded += char
+        else:
+            return None
+    return expanded if len(expanded) == con.BOARD_WID else None
+
+
+def from_notation(notation: str) -> tuple[Board, bool]:
+    """
+    Returns a new board holding the position of `notation` and whether the opponent is to move.
+    Raises `ValueError` if `notation` is malformed.
+    """
+    fields = notation.split()
+    rows = fields[0].split("/") if fields else []
+    if len(fields) != 2 or fields[1] not in ("u", "o") or len(rows) != con.BOARD_LEN:
+        raise ValueError(f"Malformed position '{notation}'.")
+
+    expanded_rows = [expand_row(row) for row in rows]
+    if None in expanded_rows:
+        raise ValueError(f"Malformed position '{notation}'.")
+
+    board = Board()
+    for y, row in zip(range(con.BOARD_LEN - 1, -1, -1), expanded_rows):
+        for x, char in enumerate(row):
+            if char == EMPTY:
+                continue
+            piece = FACTORIES[RANK_LETTERS.index(char.lower())].generate_piece()
+            if char.islower():
+                piece.set_opp()
+                if isinstance(piece, Flag):
+                    board.set_opp_flag(piece)
+            board.place(piece, x, y)
+    return board, fields[1] == "o"
@@ -36,8 +36,7 @@ class MoveUp(Move):
         if block is not None and block.opp == my_piece.opp:
             return con.FRIENDLY_FIRE, -1
 
-        board.clear(x, y)
-        return con.SUCCESS, board.place(my_piece, x, y + 1)
+        return con.SUCCESS, board.move(x, y, x, y + 1)
 
 
 class MoveDown(Move):
@@ -56,8 +55,7 @@ class MoveDown(Move):
         if block is not None and block.opp == my_piece.opp:
             return con.FRIENDLY_FIRE, -1
 
-        board.clear(x, y)
-        return con.SUCCESS, board.place(my_piece, x, y - 1)
+        return con.SUCCESS, board.move(x, y, x, y - 1)
 
 
 class MoveRight(Move):
@@ -76,8 +74,7 @@ class MoveRight(Move):
         if block is not None and block.opp == my_piece.opp:
             return con.FRIENDLY_FIRE, -1
 
-        board.clear(x, y)
-        return con.SUCCESS, board.place(my_piece, x + 1, y)
+        return con.SUCCESS, board.move(x, y, x + 1, y)
 
 
 class MoveLeft(Move):
@@ -96,8 +93,7 @@ class MoveLeft(Move):
         if block is not None and block.opp == my_piece.opp:
             return con.FRIENDLY_FIRE, -1
 
-        board.clear(x, y)
-        return con.SUCCESS, board.place(my_piece, x - 1, y)
+        return con.SUCCESS, board.move(x, y, x - 1, y)
 
 
 class MoveFactory(ABC):
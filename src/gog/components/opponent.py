@@ -0,0 +1,86 @@
+"""
+Module containing the decision logic of the simulated opponent.
+"""
+from math import ceil
+from random import Random
+from gog.components.board import Board
+from gog.components.piece import Flag, Piece
+
+
+# Biases of the opponent's choices: the probability of its flag escaping a challenge, the share (1
+# in n) of its frontmost movable pieces favoured and the share of those of the highest ranks
+# favoured further, and the number of extra copies of favoured pieces, challenges and forward
+# moves among the choices
+DEFAULT_BIASES = {
+    "flag_escape": 0.8, "front_share": 5, "high_rank_share": 5, "favour_copies": 5,
+    "challenge_copies": 2, "forward_copies": 2
+}
+
+
+def choose_move(board: Board, opp_pieces: list[Piece], rng: Random,
+                biases: dict[str, float] = None) -> tuple[Piece, str]:
+    """
+    Chooses the next move of the opponent on `board` from its pieces `opp_pieces` (drawing from
+    the generator `rng`), with the `biases` of `DEFAULT_BIASES` (overriding the defaults).
+    Returns the chosen `Piece` object and the name of the move (a key of `MOVES`).
+    """
+    biases = DEFAULT_BIASES if biases is None else DEFAULT_BIASES | biases
+    challenger_pieces = [
+        challenger for challenger in opp_pieces
+        if challenger.active and board.can_be_challenged(challenger)
+    ]
+
+    opp_choice: Piece = None
+    valid_moves: list[str] = []
+    # If at least one opponent piece has an adjacent challengeable piece, randomly
+    # choose from those pieces to move
+    if challenger_pieces:
+        opp_choice = rng.choice(challenger_pieces)
+        # Append 'challengeable' moves to valid_moves array to make challenge more likely
+        normal_move = ((board.can_be_challenged(opp_choice) * biases["challenge_copies"])
+                       + board.get_valid_moves(opp_choice))
+
+        # If the chosen piece is a flag, escape from any challengeable piece 80% of the time (by
+        # default)
+        if isinstance(opp_choice, Flag):
+            random_bool = rng.random() < biases["flag_escape"]
+            escape_move = [
+                move for move in board.get_valid_moves(opp_choice)
+                if move not in board.can_be_challenged(opp_choice)
+            ]
+            valid_moves = escape_move if random_bool and escape_move else normal_move
+        else:
+            valid_moves = normal_move
+
+    # Next, check if there is a clear path from flag to end of board
+    elif board.clear_path_to_end():
+        opp_choice = board.get_opp_flag()
+        valid_moves = ["down"]
+
+    # Otherwise, select a piece from a list of moveable, active opponent pieces
+    else:
+        movable_opp_pieces = [
+            opp_p for opp_p in opp_pieces
+            if opp_p.active and not board.is_surrounded(opp_p)
+        ]
+        # Get first 1/3rd half of frontmost pieces to append to original movable_opp_pieces so
+        # frontmost pieces are more likely chosen
+        movable_opp_pieces.sort(key=lambda p: p.get_pos()[1])
+        pieces_in_front = movable_opp_pieces[
+            :ceil(len(movable_opp_pieces) / biases["front_share"])
+        ]
+        # Get first 1/3rd half of pieces w/ highest rank and append to original
+        # movable_opp_pieces so more powerful pieces are more likely chosen
+        pieces_in_front.sort(key=lambda p: p.rank, reverse=True)
+        high_ranked_pieces = pieces_in_front[
+            :ceil(len(pieces_in_front) / biases["high_rank_share"])
+        ]
+        movable_opp_pieces += (pieces_in_front + high_ranked_pieces) * biases["favour_copies"]
+        opp_choice = rng.choice(movable_opp_pieces)
+
+        # Implement biased random selection so piece is more likely to move forward, i.e. 'down'
+        valid_moves = board.get_valid_moves(opp_choice)
+        if "down" in valid_moves:
+            valid_moves += ["down"] * biases["forward_copies"]
+
+    return opp_choice, rng.choice(valid_moves)
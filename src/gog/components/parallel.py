@@ -0,0 +1,131 @@
+"""
+Module containing the `ParallelSearch` class, which spreads a search over a pool of processes.
+
+The search is parallelized at the root across determinizations (see
+`gog.components.search.determinize`): each worker searches its own guess of the hidden ranks for
+the whole budget, and the best moves of all determinizations are merged by vote, ties going to the
+highest total score and then to the lowest move index. Determinizations are drawn in the calling
+process and results merged in determinization order, so the merged move doesn't depend on which
+worker finishes first (and, with a node budget instead of a time budget and no shared table, is
+fully reproducible). More workers thus search more determinizations in the same wall-clock time.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import os
+from random import Random
+from gog.components.board import Board
+from gog.components.notation import from_notation, to_notation
+from gog.components.search import Search, determinize, index_move, move_index
+from gog.components.transposition import TranspositionTable
+
+
+# Time (in seconds) the opponent searches for a move in the terminal interface
+OPPONENT_BUDGET = 1.0
+# Table shared by the searches of a worker process (see `init_worker`)
+worker_table: TranspositionTable | None = None
+
+
+def init_worker(table: TranspositionTable | None) -> None:
+    """
+    Set up a worker process, attaching to the shared transposition `table` (if any).
+    """
+    global worker_table
+    worker_table = table
+
+
+def search_position(notation: str, final_state: int, budget: float | None,
+                    max_nodes: int | None) -> tuple[int | None, float, int, int]:
+    """
+    Returns the index of the best move (`None` if there is none) of the position `notation`
+    searched within `budget` seconds or `max_nodes` nodes, along with its score, the depth reached
+    and the nodes searched.
+    """
+    board, opp = from_notation(notation)
+    search = Search(board, budget, max_nodes, worker_table)
+    move = search.best_move(opp, final_state)
+    return None if move is None else move_index(move), search.score, search.depth, search.nodes
+
+
+def merge(results: list[tuple[int | None, float, int, int]]) -> int | None:
+    """
+    Returns the index of the move chosen from the `results` of the searches of every
+    determinization (see `search_position`), in determinization order.
+    """
+    votes: dict[int, int] = {}
+    scores: dict[int, float] = {}
+    for index, score, _, _ in results:
+        if index is not None:
+            votes[index] = votes.get(index, 0) + 1
+            scores[index] = scores.get(index, 0.0) + score
+    return min(votes, key=lambda index: (-votes[index], -scores[index], index), default=None)
+
+
+class ParallelSearch:
+    """
+    Class representing a search spread over `workers` processes (all CPU cores by default, and
+    none, searching in the calling process, if 1), sharing a transposition table of `table_mb`
+    megabytes (none if 0).
+    """
+    def __init__(self, workers: int | None = None, table_mb: float = 0) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        self.table = TranspositionTable(table_mb) if table_mb else None
+        self.pool = None
+        if self.workers > 1:
+            self.pool = ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                            initargs=(self.table,))
+        else:
+            init_worker(self.table)
+        # Depths reached and nodes searched by the last search, per determinization
+        self.depths: list[int] = []
+        self.nodes: list[int] = []
+
+    def __enter__(self) -> "ParallelSearch":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Shut the worker processes down and free the transposition table.
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+        if self.table is not None:
+            self.table.close()
+
+    def best_move(self, board: Board, rng: Random, opp=True, final_state=0,
+                  budget: float | None = None, max_nodes: int | None = None,
+                  determinizations: int | None = None) -> tuple[int, int, str] | None:
+        """
+        Returns the position and move name of the best move for the opponent (if `opp` is `True`)
+        or the user on `board`, given the final state `final_state`, merged from the searches of
+        `determinizations` determinizations (one per worker by default, drawing from the generator
+        `rng`). Takes about `budget` seconds in all, or `max_nodes` nodes per determinization.
+        Returns `None` if there is no legal move.
+        """
+        n_positions = determinizations or self.workers
+        notations = [
+            to_notation(determinize(board, rng, opp), opp) for _ in range(n_positions)
+        ]
+        if self.table is not None:
+            self.table.new_generation()
+
+        if self.pool is None:
+            # Searched one after the other, so the budget is split among them
+            share = None if budget is None else budget / n_positions
+            results = [
+                search_position(notation, final_state, share, max_nodes) for notation in notations
+            ]
+        else:
+            rounds = -(-n_positions // self.workers)
+            share = None if budget is None else budget / rounds
+            futures = [
+                self.pool.submit(search_position, notation, final_state, share, max_nodes)
+                for notation in notations
+            ]
+            results = [future.result() for future in futures]
+
+        self.depths = [result[2] for result in results]
+        self.nodes = [result[3] for result in results]
+        index = merge(results)
+        return None if index is None else index_move(index)
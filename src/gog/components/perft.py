@@ -0,0 +1,89 @@
+"""
+Module containing the perft move-generation counter for full-information positions.
+
+`perft` counts the leaf nodes of the game tree of a position up to a given depth (in plies),
+making every legal move with the rules of `gog.components.operation` and `Board.place` and
+unmaking it with `Board.undo_move`. A game is over (so a node has no children) once a flag is
+captured, a flag reaches the end of the board unchallenged, or a flag which reached the end while
+challengeable survives the opponent's next move (see `gog.run.handle_turn`).
+"""
+from gog.components.board import Board
+from gog.components.operation import MOVES
+from gog.config import constants as con
+
+
+MOVE_OFFSETS: dict[str, tuple[int, int]] = {
+    "up": (0, 1), "down": (0, -1), "left": (-1, 0), "right": (1, 0)
+}
+
+
+def legal_moves(board: Board, opp: bool) -> list[tuple[int, int, str]]:
+    """
+    Returns the position and move name of every legal move of the opponent (if `opp` is `True`)
+    or the user on `board`.
+    """
+    moves = []
+    for y, row in enumerate(board.list_repr):
+        for x, piece in enumerate(row):
+            if piece is None or piece.opp != opp:
+                continue
+            for move, (dx, dy) in MOVE_OFFSETS.items():
+                dest_x, dest_y = x + dx, y + dy
+                if 0 <= dest_x < con.BOARD_WID and 0 <= dest_y < con.BOARD_LEN \
+                        and ((target := board.list_repr[dest_y][dest_x]) is None
+                             or target.opp != opp):
+                    moves.append((x, y, move))
+    return moves
+
+
+def next_state(result: int, final_state: int) -> tuple[int, bool]:
+    """
+    Returns the final state after a move with the `result` code, given the final state
+    `final_state` before it, and whether the game is over (following `Game.resolve`).
+    """
+    match result:
+        case con.USR_END | con.OPP_END:
+            return result, False
+        case con.USR_AUTO_WIN | con.OPP_AUTO_WIN:
+            return final_state, True
+    return final_state, result < 0 or bool(final_state)
+
+
+def perft(board: Board, depth: int, opp=False, final_state=0) -> int:
+    """
+    Returns the number of leaf nodes reachable from the position on `board`, with the opponent
+    (if `opp` is `True`) or the user to move, in exactly `depth` plies or fewer if the game ends
+    sooner. `board` is left unchanged.
+    """
+    if not depth:
+        return 1
+
+    nodes = 0
+    for x, y, move in legal_moves(board, opp):
+        dx, dy = MOVE_OFFSETS[move]
+        piece, target = board.list_repr[y][x], board.list_repr[y + dy][x + dx]
+        result = MOVES[move].generate_move().execute(board, x, y)[1]
+        state, over = next_state(result, final_state)
+        if over or depth == 1:
+            nodes += 1
+        else:
+            nodes += perft(board, depth - 1, not opp, state)
+        board.undo_move(x, y, piece, target)
+    return nodes
+
+
+def divide(board: Board, depth: int, opp=False) -> dict[str, int]:
+    """
+    Returns the `perft` count below each legal move (in command format, e.g. `A3 UP`) of the
+    position on `board`, for comparing two move generators move by move.
+    """
+    counts = {}
+    for x, y, move in legal_moves(board, opp):
+        dx, dy = MOVE_OFFSETS[move]
+        piece, target = board.list_repr[y][x], board.list_repr[y + dy][x + dx]
+        result = MOVES[move].generate_move().execute(board, x, y)[1]
+        state, over = next_state(result, 0)
+        name = f"{chr(x + con.CHR_OFFSET)}{y + 1} {move.upper()}"
+        counts[name] = 1 if over or depth == 1 else perft(board, depth - 1, not opp, state)
+        board.undo_move(x, y, piece, target)
+    return counts
@@ -0,0 +1,199 @@
+"""
+Module containing the `PositionDB` class, an on-disk database of statistics of the positions seen
+in self-play (see `gog.tools.selfplay`), keyed by their hash (see `gog.components.zobrist`).
+
+The database is a `.npy` file of fixed-width records (see `RECORD`) sorted by key, mapped into
+memory and queried by binary search, so a lookup only reads a few pages however large the file is.
+Every record holds the number of times the position was reached, the wins, losses and draws (games
+stopped unfinished) of the side to move from it, and the best move observed: the one with the best
+smoothed mean score, along with its visits and total score. A batch of new positions is aggregated
+into records and merged into the file in one streaming pass, written beside it and swapped in once
+complete. Only the best move of each position is kept, so on merging two records with different
+best moves, the one with the best smoothed mean score wins.
+"""
+import os
+import numpy as np
+from gog.components.codec import OPP_BIT, RANK_MASK
+from gog.components.scoring import N_SQUARES
+from gog.components.zobrist import N_CODES, OPP_KEY, SQUARE_KEYS
+
+
+RECORD = np.dtype([
+    ("key", "<u8"), ("visits", "<u4"), ("wins", "<u4"), ("losses", "<u4"), ("draws", "<u4"),
+    ("move_visits", "<u4"), ("move_score", "<f4"), ("move", "<u2"), ("padding", "V6")
+])
+STAT_FIELDS = ("visits", "wins", "losses", "draws")
+# Visits (scoring a draw each) added to every move before taking its mean score, so that a move
+# seen once doesn't outrank one seen often
+PRIOR_VISITS = 2
+# Records copied at a time when merging
+MERGE_CHUNK = 1 << 16
+NO_RECORD = -1
+
+
+def generate_key_table() -> np.ndarray:
+    """
+    Returns the Zobrist key of every square and square byte (as in `gog.components.codec`).
+    """
+    table = np.zeros((N_SQUARES, 256), dtype=np.uint64)
+    for code in range(1, 256):
+        rank = (code & RANK_MASK) - 1
+        if 0 <= rank < (N_CODES - 1) // 2:
+            index = rank + 1 + ((N_CODES - 1) // 2 if code & OPP_BIT else 0)
+            table[:, code] = [keys[index] for keys in SQUARE_KEYS]
+    return table
+
+
+KEY_TABLE = generate_key_table()
+
+
+def position_keys(squares: np.ndarray, opp_to_move: np.ndarray) -> np.ndarray:
+    """
+    Returns the hash (as in `ZobristHash.position_key`, with no final state pending) of the
+    positions `squares` with the opponent to move where `opp_to_move` is `True`.
+    """
+    keys = np.bitwise_xor.reduce(KEY_TABLE[np.arange(N_SQUARES), squares], axis=1)
+    return keys ^ np.where(opp_to_move, np.uint64(OPP_KEY), np.uint64(0))
+
+
+def smoothed_scores(visits: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """
+    Returns the mean of the total `scores` over `visits`, shrunk towards a draw (see
+    `PRIOR_VISITS`).
+    """
+    return (scores + PRIOR_VISITS / 2) / (visits + PRIOR_VISITS)
+
+
+def aggregate(keys: np.ndarray, moves: np.ndarray, results: np.ndarray) -> np.ndarray:
+    """
+    Returns the records (sorted by key) of the positions of hashes `keys`, from which the moves of
+    indices `moves` were played and the side to move had the results `results` (1 for a win, -1
+    for a loss and 0 for a draw).
+    """
+    order = np.lexsort((moves, keys))
+    keys, moves, results = keys[order], moves[order], results[order]
+    # Every (position, move) pair
+    starts = np.flatnonzero(np.r_[True, (keys[1:] != keys[:-1]) | (moves[1:] != moves[:-1])])
+    pair_keys, pair_moves = keys[starts], moves[starts]
+    pair_stats = {
+        "visits": np.diff(np.r_[starts, len(keys)]),
+        "wins": np.add.reduceat(results == 1, starts),
+        "losses": np.add.reduceat(results == -1, starts),
+        "draws": np.add.reduceat(results == 0, starts),
+    }
+    pair_scores = pair_stats["wins"] + pair_stats["draws"] / 2
+    # The best move of each position comes first among its pairs
+    ranked = np.lexsort((-pair_stats["visits"],
+                         -smoothed_scores(pair_stats["visits"], pair_scores), pair_keys))
+    key_starts = np.flatnonzero(np.r_[True, pair_keys[1:] != pair_keys[:-1]])
+    best = ranked[key_starts]
+
+    records = np.zeros(len(key_starts), dtype=RECORD)
+    records["key"] = pair_keys[key_starts]
+    for name in STAT_FIELDS:
+        records[name] = np.add.reduceat(pair_stats[name], key_starts)
+    records["move"] = pair_moves[best]
+    records["move_visits"] = pair_stats["visits"][best]
+    records["move_score"] = pair_scores[best]
+    return records
+
+
+def combine(old: np.ndarray, new: np.ndarray) -> np.ndarray:
+    """
+    Returns the records combining the records `old` and `new` of the same positions.
+    """
+    combined = old.copy()
+    for name in STAT_FIELDS:
+        combined[name] += new[name]
+    same = old["move"] == new["move"]
+    better = smoothed_scores(new["move_visits"], new["move_score"]) \
+        > smoothed_scores(old["move_visits"], old["move_score"])
+    combined["move_visits"] = np.where(same, old["move_visits"] + new["move_visits"],
+                                       np.where(better, new["move_visits"], old["move_visits"]))
+    combined["move_score"] = np.where(same, old["move_score"] + new["move_score"],
+                                      np.where(better, new["move_score"], old["move_score"]))
+    combined["move"] = np.where(better & ~same, new["move"], old["move"])
+    return combined
+
+
+class PositionDB:
+    """
+    Class representing the database of position statistics in the file `path` (empty if it
+    doesn't exist yet).
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.records = np.load(path, mmap_mode="r") if os.path.exists(path) \
+            else np.zeros(0, dtype=RECORD)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def lookup(self, key: int) -> np.void | None:
+        """
+        Returns the record of the position of hash `key`, or `None` if it was never seen.
+        """
+        keys = self.records["key"]
+        low, high = 0, len(keys)
+        while low < high:
+            middle = (low + high) // 2
+            if int(keys[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(keys) and int(keys[low]) == key:
+            return self.records[low]
+        return None
+
+    def find(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Returns the index of the record of every position of hash in `keys` (`NO_RECORD` if it
+        was never seen), searching for all of them at once.
+        """
+        positions = self.__lower_bounds(np.asarray(keys, dtype=np.uint64))
+        found = positions < len(self.records)
+        found[found] = self.records["key"][positions[found]] == keys[found]
+        return np.where(found, positions, NO_RECORD)
+
+    def __lower_bounds(self, keys: np.ndarray) -> np.ndarray:
+        # Returns the index of the first record of hash at least each of `keys`
+        column = self.records["key"]
+        low = np.zeros(len(keys), dtype=np.int64)
+        high = np.full(len(keys), len(column), dtype=np.int64)
+        while (active := low < high).any():
+            middle = (low + high) // 2
+            less = np.zeros(len(keys), dtype=bool)
+            less[active] = column[middle[active]] < keys[active]
+            low = np.where(active & less, middle + 1, low)
+            high = np.where(active & ~less, middle, high)
+        return low
+
+    def merge(self, batch: np.ndarray) -> None:
+        """
+        Merge the records `batch` (sorted by key, with distinct keys, see `aggregate`) into the
+        database.
+        """
+        old = self.records
+        positions = self.__lower_bounds(batch["key"])
+        found = positions < len(old)
+        found[found] = old["key"][positions[found]] == batch["key"][found]
+        added = batch[~found]
+        # Records are placed after every old record and every added record of a lower key
+        added_indices = positions[~found] + np.arange(len(added))
+        common_indices = positions[found] + np.searchsorted(added["key"], batch["key"][found])
+
+        partial = f"{self.path}.partial"
+        merged = np.lib.format.open_memmap(partial, mode="w+", dtype=RECORD,
+                                           shape=(len(old) + len(added),))
+        for start in range(0, len(old), MERGE_CHUNK):
+            chunk = old[start:start + MERGE_CHUNK]
+            indices = np.arange(start, start + len(chunk)) \
+                + np.searchsorted(added["key"], chunk["key"])
+            merged[indices] = chunk
+        merged[added_indices] = added
+        merged[common_indices] = combine(merged[common_indices], batch[found])
+        merged.flush()
+        del merged
+        self.records = np.zeros(0, dtype=RECORD)
+        os.replace(partial, self.path)
+        self.records = np.load(self.path, mmap_mode="r")
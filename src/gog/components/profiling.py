@@ -0,0 +1,136 @@
+"""
+Module containing the `Profiler` class, which instruments the game with per-phase counters and
+timers.
+
+Instrumentation works by replacing functions with timed wrappers (see `Profiler.instrument`), so
+nothing is wrapped, and nothing costs any time, unless profiling is enabled. Along with the phase
+statistics, the profiler records either a `cProfile` profile or sampled call stacks in collapsed
+format (one `frame;frame;frame count` line per stack, as read by flame graph tools).
+"""
+from collections import Counter
+from collections.abc import Callable
+import cProfile
+import functools
+import os
+import sys
+import threading
+from time import perf_counter_ns
+
+
+PROFILE_MODES = ("cprofile", "stacks")
+SAMPLE_INTERVAL = 0.001
+
+
+class Profiler:
+    """
+    Class representing a profiler recording per-phase statistics along with a `cProfile` profile
+    or sampled call stacks, depending on `mode` (one of `PROFILE_MODES`).
+    """
+    def __init__(self, mode="cprofile", interval=SAMPLE_INTERVAL) -> None:
+        self.mode = mode
+        self.interval = interval
+        # Phase name -> [number of calls, total time in nanoseconds]
+        self.phases: dict[str, list[int]] = {}
+        self.stacks: Counter[str] = Counter()
+        self.__cprofile: cProfile.Profile = None
+        self.__sampler: threading.Thread = None
+        self.__stop = threading.Event()
+        self.__start = 0
+        self.__elapsed = 0
+
+    def wrap(self, phase: str, func: Callable) -> Callable:
+        """
+        Returns `func` wrapped so that its calls are counted and timed under `phase`. Time spent in
+        nested phases counts towards each of them.
+        """
+        stats = self.phases.setdefault(phase, [0, 0])
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats[0] += 1
+                stats[1] += perf_counter_ns() - start
+        return timed
+
+    def instrument(self, owner: object, name: str, phase: str) -> None:
+        """
+        Replace the attribute `name` of `owner` (a module or class) with a wrapper timing it under
+        `phase`.
+        """
+        setattr(owner, name, self.wrap(phase, getattr(owner, name)))
+
+    def __sample(self, thread_id: int) -> None:
+        while not self.__stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                # Leave out the timed wrappers of instrumented functions
+                if code.co_filename != __file__:
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        """
+        Start recording. Must be called from the thread being profiled.
+        """
+        self.__start = perf_counter_ns()
+        if self.mode == "cprofile":
+            self.__cprofile = cProfile.Profile()
+            self.__cprofile.enable()
+        else:
+            self.__stop.clear()
+            self.__sampler = threading.Thread(
+                target=self.__sample, args=(threading.get_ident(),), daemon=True
+            )
+            self.__sampler.start()
+
+    def stop(self) -> None:
+        """
+        Stop recording.
+        """
+        if self.__cprofile is not None:
+            self.__cprofile.disable()
+        if self.__sampler is not None:
+            self.__stop.set()
+            self.__sampler.join()
+        self.__elapsed += perf_counter_ns() - self.__start
+
+    def summary(self) -> str:
+        """
+        Returns a table of the statistics of every phase, slowest first.
+        """
+        lines = [
+            f"{'PHASE':<28}{'CALLS':>10}{'TOTAL (MS)':>14}{'MEAN (US)':>12}{'% WALL':>8}",
+        ]
+        for phase, (calls, total) in sorted(self.phases.items(), key=lambda item: -item[1][1]):
+            mean = total / calls / 1e3 if calls else 0.0
+            share = 100 * total / self.__elapsed if self.__elapsed else 0.0
+            lines.append(f"{phase:<28}{calls:>10}{total / 1e6:>14.2f}{mean:>12.2f}{share:>8.1f}")
+        lines.append(f"{'wall':<28}{'':>10}{self.__elapsed / 1e6:>14.2f}")
+        return "\n".join(lines)
+
+    def dump(self, directory: str) -> list[str]:
+        """
+        Write the phase statistics (`phases.txt`) and the `cProfile` profile (`profile.pstats`) or
+        collapsed stacks (`stacks.collapsed`) to `directory`. Returns the paths written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = [os.path.join(directory, "phases.txt")]
+        with open(paths[0], "w", encoding="utf-8") as fd:
+            fd.write(self.summary() + "\n")
+
+        if self.__cprofile is not None:
+            paths.append(os.path.join(directory, "profile.pstats"))
+            self.__cprofile.dump_stats(paths[-1])
+        else:
+            paths.append(os.path.join(directory, "stacks.collapsed"))
+            with open(paths[-1], "w", encoding="utf-8") as fd:
+                for stack, count in self.stacks.most_common():
+                    fd.write(f"{stack} {count}\n")
+        return paths
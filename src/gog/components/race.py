@@ -0,0 +1,167 @@
+"""
+Module containing the `FlagRace` class, which maintains the distance of each flag to the end of
+the board.
+
+For each side, a distance field holds the number of moves needed to go from every empty square to
+the goal row of that side (the opposing back row) through empty squares only: any piece blocks the
+way, as a flag can't get past it without a challenge it would lose. The distance of a flag is then
+one more than that of its best empty neighbour. Fields are updated incrementally on every change
+of a square (see `Board.add_listener`): freeing a square only lowers distances, which spread out
+from it breadth-first, while blocking a square only raises the distances of the squares whose
+shortest paths all went through it, which alone are recomputed.
+"""
+from collections import deque
+from heapq import heappop, heappush
+from gog.components.board import Board
+from gog.components.contact import NEIGHBOURS, N_SQUARES, OPP, USER
+from gog.components.piece import Flag
+from gog.config import constants as con
+
+
+UNREACHABLE = N_SQUARES
+# Side -> whether each square is in the goal row of the side
+GOAL_ROWS: list[list[bool]] = [
+    [square // con.BOARD_WID == con.BOARD_LEN - 1 for square in range(N_SQUARES)],
+    [square // con.BOARD_WID == 0 for square in range(N_SQUARES)],
+]
+
+
+class FlagRace:
+    """
+    Class representing the flag race of a board: the distance fields of both sides and the
+    position of both flags. Squares are indexed by `y * BOARD_WID + x`.
+    """
+    def __init__(self, board: Board) -> None:
+        self.board = board
+        self.empty = [
+            board.list_repr[square // con.BOARD_WID][square % con.BOARD_WID] is None
+            for square in range(N_SQUARES)
+        ]
+        # Side -> square of the flag of the side (`None` if not on the board)
+        self.flags: list[int | None] = [None, None]
+        for square in range(N_SQUARES):
+            piece = board.list_repr[square // con.BOARD_WID][square % con.BOARD_WID]
+            if isinstance(piece, Flag):
+                self.flags[OPP if piece.opp else USER] = square
+        # Side -> square -> distance to the goal row of the side
+        self.fields: list[list[int]] = [self.compute_field(USER), self.compute_field(OPP)]
+
+    @classmethod
+    def attach(cls, board: Board) -> "FlagRace":
+        """
+        Returns the flag race of `board`, registered as a listener of `board` to stay up to date.
+        """
+        race = cls(board)
+        board.add_listener(race)
+        return race
+
+    def compute_field(self, side: int) -> list[int]:
+        """
+        Returns the distance field of `side` computed from scratch by breadth-first search.
+        """
+        goal = GOAL_ROWS[side]
+        field = [UNREACHABLE] * N_SQUARES
+        queue = deque()
+        for square in range(N_SQUARES):
+            if goal[square] and self.empty[square]:
+                field[square] = 0
+                queue.append(square)
+        while queue:
+            square = queue.popleft()
+            for neighbour, _ in NEIGHBOURS[square]:
+                if self.empty[neighbour] and field[neighbour] == UNREACHABLE:
+                    field[neighbour] = field[square] + 1
+                    queue.append(neighbour)
+        return field
+
+    def __best_neighbour(self, field: list[int], square: int) -> int:
+        return min(
+            (field[neighbour] for neighbour, _ in NEIGHBOURS[square] if self.empty[neighbour]),
+            default=UNREACHABLE
+        )
+
+    def __free(self, side: int, square: int) -> None:
+        field = self.fields[side]
+        field[square] = 0 if GOAL_ROWS[side][square] \
+            else min(UNREACHABLE, self.__best_neighbour(field, square) + 1)
+        queue = deque((square,))
+        while queue:
+            current = queue.popleft()
+            for neighbour, _ in NEIGHBOURS[current]:
+                if self.empty[neighbour] and field[current] + 1 < field[neighbour]:
+                    field[neighbour] = field[current] + 1
+                    queue.append(neighbour)
+
+    def __block(self, side: int, square: int) -> None:
+        field = self.fields[side]
+        if field[square] == UNREACHABLE:
+            return
+
+        # Squares (in order of distance) left without a neighbour one step closer to the goal
+        affected = {square}
+        queue = deque((square,))
+        while queue:
+            current = queue.popleft()
+            for neighbour, _ in NEIGHBOURS[current]:
+                if neighbour in affected or not self.empty[neighbour] \
+                        or field[neighbour] != field[current] + 1:
+                    continue
+                if not any(
+                    self.empty[other] and other not in affected
+                    and field[other] == field[neighbour] - 1
+                    for other, _ in NEIGHBOURS[neighbour]
+                ):
+                    affected.add(neighbour)
+                    queue.append(neighbour)
+
+        # Recompute the affected squares from the unaffected ones (Dijkstra's algorithm)
+        heap = []
+        for current in affected:
+            field[current] = UNREACHABLE
+        for current in affected:
+            if current != square:
+                distance = min(UNREACHABLE, self.__best_neighbour(field, current) + 1)
+                if distance < UNREACHABLE:
+                    field[current] = distance
+                    heappush(heap, (distance, current))
+        while heap:
+            distance, current = heappop(heap)
+            if distance > field[current]:
+                continue
+            for neighbour, _ in NEIGHBOURS[current]:
+                if self.empty[neighbour] and distance + 1 < field[neighbour]:
+                    field[neighbour] = distance + 1
+                    heappush(heap, (distance + 1, neighbour))
+
+    def on_square(self, x: int, y: int, old, new) -> None:
+        """
+        Update the fields and flags after the `Piece` object on (`x`, `y`) changed from `old` to
+        `new` (either may be `None`).
+        """
+        square = y * con.BOARD_WID + x
+        if isinstance(old, Flag) and self.flags[OPP if old.opp else USER] == square:
+            self.flags[OPP if old.opp else USER] = None
+        if isinstance(new, Flag):
+            self.flags[OPP if new.opp else USER] = square
+
+        if (old is None) == (new is None):
+            return
+        self.empty[square] = new is None
+        for side in (USER, OPP):
+            if new is None:
+                self.__free(side, square)
+            else:
+                self.__block(side, square)
+
+    def flag_distance(self, opp: bool) -> int:
+        """
+        Returns the number of moves the opponent (if `opp` is `True`) or user flag needs to reach
+        the end of the board, or `UNREACHABLE` if it is blocked in (or not on the board).
+        """
+        side = OPP if opp else USER
+        square = self.flags[side]
+        if square is None:
+            return UNREACHABLE
+        if GOAL_ROWS[side][square]:
+            return 0
+        return min(UNREACHABLE, self.__best_neighbour(self.fields[side], square) + 1)
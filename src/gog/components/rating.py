@@ -0,0 +1,174 @@
+"""
+Module containing the `RatingTable` class, which rates players (such as opponent configurations,
+see `gog.tools.tournament`) from the results of their games against each other.
+
+Ratings follow the Bradley-Terry model: a player of strength `a` scores `1 / (1 + exp(b - a))`
+on average against one of strength `b`, which is the Elo model with ratings `ELO_SCALE` times the
+strengths. Results (1 for a win, 0.5 for a draw and 0 for a loss) are only kept as the total score
+and number of games of every pair of players, so any number of results is added in one pass and
+fitting costs the same however many games were played. The strengths are fitted by Newton's
+method under a weak normal prior (which keeps them finite for players who won or lost every game),
+starting from the last fit, so refitting after each batch of results (streaming) takes one or two
+iterations. The inverse of the Hessian at the fit gives the covariance of the strengths, and so
+the confidence intervals of the ratings and the information each new game would add, which
+`schedule` uses to pick the games that narrow the ratings the most.
+"""
+import numpy as np
+
+
+# Elo points per unit of strength, so that 400 points is a 10:1 ratio of odds
+ELO_SCALE = 400 / np.log(10)
+# Rating of a player of average strength
+BASE_RATING = 1500.0
+# Standard deviation (in units of strength) of the prior of the strengths
+PRIOR_SD = 4.0
+FIT_ITERATIONS = 50
+FIT_TOLERANCE = 1e-9
+# Normal quantile of 95% confidence intervals
+Z_95 = 1.959964
+
+
+class RatingTable:
+    """
+    Class representing the ratings of the players named `players`, fitted from the results of
+    their games.
+    """
+    def __init__(self, players: list[str]) -> None:
+        self.players = list(players)
+        n = len(self.players)
+        # Total score of the first player of each pair against the second, and games between them
+        self.scores = np.zeros((n, n))
+        self.games = np.zeros((n, n))
+        self.strengths = np.zeros(n)
+        self.covariance = np.eye(n) * PRIOR_SD ** 2
+
+    @classmethod
+    def load(cls, path: str) -> "RatingTable":
+        """
+        Returns the table saved at `path` (see `save`), refitted.
+        """
+        with np.load(path) as data:
+            table = cls([str(name) for name in data["players"]])
+            table.scores, table.games = data["scores"], data["games"]
+            table.strengths = data["strengths"]
+        table.fit()
+        return table
+
+    def save(self, path: str) -> None:
+        """
+        Save the results and fitted strengths of the table to `path` (a `.npz` file).
+        """
+        np.savez(path, players=np.array(self.players), scores=self.scores, games=self.games,
+                 strengths=self.strengths)
+
+    def add_results(self, first: np.ndarray, second: np.ndarray, scores: np.ndarray) -> None:
+        """
+        Add the results of games between the players of indices `first` and `second` (arrays of
+        the same length), where the first scored `scores` (1, 0.5 or 0). Call `fit` to update the
+        ratings.
+        """
+        n = len(self.players)
+        first, second = np.asarray(first), np.asarray(second)
+        scores = np.asarray(scores, dtype=float)
+        forward, backward = first * n + second, second * n + first
+        self.scores += (np.bincount(forward, scores, n * n)
+                        + np.bincount(backward, 1 - scores, n * n)).reshape(n, n)
+        self.games += (np.bincount(forward, minlength=n * n)
+                       + np.bincount(backward, minlength=n * n)).reshape(n, n)
+
+    def fit(self, max_iterations=FIT_ITERATIONS, tolerance=FIT_TOLERANCE) -> int:
+        """
+        Fit the strengths to the results added so far, starting from the last fit, until no
+        strength changes by more than `tolerance` or after `max_iterations` iterations. Returns
+        the number of iterations taken.
+        """
+        n = len(self.players)
+        precision = np.eye(n) / PRIOR_SD ** 2
+        iterations = 0
+        while iterations < max_iterations:
+            iterations += 1
+            hessian, expected = self.__hessian()
+            gradient = (self.scores - expected).sum(axis=1) - self.strengths / PRIOR_SD ** 2
+            step = np.linalg.solve(hessian + precision, gradient)
+            self.strengths = self.strengths + step
+            if np.abs(step).max() <= tolerance:
+                break
+        hessian, _ = self.__hessian()
+        self.covariance = np.linalg.inv(hessian + precision)
+        return iterations
+
+    def __hessian(self) -> tuple[np.ndarray, np.ndarray]:
+        # Returns the Hessian of the negative log-likelihood and the expected scores of every pair
+        probabilities = self.win_probabilities()
+        weights = self.games * probabilities * (1 - probabilities)
+        hessian = np.diag(weights.sum(axis=1)) - weights
+        return hessian, self.games * probabilities
+
+    def win_probabilities(self) -> np.ndarray:
+        """
+        Returns the expected score of every player (rows) against every other (columns).
+        """
+        return 1 / (1 + np.exp(self.strengths[None, :] - self.strengths[:, None]))
+
+    def ratings(self) -> np.ndarray:
+        """
+        Returns the Elo rating of every player, relative to the average player.
+        """
+        return BASE_RATING + ELO_SCALE * (self.strengths - self.strengths.mean())
+
+    def intervals(self, z=Z_95) -> np.ndarray:
+        """
+        Returns the half-width of the confidence interval (95% by default, `z` standard deviations)
+        of every rating.
+        """
+        n = len(self.players)
+        # Covariance of the strengths relative to their mean
+        centre = np.eye(n) - 1 / n
+        variances = np.diag(centre @ self.covariance @ centre)
+        return z * ELO_SCALE * np.sqrt(np.maximum(variances, 0.0))
+
+    def schedule(self, n_games: int, allowed: np.ndarray | None = None) -> list[tuple[int, int]]:
+        """
+        Returns the pairs of players (indices) of the `n_games` games (among the pairs where the
+        matrix `allowed` is `True`, all distinct pairs by default) expected to reduce the total
+        variance of the strengths the most, chosen one at a time as if the previous ones were
+        played. A game's information doesn't depend on its result, only on how uncertain the
+        difference of strengths of its players is and how even their odds are.
+        """
+        n = len(self.players)
+        if allowed is None:
+            allowed = ~np.eye(n, dtype=bool)
+        probabilities = self.win_probabilities()
+        information = probabilities * (1 - probabilities)
+        covariance = self.covariance.copy()
+        pairs = []
+        for _ in range(n_games):
+            # Variance of the difference of strengths of every pair, and the total variance
+            # removed by a game between them
+            diagonal = np.diag(covariance)
+            differences = diagonal[:, None] + diagonal[None, :] - 2 * covariance
+            gram = covariance @ covariance
+            spread = np.diag(gram)[:, None] + np.diag(gram)[None, :] - 2 * gram
+            gains = np.where(allowed, information * spread / (1 + information * differences),
+                             -np.inf)
+            i, j = np.unravel_index(np.argmax(gains), gains.shape)
+            if not np.isfinite(gains[i, j]):
+                break
+            pairs.append((int(i), int(j)))
+            # Update the covariance as if the game was played (Sherman-Morrison)
+            column = covariance[:, i] - covariance[:, j]
+            covariance -= information[i, j] * np.outer(column, column) \
+                / (1 + information[i, j] * differences[i, j])
+        return pairs
+
+    def report(self) -> list[dict]:
+        """
+        Returns the name, rating, confidence interval and number of games of every player, best
+        rated first.
+        """
+        ratings, intervals, games = self.ratings(), self.intervals(), self.games.sum(axis=1)
+        return [
+            {"player": self.players[index], "rating": round(float(ratings[index]), 1),
+             "interval": round(float(intervals[index]), 1), "games": int(games[index])}
+            for index in np.argsort(-ratings)
+        ]
@@ -0,0 +1,88 @@
+"""
+Module containing the random number generators used by games, opponent policies and setup
+generators.
+
+Every stream derives from a root `SeedSequence`: `spawn` splits a sequence into independent
+children (game 0, game 1, ...; setup, opponent, ...), so any game of a large parallel run can be
+replayed exactly from the root entropy and its spawn key alone.
+"""
+from random import Random, SystemRandom
+
+
+MASK_64 = (1 << 64) - 1
+# OS entropy source (`secrets` uses the same one, but takes a while to import)
+SYSTEM_RANDOM = SystemRandom()
+
+
+class SplitMix(Random):
+    """
+    Class representing a `random.Random` generator backed by SplitMix64. Its whole state is a single
+    64-bit integer, so it can be serialized compactly along with a game.
+    """
+    def seed(self, a=None, version=2) -> None:
+        self.__state = (SYSTEM_RANDOM.getrandbits(64) if a is None else int(a)) & MASK_64
+
+    def getstate(self) -> int:
+        return self.__state
+
+    def setstate(self, state: int) -> None:
+        self.__state = state & MASK_64
+
+    def __next(self) -> int:
+        self.__state = (self.__state + 0x9e3779b97f4a7c15) & MASK_64
+        z = self.__state
+        z = ((z ^ (z >> 30)) * 0xbf58476d1ce4e5b9) & MASK_64
+        z = ((z ^ (z >> 27)) * 0x94d049bb133111eb) & MASK_64
+        return z ^ (z >> 31)
+
+    def random(self) -> float:
+        return (self.__next() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k: int) -> int:
+        bits = 0
+        for shift in range(0, k, 64):
+            bits |= self.__next() << shift
+        return bits & ((1 << k) - 1)
+
+
+class SeedSequence:
+    """
+    Class representing a node in a tree of seeds (modelled after `numpy.random.SeedSequence`). A
+    node is identified by the root `entropy` and its `spawn_key`, the path of child indices from
+    the root.
+    """
+    def __init__(self, entropy: int | None = None, spawn_key: tuple[int, ...] = ()) -> None:
+        self.entropy = SYSTEM_RANDOM.getrandbits(128) if entropy is None else entropy
+        self.spawn_key = spawn_key
+        self.n_children_spawned = 0
+
+    def spawn(self, n_children: int) -> list["SeedSequence"]:
+        """
+        Returns `n_children` new, independent child sequences.
+        """
+        first = self.n_children_spawned
+        self.n_children_spawned += n_children
+        return [self.child(i) for i in range(first, first + n_children)]
+
+    def child(self, index: int) -> "SeedSequence":
+        """
+        Returns the child sequence with index `index`, as `spawn` would, without spawning the
+        children before it.
+        """
+        return SeedSequence(self.entropy, self.spawn_key + (index,))
+
+    def generate_state(self) -> int:
+        """
+        Returns the 64-bit seed of this sequence.
+        """
+        # Imported here as it takes a while and generators are rarely seeded at startup
+        from hashlib import blake2b
+
+        digest = blake2b(repr((self.entropy, self.spawn_key)).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little")
+
+    def rng(self) -> SplitMix:
+        """
+        Returns a new generator seeded from this sequence.
+        """
+        return SplitMix(self.generate_state())
@@ -0,0 +1,215 @@
+"""
+Module containing the batched position evaluation, which scores many full-information positions at
+once with `numpy`.
+
+Positions are encoded as arrays of one byte per square (as in `gog.components.codec`), indexed by
+`y * BOARD_WID + x`, along with the side to move. `evaluate` computes the components of
+`gog.components.evaluation` for the whole batch with array operations (giving the same scores as
+an `Evaluator` on each board) and the prior probability of every legal move, indexed as in
+`gog.components.search.move_index`. Positions can be encoded from `Board` objects or, without
+building any board, from their notation (see `gog.components.notation`).
+"""
+import numpy as np
+from gog.components.board import Board
+from gog.components.codec import OPP_BIT, RANK_MASK, encode_board
+from gog.components.evaluation import COMPONENTS, CONTACT_VALUES, DEFAULT_WEIGHTS, PIECE_VALUES
+from gog.components.notation import RANK_LETTERS, expand_row
+from gog.components.race import UNREACHABLE
+from gog.components.search import MOVE_NAMES
+from gog.config import constants as con
+
+
+N_SQUARES = con.BOARD_LEN * con.BOARD_WID
+N_MOVES = N_SQUARES * len(MOVE_NAMES)
+# Offsets (dy, dx) of the moves, in the order of `MOVE_NAMES`
+MOVE_DELTAS = [{"up": (1, 0), "down": (-1, 0), "left": (0, -1), "right": (0, 1)}[name]
+               for name in MOVE_NAMES]
+# Weights of the logits of the move priors: moving forward, and the value won (or lost) by a
+# challenge
+FORWARD_LOGIT = 0.5
+CHALLENGE_LOGIT = 0.25
+# Code of every character of an expanded row of a position in notation (see `expand_row`)
+NOTATION_CODES = np.zeros(256, dtype=np.uint8)
+for rank, letter in enumerate(RANK_LETTERS):
+    NOTATION_CODES[ord(letter)] = (rank + 1) | OPP_BIT
+    NOTATION_CODES[ord(letter.upper())] = rank + 1
+VALUES = np.array(PIECE_VALUES)
+# User rank -> opponent rank -> value of the pair in contact (for the user)
+CONTACT_TABLE = np.array(CONTACT_VALUES)
+
+
+def encode_notations(notations: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the squares (one row per position) and the side to move (`True` for the opponent) of
+    the positions in notation `notations`. Raises `ValueError` if any of them is malformed.
+    """
+    boards, sides = [], []
+    for notation in notations:
+        # Rows are checked as in `from_notation`, so both accept the same positions
+        fields = notation.split()
+        rows = fields[0].split("/") if fields else []
+        if len(fields) != 2 or fields[1] not in ("u", "o") or len(rows) != con.BOARD_LEN:
+            raise ValueError(f"Malformed position '{notation}'.")
+        expanded_rows = [expand_row(row) for row in rows]
+        if None in expanded_rows:
+            raise ValueError(f"Malformed position '{notation}'.")
+        boards.append("".join(expanded_rows))
+        sides.append(fields[1] == "o")
+
+    codes = NOTATION_CODES[np.frombuffer("".join(boards).encode("ascii"), dtype=np.uint8)]
+    # Notation rows run from the opponent's back row down
+    squares = codes.reshape(-1, con.BOARD_LEN, con.BOARD_WID)[:, ::-1].reshape(-1, N_SQUARES)
+    return np.ascontiguousarray(squares), np.array(sides, dtype=bool)
+
+
+def encode_boards(boards: list[Board]) -> np.ndarray:
+    """
+    Returns the squares (one row per position) of `boards`.
+    """
+    return np.frombuffer(b"".join(encode_board(board) for board in boards),
+                         dtype=np.uint8).reshape(-1, N_SQUARES)
+
+
+def shift(grid: np.ndarray, dy: int, dx: int, fill=0) -> np.ndarray:
+    """
+    Returns the batch of board-shaped arrays `grid` shifted so that each square holds the value of
+    its neighbour at offset (`dx`, `dy`), or `fill` past the edge of the board.
+    """
+    shifted = np.full_like(grid, fill)
+    rows, cols = grid.shape[1], grid.shape[2]
+    shifted[:, max(0, -dy):rows - max(0, dy), max(0, -dx):cols - max(0, dx)] = \
+        grid[:, max(0, dy):rows - max(0, -dy), max(0, dx):cols - max(0, -dx)]
+    return shifted
+
+
+def race_distances(empty: np.ndarray, flags: np.ndarray, goal_row: int) -> np.ndarray:
+    """
+    Returns the number of moves each flag (a mask of its square, empty if it's gone) needs to reach
+    `goal_row` through the `empty` squares (see `gog.components.race`), `UNREACHABLE` if it can't.
+    """
+    distance = np.full(empty.shape, UNREACHABLE, dtype=np.int16)
+    distance[:, goal_row] = np.where(empty[:, goal_row], 0, UNREACHABLE)
+    frontier = distance == 0
+    for step in range(1, N_SQUARES):
+        reached = np.zeros_like(frontier)
+        for dy, dx in MOVE_DELTAS:
+            reached |= shift(frontier, dy, dx, False)
+        frontier = reached & empty & (distance == UNREACHABLE)
+        if not frontier.any():
+            break
+        distance[frontier] = step
+
+    best = np.full(empty.shape[0], UNREACHABLE, dtype=np.int16)
+    for dy, dx in MOVE_DELTAS:
+        # The distance of the neighbour of the flag in this direction (occupied squares have none)
+        neighbour = np.where(flags, shift(distance, dy, dx, UNREACHABLE), UNREACHABLE)
+        best = np.minimum(best, neighbour.reshape(len(best), -1).min(axis=1))
+    result = np.minimum(best + 1, UNREACHABLE)
+    on_goal = flags[:, goal_row].any(axis=1)
+    result[on_goal] = 0
+    result[~flags.reshape(len(best), -1).any(axis=1)] = UNREACHABLE
+    return result
+
+
+def components(squares: np.ndarray) -> np.ndarray:
+    """
+    Returns the difference between the user's and the opponent's value of each component of
+    `COMPONENTS` (one row per position) for the positions `squares`.
+    """
+    n = len(squares)
+    grid = squares.reshape(n, con.BOARD_LEN, con.BOARD_WID)
+    ranks = (grid & RANK_MASK).astype(np.int16) - 1
+    occupied = grid != 0
+    opp = occupied & (grid & OPP_BIT != 0)
+    user = occupied & ~opp
+    sign = user.astype(np.int8) - opp.astype(np.int8)
+    values = np.where(occupied, VALUES[np.maximum(ranks, 0)], 0.0)
+
+    material = (values * sign).reshape(n, -1).sum(axis=1)
+    mobility = np.zeros(n)
+    contact = np.zeros(n)
+    user_near = np.zeros(grid.shape, dtype=np.int8)
+    opp_near = np.zeros(grid.shape, dtype=np.int8)
+    for dy, dx in MOVE_DELTAS:
+        near_user, near_opp = shift(user, dy, dx, False), shift(opp, dy, dx, False)
+        on_board = shift(np.ones_like(user), dy, dx, False)
+        user_near += near_user
+        opp_near += near_opp
+        mobility += (user & on_board & ~near_user).reshape(n, -1).sum(axis=1)
+        mobility -= (opp & on_board & ~near_opp).reshape(n, -1).sum(axis=1)
+        # Every pair of a user piece and the opponent piece next to it, counted once
+        pairs = user & near_opp
+        opp_ranks = shift(ranks, dy, dx, 0)
+        contact += np.where(pairs, CONTACT_TABLE[np.maximum(ranks, 0), opp_ranks], 0.0) \
+            .reshape(n, -1).sum(axis=1)
+
+    user_flag, opp_flag = user & (ranks == 0), opp & (ranks == 0)
+    safety = ((user_near - opp_near) * user_flag).reshape(n, -1).sum(axis=1) \
+        - ((opp_near - user_near) * opp_flag).reshape(n, -1).sum(axis=1)
+    rows = np.arange(con.BOARD_LEN)[None, :, None]
+    advancement = (user_flag * rows).reshape(n, -1).sum(axis=1) \
+        - (opp_flag * (con.BOARD_LEN - 1 - rows)).reshape(n, -1).sum(axis=1)
+
+    race = np.zeros(n)
+    for flags, goal_row, side in ((user_flag, con.BOARD_LEN - 1, 1), (opp_flag, 0, -1)):
+        distance = race_distances(~occupied, flags, goal_row)
+        race += side * np.where(distance == UNREACHABLE, 0, con.BOARD_LEN - distance)
+
+    return np.stack([material, mobility, safety, advancement, race, contact], axis=1)
+
+
+def move_priors(squares: np.ndarray, opp_to_move: np.ndarray) -> np.ndarray:
+    """
+    Returns the prior probability of every move (one row of `N_MOVES` per position, 0 for illegal
+    moves) of the side to move (the opponent where `opp_to_move` is `True`) of the positions
+    `squares`, favouring forward moves and winning challenges.
+    """
+    n = len(squares)
+    grid = squares.reshape(n, con.BOARD_LEN, con.BOARD_WID)
+    ranks = (grid & RANK_MASK).astype(np.int16) - 1
+    occupied = grid != 0
+    opp = occupied & (grid & OPP_BIT != 0)
+    mover = np.where(opp_to_move[:, None, None], opp, occupied & ~opp)
+    enemy = occupied & ~mover
+    forward = np.where(opp_to_move, -1, 1)
+
+    logits = np.full((n, con.BOARD_LEN, con.BOARD_WID, len(MOVE_DELTAS)), -np.inf)
+    for direction, (dy, dx) in enumerate(MOVE_DELTAS):
+        on_board = shift(np.ones_like(mover), dy, dx, False)
+        target_enemy = shift(enemy, dy, dx, False)
+        legal = mover & on_board & ~shift(mover, dy, dx, False)
+        target_ranks = shift(ranks, dy, dx, 0)
+        # Value (for the user) of a challenge between the mover and its target
+        user_ranks = np.where(opp_to_move[:, None, None], target_ranks, ranks)
+        opp_ranks = np.where(opp_to_move[:, None, None], ranks, target_ranks)
+        challenge = CONTACT_TABLE[np.maximum(user_ranks, 0), np.maximum(opp_ranks, 0)]
+        challenge = np.where(opp_to_move[:, None, None], -challenge, challenge)
+        logit = FORWARD_LOGIT * (dy * forward)[:, None, None] \
+            + CHALLENGE_LOGIT * np.where(target_enemy, challenge, 0.0)
+        logits[..., direction] = np.where(legal, logit, -np.inf)
+
+    logits = logits.reshape(n, N_MOVES)
+    top = logits.max(axis=1, keepdims=True)
+    weights = np.exp(logits - np.where(np.isfinite(top), top, 0.0))
+    totals = weights.sum(axis=1, keepdims=True)
+    return np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
+
+def evaluate(squares: np.ndarray, opp_to_move: np.ndarray,
+             weights: dict[str, float] = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the scores of the positions `squares` from the point of view of the side to move (the
+    opponent where `opp_to_move` is `True`), weighing their components by `weights`, and the priors
+    of their moves (see `move_priors`).
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    scores = components(squares) @ np.array([weights.get(name, 0.0) for name in COMPONENTS])
+    return np.where(opp_to_move, -scores, scores), move_priors(squares, opp_to_move)
+
+
+def evaluate_notations(notations: list[str],
+                       weights: dict[str, float] = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the scores and move priors (see `evaluate`) of the positions in notation `notations`.
+    """
+    return evaluate(*encode_notations(notations), weights)
@@ -0,0 +1,259 @@
+"""
+Module containing the anytime game-tree search used for hints.
+
+The user can't see the ranks of the opponent pieces, so the search runs on a determinization of
+the board (see `determinize`): a copy on which the ranks of the opponent pieces are shuffled among
+them. It then deepens an alpha-beta search one ply at a time, scoring leaves with an `Evaluator`,
+until its time or node budget runs out, and returns the best move of the deepest search
+completed (or improved upon) so far. It always returns a move if there is one, however early it's
+stopped.
+"""
+from random import Random
+from time import perf_counter
+from gog.components.board import Board
+from gog.components.evaluation import Evaluator, PIECE_VALUES
+from gog.components.operation import MOVES
+from gog.components.perft import MOVE_OFFSETS, legal_moves, next_state
+from gog.components.piece import Flag, PIECES
+from gog.components.transposition import EXACT, LOWER, NO_MOVE, UPPER, TranspositionTable
+from gog.components.zobrist import ZobristHash
+from gog.config import constants as con
+
+
+# Time (in seconds) a hint may take in the terminal interface
+HINT_BUDGET = 0.3
+WIN_SCORE = 1000.0
+MAX_DEPTH = 32
+# Number of nodes searched between two checks of the clock
+CHECK_INTERVAL = 64
+FACTORIES = list(PIECES.values())
+MOVE_NAMES = tuple(MOVE_OFFSETS)
+
+
+def move_index(move: tuple[int, int, str]) -> int:
+    """
+    Returns the index of `move` (a position and move name) as stored in a `TranspositionTable`.
+    """
+    x, y, name = move
+    return (y * con.BOARD_WID + x) * len(MOVE_NAMES) + MOVE_NAMES.index(name)
+
+
+def index_move(index: int) -> tuple[int, int, str]:
+    """
+    Returns the position and move name of the move with the index `index` (see `move_index`).
+    """
+    square, direction = divmod(index, len(MOVE_NAMES))
+    return square % con.BOARD_WID, square // con.BOARD_WID, MOVE_NAMES[direction]
+
+
+class SearchTimeout(Exception):
+    """
+    Raised when a search runs out of budget.
+    """
+
+
+def determinize(board: Board, rng: Random, opp=False) -> Board:
+    """
+    Returns a copy of `board` on which the ranks of the pieces hidden from the opponent (if `opp`
+    is `True`) or the user are shuffled among them (drawing from the generator `rng`), as that
+    side would guess them.
+    """
+    squares = [
+        (x, y, piece) for y, row in enumerate(board.list_repr) for x, piece in enumerate(row)
+        if piece is not None
+    ]
+    hidden_ranks = [piece.rank for _, _, piece in squares if piece.opp != opp]
+    rng.shuffle(hidden_ranks)
+    hidden_ranks.reverse()
+
+    copy = Board()
+    for x, y, piece in squares:
+        rank = hidden_ranks.pop() if piece.opp != opp else piece.rank
+        new_piece = FACTORIES[rank].generate_piece()
+        if piece.opp:
+            new_piece.set_opp()
+            if isinstance(new_piece, Flag):
+                copy.set_opp_flag(new_piece)
+        copy.place(new_piece, x, y)
+    return copy
+
+
+def winner_of(result: int, final_state: int) -> int:
+    """
+    Returns the winner (`con.USR_WINNER` or `con.OPP_WINNER`) of a game ended by a move with the
+    `result` code, given the final state `final_state` after it (see `Game.resolve`).
+    """
+    if result < 0:
+        return result
+    if result == con.USR_AUTO_WIN:
+        return con.USR_WINNER
+    if result == con.OPP_AUTO_WIN:
+        return con.OPP_WINNER
+    return con.USR_WINNER if final_state == con.USR_END else con.OPP_WINNER
+
+
+class Search:
+    """
+    Class representing an anytime search of the position on `board` (which it plays and unmakes
+    moves on, leaving it as it was however the search stops, and stays a listener of), stopping
+    once `budget` seconds have passed or `max_nodes` nodes have been searched, whichever comes
+    first (either may be `None`). If a `TranspositionTable` is given, results are shared through
+    it with every other search using it. If a policy/value `model` (see `gog.components.model`) is
+    given, the root moves are searched in the order of its priors, and if a `PositionDB` (see
+    `gog.components.positiondb`) of `stats` is given, the best move observed in the root position
+    is searched first.
+    """
+    def __init__(self, board: Board, budget: float | None = None, max_nodes: int | None = None,
+                 table: TranspositionTable | None = None, model=None, stats=None) -> None:
+        self.board = board
+        self.model = model
+        self.stats = stats
+        self.evaluator = Evaluator.attach(board)
+        self.table = table
+        self.zobrist = None if table is None else ZobristHash.attach(board)
+        self.budget = budget
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        # Depth of the deepest search completed and the score of its best move
+        self.depth = 0
+        self.score = 0.0
+        self.__deadline = None
+        self.__next_check = CHECK_INTERVAL
+
+    def __tick(self) -> None:
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes >= self.max_nodes:
+            raise SearchTimeout
+        if self.nodes >= self.__next_check:
+            self.__next_check += CHECK_INTERVAL
+            if self.__deadline is not None and perf_counter() >= self.__deadline:
+                raise SearchTimeout
+
+    def ordered_moves(self, opp: bool) -> list[tuple[int, int, str]]:
+        """
+        Returns the legal moves of the opponent (if `opp` is `True`) or the user, challenges first
+        (of the most valuable pieces first).
+        """
+        board = self.board.list_repr
+
+        def priority(move: tuple[int, int, str]) -> float:
+            x, y, name = move
+            dx, dy = MOVE_OFFSETS[name]
+            target = board[y + dy][x + dx]
+            return -1.0 if target is None else PIECE_VALUES[target.rank]
+
+        return sorted(legal_moves(self.board, opp), key=priority, reverse=True)
+
+    def make_move(self, move: tuple[int, int, str], opp: bool, depth: int, alpha: float,
+                  beta: float, final_state: int) -> float:
+        """
+        Returns the score of `move` for its side (the opponent if `opp` is `True`) with `depth`
+        plies left to search after it, unmaking it afterwards.
+        """
+        self.__tick()
+        x, y, name = move
+        dx, dy = MOVE_OFFSETS[name]
+        board = self.board
+        piece, target = board.list_repr[y][x], board.list_repr[y + dy][x + dx]
+        result = MOVES[name].generate_move().execute(board, x, y)[1]
+        # Unmade even when the search runs out of budget, so the board is left as it was
+        try:
+            state, over = next_state(result, final_state)
+            if over:
+                won = (winner_of(result, state) == con.OPP_WINNER) == opp
+                # Prefer the quickest wins and the slowest losses
+                return WIN_SCORE + depth if won else -WIN_SCORE - depth
+            if not depth:
+                return self.evaluator.evaluate(opp)
+            return -self.negamax(depth, -beta, -alpha, not opp, state)
+        finally:
+            board.undo_move(x, y, piece, target)
+
+    def negamax(self, depth: int, alpha: float, beta: float, opp: bool, final_state: int) -> float:
+        """
+        Returns the score, for the side to move (the opponent if `opp` is `True`), of the position
+        searched `depth` plies deep within the window (`alpha`, `beta`).
+        """
+        moves = self.ordered_moves(opp)
+        if not moves:
+            return self.evaluator.evaluate(opp)
+
+        table, key, original_alpha = self.table, 0, alpha
+        if table is not None:
+            key = self.zobrist.position_key(opp, final_state)
+            entry = table.probe(key)
+            if entry is not None:
+                score, entry_depth, bound, index = entry
+                if entry_depth >= depth and (bound == EXACT or bound == LOWER and score >= beta
+                                             or bound == UPPER and score <= alpha):
+                    return score
+                if index != NO_MOVE and (stored := index_move(index)) in moves:
+                    moves.remove(stored)
+                    moves.insert(0, stored)
+
+        best_score, best = -float("inf"), moves[0]
+        for move in moves:
+            score = self.make_move(move, opp, depth - 1, alpha, beta, final_state)
+            if score > best_score:
+                best_score, best = score, move
+                alpha = max(alpha, score)
+                if score >= beta:
+                    break
+
+        if table is not None:
+            bound = LOWER if best_score >= beta else EXACT if best_score > original_alpha \
+                else UPPER
+            table.store(key, best_score, depth, bound, move_index(best))
+        return best_score
+
+    def best_move(self, opp=False, final_state=0,
+                  max_depth=MAX_DEPTH) -> tuple[int, int, str] | None:
+        """
+        Returns the position and move name of the best move found for the opponent (if `opp` is
+        `True`) or the user, given the final state `final_state`, searching at most `max_depth`
+        plies deep, or `None` if there is no legal move. Stops early on `KeyboardInterrupt`.
+        """
+        moves = self.ordered_moves(opp)
+        if not moves:
+            return None
+        if self.model is not None:
+            priors = self.model.move_priors(self.board, opp)
+            moves.sort(key=lambda move: priors.get(move, 0.0), reverse=True)
+        if self.stats is not None:
+            record = self.stats.lookup(ZobristHash(self.board).position_key(opp, final_state))
+            if record is not None and (observed := index_move(int(record["move"]))) in moves:
+                moves.remove(observed)
+                moves.insert(0, observed)
+        best = moves[0]
+        self.__deadline = None if self.budget is None else perf_counter() + self.budget
+        try:
+            for depth in range(max_depth):
+                # The best move so far is searched first, so any move beating it is better still
+                moves.remove(best)
+                moves.insert(0, best)
+                alpha = -float("inf")
+                for move in moves:
+                    score = self.make_move(move, opp, depth, alpha, float("inf"), final_state)
+                    if score > alpha:
+                        alpha, best = score, move
+                self.depth, self.score = depth + 1, alpha
+                if alpha >= WIN_SCORE:
+                    break
+        except (SearchTimeout, KeyboardInterrupt):
+            pass
+        return best
+
+
+def hint(board: Board, rng: Random, final_state=0, budget: float | None = None,
+         max_nodes: int | None = None, start: float | None = None) -> tuple[int, int, str] | None:
+    """
+    Returns the position and move name of the best user move found on a determinization of `board`
+    (see `determinize`) within `budget` seconds of `start` (a `perf_counter` reading, now by
+    default, so that e.g. importing this module can count towards the budget) or `max_nodes`
+    nodes, or `None` if the user can't move. `board` is left unchanged.
+    """
+    start = perf_counter() if start is None else start
+    search = Search(determinize(board, rng), budget, max_nodes)
+    if budget is not None:
+        search.budget = max(0.0, budget - (perf_counter() - start))
+    return search.best_move(False, final_state)
@@ -0,0 +1,169 @@
+"""
+Module containing the setup generator, which arranges pieces at random by permutation sampling.
+
+Setups are expressed in setup squares `0` to `26`, i.e. `row * BOARD_WID + x` where row `0` is the
+back row of the side being set up. Optional constraints (see `CONSTRAINTS`) restrict the sampled
+setups. The batch API `sample_setups` requires the `numpy` module (see README.md).
+"""
+from collections.abc import Callable
+from random import Random
+from gog.components.board import Board
+from gog.components.piece import Flag, Piece, PIECES
+from gog.components.rng import SeedSequence
+from gog.config import constants as con
+
+
+SETUP_ROWS = 3
+N_SETUP_SQUARES = SETUP_ROWS * con.BOARD_WID
+FACTORIES = list(PIECES.values())
+RANK_OF: dict[str, int] = {name: rank for rank, name in enumerate(PIECES)}
+# Ranks of all 21 pieces of a full setup, in the order of `con.PIECE_COUNTS`
+SETUP_RANKS = [
+    RANK_OF[name] for name, n_pieces in con.PIECE_COUNTS.items() for _ in range(n_pieces)
+]
+FLAG_INDEX = SETUP_RANKS.index(RANK_OF["FLAG"])
+SPY_RANK = RANK_OF["SPY"]
+MAX_TRIES = 10000
+
+
+def flag_in_back_row(ranks: list[int], squares: list[int]) -> bool:
+    """
+    Constraint satisfied if the flag (if any) is placed in the back row.
+    """
+    return all(square < con.BOARD_WID for rank, square in zip(ranks, squares) if not rank)
+
+
+def spies_not_adjacent(ranks: list[int], squares: list[int]) -> bool:
+    """
+    Constraint satisfied if no two spies are placed next to each other.
+    """
+    spies = [divmod(square, con.BOARD_WID) for rank, square in zip(ranks, squares)
+             if rank == SPY_RANK]
+    return not any(
+        abs(row_a - row_b) + abs(x_a - x_b) == 1
+        for i, (row_a, x_a) in enumerate(spies) for row_b, x_b in spies[i + 1:]
+    )
+
+
+def flag_in_back_row_batch(setups):
+    """
+    Vectorized `flag_in_back_row` for an array of full setups.
+    """
+    return setups[:, FLAG_INDEX] < con.BOARD_WID
+
+
+def spies_not_adjacent_batch(setups):
+    """
+    Vectorized `spies_not_adjacent` for an array of full setups (which hold exactly two spies).
+    """
+    spy_a, spy_b = (setups[:, i].astype(int) for i, rank in enumerate(SETUP_RANKS)
+                    if rank == SPY_RANK)
+    distance = abs(spy_a // con.BOARD_WID - spy_b // con.BOARD_WID) \
+        + abs(spy_a % con.BOARD_WID - spy_b % con.BOARD_WID)
+    return distance != 1
+
+
+CONSTRAINTS: dict[str, tuple[Callable[[list[int], list[int]], bool], Callable]] = {
+    "flag-back-row": (flag_in_back_row, flag_in_back_row_batch),
+    "spies-apart": (spies_not_adjacent, spies_not_adjacent_batch),
+}
+
+
+def to_board_coords(square: int, opp: bool) -> tuple[int, int]:
+    """
+    Convert the setup square `square` of the user (or opponent, if `opp` is `True`) into board
+    coordinates.
+    """
+    row = square // con.BOARD_WID
+    return square % con.BOARD_WID, con.BOARD_LEN - 1 - row if opp else row
+
+
+def sample_setup(rng: Random, ranks: list[int] = SETUP_RANKS, free: list[int] | None = None,
+                 constraints: tuple[str, ...] = ()) -> list[int]:
+    """
+    Returns a setup square for each piece of rank in `ranks`, sampled uniformly (drawing from
+    `rng`) among the `free` setup squares (all by default) subject to `constraints`.
+    """
+    free = list(range(N_SETUP_SQUARES)) if free is None else free
+    checks = [CONSTRAINTS[name][0] for name in constraints]
+    for _ in range(MAX_TRIES):
+        squares = rng.sample(free, len(ranks))
+        if all(check(ranks, squares) for check in checks):
+            return squares
+    raise ValueError(f"No setup satisfies the constraints {constraints}.")
+
+
+def place_randomly(board: Board, remaining_pieces: dict[str, int], opp: bool, rng: Random,
+                   constraints: tuple[str, ...] = ()) -> list[Piece]:
+    """
+    Places all pieces in `remaining_pieces` at random (drawing from the generator `rng`) on
+    `board` and returns the placed `Piece` objects. If `opp` is set to `False`, piece placement is
+    randomised in the user's side of the board.
+    """
+    ranks = [RANK_OF[name] for name, n_pieces in remaining_pieces.items() for _ in range(n_pieces)]
+    free = [
+        square for square in range(N_SETUP_SQUARES)
+        if board.get_at(*to_board_coords(square, opp)) is None
+    ]
+
+    placed = place_setup(board, ranks, sample_setup(rng, ranks, free, constraints), opp)
+    for piece in remaining_pieces:
+        remaining_pieces[piece] = 0
+    return placed
+
+
+def place_setup(board: Board, ranks: list[int], squares: list[int], opp: bool) -> list[Piece]:
+    """
+    Places a piece of each rank in `ranks` at the matching setup square of `squares` on `board` and
+    returns the placed `Piece` objects. If `opp` is set to `False`, pieces are placed in the user's
+    side of the board.
+    """
+    placed: list[Piece] = []
+    for rank, square in zip(ranks, squares):
+        piece_obj = FACTORIES[rank].generate_piece()
+        if opp:
+            piece_obj.set_opp()
+        board.place(piece_obj, *to_board_coords(square, opp))
+        if opp and isinstance(piece_obj, Flag):
+            board.set_opp_flag(piece_obj)
+        placed.append(piece_obj)
+    return placed
+
+
+def sample_setups(n_setups: int, seed: SeedSequence, constraints: tuple[str, ...] = ()):
+    """
+    Returns a `numpy` array of `n_setups` full setups sampled uniformly subject to `constraints`,
+    with one row per setup holding the setup square of each piece of `SETUP_RANKS`.
+    """
+    import numpy as np
+
+    gen = np.random.default_rng(seed.generate_state())
+    setups = np.empty((n_setups, len(SETUP_RANKS)), dtype=np.uint8)
+    todo = np.arange(n_setups)
+    while todo.size:
+        # The first 21 columns of a uniformly random permutation of all setup squares
+        keys = gen.random((todo.size, N_SETUP_SQUARES))
+        if "flag-back-row" in constraints:
+            # Sort a random back row square first (i.e. for the flag, as FLAG_INDEX is 0), so the
+            # constraint never rejects a setup
+            keys[np.arange(todo.size), gen.integers(0, con.BOARD_WID, todo.size)] = -1.0
+        batch = np.argsort(keys, axis=1)
+        batch = batch[:, :len(SETUP_RANKS)].astype(np.uint8)
+        accepted = np.ones(todo.size, dtype=bool)
+        for name in constraints:
+            accepted &= CONSTRAINTS[name][1](batch)
+        setups[todo[accepted]] = batch[accepted]
+        todo = todo[~accepted]
+    return setups
+
+
+def setups_to_squares(setups):
+    """
+    Convert a `numpy` array of setups (see `sample_setups`) into an array holding, for every setup
+    square, the rank of its piece plus one (or `0` if empty), like `gog.components.codec`.
+    """
+    import numpy as np
+
+    squares = np.zeros((len(setups), N_SETUP_SQUARES), dtype=np.uint8)
+    squares[np.arange(len(setups))[:, None], setups] = np.array(SETUP_RANKS, dtype=np.uint8) + 1
+    return squares
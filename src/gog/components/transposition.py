@@ -0,0 +1,139 @@
+"""
+Module containing the `TranspositionTable` class, a table of search results shared by every
+search process on a host.
+
+The table lives in a `multiprocessing.shared_memory` block: a 16-byte header (the search
+generation) followed by buckets of two 16-byte entries. An entry is two 64-bit words, the packed
+data (score as a 32-bit float, depth, bound type and generation, and move) and the position hash
+XORed with the data. Writers never lock: a torn or concurrent write leaves an entry whose words
+don't XOR back to the hash, which readers then treat as a miss.
+
+The first entry of a bucket keeps the deepest result (unless it's from an older generation) and
+the second always takes the newest one.
+"""
+from multiprocessing.shared_memory import SharedMemory
+from struct import Struct
+
+
+ENTRY_SIZE = 16
+HEADER_SIZE = 16
+BUCKET_ENTRIES = 2
+DEFAULT_SIZE_MB = 16
+# Bound types of a stored score
+EXACT = 1
+LOWER = 2
+UPPER = 3
+NO_MOVE = 0xFFFF
+DATA = Struct("<fBBH")
+WORD = Struct("<Q")
+
+
+class TranspositionTable:
+    """
+    Class representing a transposition table in shared memory: a new one of at most `size_mb`
+    megabytes, or the existing one called `name`. Tables are pickled by name, so they can be handed
+    to worker processes, which attach to the same memory.
+    """
+    def __init__(self, size_mb: float = DEFAULT_SIZE_MB, name: str | None = None) -> None:
+        if name is None:
+            n_buckets = 1
+            while 2 * n_buckets * BUCKET_ENTRIES * ENTRY_SIZE <= size_mb * 2**20 - HEADER_SIZE:
+                n_buckets *= 2
+            self.shm = SharedMemory(create=True,
+                                    size=HEADER_SIZE + n_buckets * BUCKET_ENTRIES * ENTRY_SIZE)
+            self.owner = True
+        else:
+            # Child processes share the resource tracker of their parent, which frees the block
+            # if the creator never does
+            self.shm = SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+        # Word 0 is the generation, then 2 words per entry
+        self.words = self.shm.buf.cast("Q")
+        self.n_buckets = (len(self.words) - HEADER_SIZE // 8) // (2 * BUCKET_ENTRIES)
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def __del__(self) -> None:
+        # The view must go before the block can be closed (which `SharedMemory` does on deletion)
+        if hasattr(self, "words"):
+            self.words.release()
+
+    def __reduce__(self):
+        return TranspositionTable, (0, self.name)
+
+    def close(self) -> None:
+        """
+        Detach from the table, freeing its memory if this is the table which created it.
+        """
+        self.words.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def clear(self) -> None:
+        """
+        Empty the table.
+        """
+        self.shm.buf[:] = bytes(len(self.shm.buf))
+
+    @property
+    def generation(self) -> int:
+        """
+        The generation of new entries, which is shared by every process.
+        """
+        return self.words[0]
+
+    def new_generation(self) -> None:
+        """
+        Age every entry in the table, e.g. before searching a new position.
+        """
+        self.words[0] = (self.words[0] + 1) & 0x3F
+
+    def __index(self, key: int) -> int:
+        # Index of the first word of the bucket of `key`
+        return HEADER_SIZE // 8 + (key & (self.n_buckets - 1)) * 2 * BUCKET_ENTRIES
+
+    def probe(self, key: int) -> tuple[float, int, int, int] | None:
+        """
+        Returns the score, depth, bound type and move (`NO_MOVE` if none) stored for the position
+        with the hash `key`, or `None` if it isn't stored.
+        """
+        self.probes += 1
+        words = self.words
+        index = self.__index(key)
+        for slot in range(index, index + 2 * BUCKET_ENTRIES, 2):
+            data = words[slot + 1]
+            if words[slot] ^ data == key:
+                self.hits += 1
+                score, depth, bound, move = DATA.unpack(WORD.pack(data))
+                return score, depth, bound & 3, move
+        return None
+
+    def store(self, key: int, score: float, depth: int, bound: int, move=NO_MOVE) -> None:
+        """
+        Store the `score` of the position with the hash `key` searched `depth` plies deep, its
+        `bound` type (`EXACT`, `LOWER` or `UPPER`) and the best move found (an index, see
+        `gog.components.search`).
+        """
+        self.stores += 1
+        words = self.words
+        index = self.__index(key)
+        generation = words[0]
+        data = WORD.unpack(DATA.pack(score, min(depth, 255), bound | generation << 2, move))[0]
+        first = words[index + 1]
+        replace_first = words[index] ^ first == key or (first >> 40 & 0xFF) >> 2 != generation \
+            or depth >= (first >> 32 & 0xFF)
+        slot = index if replace_first else index + 2
+        words[slot] = key ^ data
+        words[slot + 1] = data
+
+    def usage(self) -> float:
+        """
+        Returns the fraction of entries written in the current generation.
+        """
+        generation = self.words[0]
+        data = self.words[HEADER_SIZE // 8 + 1::2]
+        used = sum(1 for word in data if word and (word >> 40 & 0xFF) >> 2 == generation)
+        return used / len(data)
@@ -0,0 +1,116 @@
+"""
+Module containing the bulk validator of submitted setups (formations).
+
+A setup is a list of placements in the format of manual piece placement (`<PIECE> <POSITION>`,
+e.g. `CPT H2`). Every placement is parsed with table lookups only, then all checks of
+`gog.run.place_pieces` run at once over the whole batch.
+
+Requires the `numpy` module to work (see README.md).
+"""
+import numpy as np
+from gog.components.game import indices_to_coords
+from gog.components.piece import PIECES
+from gog.config import constants as con
+
+
+PIECE_NAMES = list(PIECES)
+N_RANKS = len(PIECE_NAMES)
+N_SQUARES = con.BOARD_LEN * con.BOARD_WID
+SETUP_ROWS = 3
+NAME_TO_RANK: dict[str, int] = {
+    keyword: PIECE_NAMES.index(name) for keyword, name in con.KEYWORD_MAPPER.items()
+}
+POS_TO_SQUARE: dict[str, int] = {
+    indices_to_coords(x, y): y * con.BOARD_WID + x
+    for y in range(con.BOARD_LEN) for x in range(con.BOARD_WID)
+}
+EXPECTED_COUNTS = np.array([con.PIECE_COUNTS[name] for name in PIECE_NAMES])
+
+
+def split_placement(placement: str) -> tuple[str, str]:
+    """
+    Returns the piece and position inputs of `placement`.
+    """
+    tokens = placement.split()
+    return " ".join(tokens[:-1]), tokens[-1] if tokens else ""
+
+
+def parse_placement(placement: str) -> tuple[int, int]:
+    """
+    Returns the rank and board square (`y * BOARD_WID + x`) of `placement`, each being `-1` if
+    invalid.
+    """
+    piece_input, pos_input = split_placement(placement.upper())
+    return NAME_TO_RANK.get(piece_input, -1), POS_TO_SQUARE.get(pos_input, -1)
+
+
+def validate_setups(setups: list[list[str]]) -> list[list[tuple[int, int, str]]]:
+    """
+    Validate every setup of `setups`. Returns, for each setup, a list of errors as tuples of the
+    status code, the index of the offending placement (or `-1` if the error concerns the whole
+    setup) and a message. A setup is valid if its list of errors is empty.
+    """
+    n_setups = len(setups)
+    lengths = [len(setup) for setup in setups]
+    parsed = [parse_placement(placement) for setup in setups for placement in setup]
+    ranks = np.array([rank for rank, _ in parsed], dtype=np.int64)
+    squares = np.array([square for _, square in parsed], dtype=np.int64)
+    setup_ids = np.repeat(np.arange(n_setups), lengths)
+    starts = np.concatenate(([0], np.cumsum(lengths)))
+    errors: list[list[tuple[int, int, str]]] = [[] for _ in range(n_setups)]
+
+    def add_entry_errors(mask: np.ndarray, code: int, message) -> None:
+        for i in np.flatnonzero(mask):
+            setup_id = setup_ids[i]
+            entry = int(i - starts[setup_id])
+            piece_input, pos_input = split_placement(setups[setup_id][entry])
+            errors[setup_id].append((code, entry, message(i, piece_input, pos_input)))
+
+    add_entry_errors(
+        ranks < 0, con.INVALID_PIECE,
+        lambda i, piece_input, _: f"No such piece '{piece_input}' exists."
+    )
+    in_setup_rows = (squares >= 0) & (squares < SETUP_ROWS * con.BOARD_WID)
+    add_entry_errors(
+        ~in_setup_rows, con.FORBIDDEN_POS,
+        lambda i, _, pos_input: f"Invalid or forbidden position '{pos_input}'."
+    )
+
+    # Overlaps: valid placements on a square taken by an earlier one of the same setup. Sorting
+    # (stably) by setup and square groups such placements right after the first one.
+    placed = in_setup_rows & (ranks >= 0)
+    keys = np.where(placed, setup_ids * N_SQUARES + squares, -1 - np.arange(len(squares)))
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    group_start = np.ones(len(keys), dtype=bool)
+    group_start[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    first_in_group = order[np.maximum.accumulate(np.where(group_start, np.arange(len(keys)), 0))]
+    first_at = np.empty(len(keys), dtype=np.int64)
+    first_at[order] = first_in_group
+    overlaps = first_at != np.arange(len(keys))
+    add_entry_errors(
+        overlaps, con.OCCUPIED_CELL,
+        lambda i, _, pos_input: f"{pos_input.upper()} occupied by "
+                                f"{PIECE_NAMES[ranks[first_at[i]]]}."
+    )
+
+    # Piece counts of each setup (over the placements which passed every check above) against
+    # those of a full set of pieces
+    accepted = placed & ~overlaps
+    counts = np.bincount(
+        setup_ids[accepted] * N_RANKS + ranks[accepted], minlength=n_setups * N_RANKS
+    ).reshape(n_setups, N_RANKS)
+    for setup_id, rank in zip(*np.nonzero(counts != EXPECTED_COUNTS)):
+        name, count, expected = PIECE_NAMES[rank], counts[setup_id, rank], EXPECTED_COUNTS[rank]
+        if count > expected:
+            errors[setup_id].append(
+                (con.NO_PIECES_LEFT, -1, f"Too many pieces of {name} ({count}/{expected}).")
+            )
+        else:
+            errors[setup_id].append(
+                (con.MISSING_PIECE, -1, f"Missing pieces of {name} ({count}/{expected}).")
+            )
+
+    for setup_errors in errors:
+        setup_errors.sort(key=lambda error: (error[1] < 0, error[1]))
+    return errors
@@ -0,0 +1,78 @@
+"""
+Module containing the `ZobristHash` class, which maintains a 64-bit hash of the position on a
+board.
+
+The hash is the XOR of a random key for every (square, piece) pair on the board, so it's updated
+on every change of a square (see `Board.add_listener`) with two XORs. The keys are drawn from a
+generator with a fixed seed, so every process computes the same hash for the same position.
+"""
+from gog.components.board import Board
+from gog.components.contact import N_SQUARES
+from gog.components.piece import PIECES
+from gog.components.rng import SplitMix
+from gog.config import constants as con
+
+
+ZOBRIST_SEED = 0x60C0FFEE
+N_CODES = 2 * len(PIECES) + 1
+
+
+def piece_code(piece) -> int:
+    """
+    Returns the index of `piece` in the keys of a square (0 for an empty square).
+    """
+    if piece is None:
+        return 0
+    return piece.rank + 1 + (len(PIECES) if piece.opp else 0)
+
+
+def generate_keys() -> tuple[list[list[int]], int, dict[int, int]]:
+    """
+    Returns the keys of every square and piece code (empty squares hashing to 0), the key of the
+    opponent to move and the key of each final state.
+    """
+    rng = SplitMix(ZOBRIST_SEED)
+    square_keys = [
+        [0] + [rng.getrandbits(64) for _ in range(N_CODES - 1)] for _ in range(N_SQUARES)
+    ]
+    opp_key = rng.getrandbits(64)
+    state_keys = {0: 0, con.USR_END: rng.getrandbits(64), con.OPP_END: rng.getrandbits(64)}
+    return square_keys, opp_key, state_keys
+
+
+SQUARE_KEYS, OPP_KEY, STATE_KEYS = generate_keys()
+
+
+class ZobristHash:
+    """
+    Class representing the hash of the position on a board.
+    """
+    def __init__(self, board: Board) -> None:
+        self.key = 0
+        for y, row in enumerate(board.list_repr):
+            for x, piece in enumerate(row):
+                self.key ^= SQUARE_KEYS[y * con.BOARD_WID + x][piece_code(piece)]
+
+    @classmethod
+    def attach(cls, board: Board) -> "ZobristHash":
+        """
+        Returns the hash of `board`, registered as a listener of `board` to stay up to date.
+        """
+        zobrist = cls(board)
+        board.add_listener(zobrist)
+        return zobrist
+
+    def on_square(self, x: int, y: int, old, new) -> None:
+        """
+        Update the hash after the `Piece` object on (`x`, `y`) changed from `old` to `new` (either
+        may be `None`).
+        """
+        keys = SQUARE_KEYS[y * con.BOARD_WID + x]
+        self.key ^= keys[piece_code(old)] ^ keys[piece_code(new)]
+
+    def position_key(self, opp_to_move=False, final_state=0) -> int:
+        """
+        Returns the hash of the position with the opponent (if `opp_to_move` is `True`) or the user
+        to move and the final state `final_state` pending.
+        """
+        return self.key ^ (OPP_KEY if opp_to_move else 0) ^ STATE_KEYS[final_state]
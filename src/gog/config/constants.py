@@ -1,7 +1,7 @@
 """
 Module containing important constants used in the game.
 """
-from typing import Callable
+from collections.abc import Callable
 
 
 ORD_OFFSET = 97
@@ -11,6 +11,12 @@ SUCCESS = 0
 EMPTY_CELL = 1
 OUT_OF_BOUNDS = 2
 FRIENDLY_FIRE = 3
+INVALID_PIECE = 4
+NO_PIECES_LEFT = 5
+FORBIDDEN_POS = 6
+OCCUPIED_CELL = 7
+ENEMY_SELECTED = 8
+MISSING_PIECE = 9
 
 MOVE_MADE = 0
 OPP_ELIM = 1
@@ -54,3 +60,10 @@ KEYWORD_MAPPER: dict[str, str] = {
     "GENERAL OF THE ARMY": "GENERAL OF THE ARMY", "GOA": "GENERAL OF THE ARMY",
     "SPY": "SPY"
 }
+
+PIECE_COUNTS: dict[str, int] = {
+    "FLAG": 1, "PRIVATE": 6, "SERGEANT": 1, "2ND LIEUTENANT": 1, "1ST LIEUTENANT": 1,
+    "CAPTAIN": 1, "MAJOR": 1, "LIEUTENANT COLONEL": 1, "COLONEL": 1, "BRIGADIER GENERAL": 1,
+    "MAJOR GENERAL": 1, "LIEUTENANT GENERAL": 1, "GENERAL": 1, "GENERAL OF THE ARMY": 1,
+    "SPY": 2
+}
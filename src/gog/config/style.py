@@ -1,16 +1,20 @@
 """
 Module containing formatting-related constants and functions.
 
+Formatted strings never change, so each one is rendered once and cached.
+
 Requires the `termcolor` module to work (see README.md).
 """
-from typing import Callable
+from collections.abc import Callable
+from functools import lru_cache
 from termcolor import colored
 
 
-BOLD: Callable[[str], str] = lambda target: colored(target, attrs=["bold"])
-BLINK: Callable[[str], str] = lambda target: colored(target, attrs=["blink"])
+BOLD: Callable[[str], str] = lru_cache(lambda target: colored(target, attrs=["bold"]))
+BLINK: Callable[[str], str] = lru_cache(lambda target: colored(target, attrs=["blink"]))
 
 
+@lru_cache
 def to_banner(title: str) -> str:
     """
     Returns a formatted string `title` as a banner.
@@ -21,6 +25,7 @@ def to_banner(title: str) -> str:
     return BOLD(left_side + star + title + star + right_side)
 
 
+@lru_cache
 def marker_formatting(mark: str, colour: str) -> str:
     """
     Returns a formatted string `mark` as a console marker with colour `colour`.
@@ -1,13 +1,19 @@
 """
 Module responsible for running the game.
 """
-from math import ceil
+import builtins
 import os
-from random import choice, random, randrange
-from time import sleep
+import sys
+from time import perf_counter, sleep
+from types import SimpleNamespace
 from gog.components.board import Board
+from gog.components.events import GameOver
+from gog.components.game import indices_to_coords, parse_coords
 from gog.components.operation import MOVES
-from gog.components.piece import Flag, Piece, PIECES
+from gog.components.opponent import choose_move
+from gog.components.piece import Piece, PIECES
+from gog.components.rng import SeedSequence, SplitMix
+from gog.components.setups import place_randomly
 from gog.config import constants as con
 from gog.config.style import marker_formatting, to_banner, BLINK, BOLD
 
@@ -21,6 +27,12 @@ marker = ""
 in_game = False
 final_state = 0
 board = Board()
+rng: SplitMix = None
+hint_rng: SplitMix = None
+# Search choosing the opponent's moves (see `gog.components.parallel`), random moves if `None`
+opponent_search = None
+# Policy/value model choosing the opponent's moves (see `gog.components.model`) if not searching
+opponent_model = None
 
 
 def set_piece_dict() -> None:
@@ -29,12 +41,7 @@ def set_piece_dict() -> None:
     must be placed on the board.
     """
     global remaining_pieces
-    remaining_pieces = {
-        "FLAG": 1, "PRIVATE": 6, "SERGEANT": 1, "2ND LIEUTENANT": 1, "1ST LIEUTENANT": 1,
-        "CAPTAIN": 1, "MAJOR": 1, "LIEUTENANT COLONEL": 1, "COLONEL": 1, "BRIGADIER GENERAL": 1,
-        "MAJOR GENERAL": 1, "LIEUTENANT GENERAL": 1, "GENERAL": 1, "GENERAL OF THE ARMY": 1,
-        "SPY": 2
-    }
+    remaining_pieces = dict(con.PIECE_COUNTS)
 
 
 def clear_game() -> None:
@@ -43,7 +50,10 @@ def clear_game() -> None:
     state).
     """
     global board, final_state
+    # Subscribers to the events of the game (see `gog.components.events`) carry on to the next
+    events = board.events
     board = Board()
+    board.events = events
     opp_pieces.clear()
     final_state = 0
     set_piece_dict()
@@ -177,6 +187,7 @@ def print_in_game_commands() -> None:
     print("OTHER SUPPORTED COMMANDS")
     print("=" * con.PRINT_LEN(con.BOARD_WID))
     print("(WHICH <POS>)      View name of piece at <POS>")
+    print("(HINT)                  Suggest a move to make")
     print("(LEGEND/L)                   View emoji legend")
     print("(FORFEIT)                     Forfeit the game")
     print("(CTRL+C / CTRL+D)                   Force exit\n")
@@ -189,32 +200,6 @@ def empty_box() -> bool:
     return all(n_pieces == 0 for n_pieces in list(remaining_pieces.values()))
 
 
-def parse_coords(raw_inp: str) -> tuple[int, int] | tuple[None, None]:
-    """
-    Parses `raw_input` for valid coordinates. Returns tuple of 0-indexed coordinates if successful
-    and tuple of `None` values if not.
-    """
-    inp = raw_inp.lower()
-    if len(inp) != 2:
-        return None, None
-    x = ord(inp[0]) - con.ORD_OFFSET
-    if x < 0 or x > 8 or not inp[1].isnumeric():
-        return None, None
-    y = int(inp[1])
-
-    if y < 1 or y > 8:
-        return None, None
-    return x, y - 1
-
-
-def indices_to_coords(x: int, y: int) -> str:
-    """
-    Convert zero-based indices `x` and `y` for accessing the list representation of the board into
-    valid, command-formatted coordinates.
-    """
-    return f"{chr(x + con.CHR_OFFSET)}{y + 1}"
-
-
 def show_piece_box() -> None:
     """
     Display all remaining unplaced pieces and their quantities to `stdout`.
@@ -255,24 +240,9 @@ def randomise_piece_placement(opp=True) -> None:
     in the user's side of the board.
     """
     if opp:
-        set_piece_dict()
-
-    for piece in list(remaining_pieces):
-        y_lower_bound = 5 if opp else 0
-        y_upper_bound = 8 if opp else 3
-        n_pieces = remaining_pieces.get(piece)
-
-        for _ in range(n_pieces):
-            piece_obj = PIECES.get(piece).generate_piece()
-            if opp:
-                piece_obj.set_opp()
-                opp_pieces.append(piece_obj)
-            x, y = randrange(9), randrange(y_lower_bound, y_upper_bound)
-            while board.get_at(x, y) is not None:
-                x, y = randrange(9), randrange(y_lower_bound, y_upper_bound)
-            board.place(piece_obj, x, y)
-            if isinstance(piece_obj, Flag):
-                board.set_opp_flag(piece_obj)
+        opp_pieces.extend(place_randomly(board, dict(con.PIECE_COUNTS), True, rng))
+    else:
+        place_randomly(board, remaining_pieces, False, rng)
 
 
 def place_pieces() -> int:
@@ -407,6 +377,8 @@ def handle_turn(result: int) -> None:
                 set_console("The opponent captured your FLAG 🏳️.")
 
         if result < 0: # i.e. if result == con.USR_WINNER or result == con.OPP_WINNER
+            if board.events.active:
+                board.events.emit(GameOver(result))
             reveal_opp_pieces()
             os.system(clear)
             board_and_console()
@@ -426,6 +398,9 @@ def handle_turn(result: int) -> None:
             set_console("The opponent's FLAG 🏴 successfully reached the end of the board!")
 
     if final_state: # i.e. if final_state matches any of the above cases
+        if board.events.active:
+            winner = con.USR_WINNER if final_state == con.USR_END else con.OPP_WINNER
+            board.events.emit(GameOver(winner))
         reveal_opp_pieces()
         os.system(clear)
         board_and_console()
@@ -436,10 +411,36 @@ def handle_turn(result: int) -> None:
     return 0
 
 
+def decide_opponent_move() -> tuple[int, int, str]:
+    """
+    Returns the position of the opponent piece to move and the name of its move, chosen by the
+    search if any, otherwise by the model if any, otherwise at random.
+    """
+    searched_move = None
+    if opponent_search is not None:
+        from gog.components.parallel import OPPONENT_BUDGET
+        searched_move = opponent_search.best_move(
+            board, rng, True, final_state, budget=OPPONENT_BUDGET
+        )
+    if searched_move is None and opponent_model is not None:
+        searched_move = opponent_model.choose_move(board, rng)
+    if searched_move is not None:
+        return searched_move
+    opp_choice, chosen_move = choose_move(board, opp_pieces, rng)
+    opp_x, opp_y = opp_choice.get_pos()
+    return opp_x, opp_y, chosen_move
+
+
 def handle_game() -> None:
     """
-    Handles the actual game mechanics between user and simulation (using `random.randrange`).
+    Handles the actual game mechanics between user and simulation (using the generator `rng`).
     """
+    global rng, hint_rng
+    if rng is None:
+        rng = SeedSequence().rng()
+    if hint_rng is None:
+        hint_rng = SeedSequence().rng()
+
     if place_pieces():
         set_game_status(False)
         return
@@ -467,6 +468,8 @@ def handle_game() -> None:
                 continue
             case "forfeit":
                 if verify_user_action("forfeit"):
+                    if board.events.active:
+                        board.events.emit(GameOver(con.OPP_WINNER))
                     set_console_status()
                     set_console("Game forfeited. Exiting to main menu...")
                     reveal_opp_pieces()
@@ -476,6 +479,18 @@ def handle_game() -> None:
                     break
                 set_console("It's your turn!")
                 continue
+            case "hint":
+                # Imported here as hints are rarely asked for and the search takes a while to import
+                # (on the clock of the hint, as it delays the first one)
+                hint_start = perf_counter()
+                from gog.components.search import HINT_BUDGET, hint
+                move = hint(board, hint_rng, final_state, budget=HINT_BUDGET, start=hint_start)
+                set_console_status()
+                if move is None:
+                    set_console("Hint: no move available.")
+                else:
+                    set_console(f"Hint: {indices_to_coords(move[0], move[1])} {move[2].upper()}")
+                continue
 
         cmd_tokens = cmd.split()
         if len(cmd_tokens) != 2:
@@ -542,61 +557,7 @@ def handle_game() -> None:
         board_and_console()
         sleep(2)
 
-        challenger_pieces = [
-            challenger for challenger in opp_pieces
-            if challenger.active and board.can_be_challenged(challenger)
-        ]
-
-        opp_choice: Piece = None
-        valid_moves: list[str] = []
-        # If at least one opponent piece has an adjacent challengeable piece, randomly
-        # choose from those pieces to move
-        if challenger_pieces:
-            opp_choice = choice(challenger_pieces)
-            # Append 'challengeable' moves to valid_moves array to make challenge more likely
-            normal_move = ((board.can_be_challenged(opp_choice) * 2)
-                           + board.get_valid_moves(opp_choice))
-
-            # If the chosen piece is a flag, escape from any challengeable piece 80% of the time
-            if isinstance(opp_choice, Flag):
-                random_bool = random() < 0.8
-                escape_move = [
-                    move for move in board.get_valid_moves(opp_choice)
-                    if move not in board.can_be_challenged(opp_choice)
-                ]
-                valid_moves = escape_move if random_bool and escape_move else normal_move
-            else:
-                valid_moves = normal_move
-
-        # Next, check if there is a clear path from flag to end of board
-        elif board.clear_path_to_end():
-            opp_choice = board.get_opp_flag()
-            valid_moves = ["down"]
-
-        # Otherwise, select a piece from a list of moveable, active opponent pieces
-        else:
-            movable_opp_pieces = [
-                opp_p for opp_p in opp_pieces
-                if opp_p.active and not board.is_surrounded(opp_p)
-            ]
-            # Get first 1/3rd half of frontmost pieces to append to original movable_opp_pieces so
-            # frontmost pieces are more likely chosen
-            movable_opp_pieces.sort(key=lambda p: p.get_pos()[1])
-            pieces_in_front = movable_opp_pieces[:ceil(len(movable_opp_pieces) / 5)]
-            # Get first 1/3rd half of pieces w/ highest rank and append to original
-            # movable_opp_pieces so more powerful pieces are more likely chosen
-            pieces_in_front.sort(key=lambda p: p.rank, reverse=True)
-            high_ranked_pieces = pieces_in_front[:ceil(len(pieces_in_front) / 5)]
-            movable_opp_pieces += (pieces_in_front + high_ranked_pieces) * 5
-            opp_choice = choice(movable_opp_pieces)
-
-            # Implement biased random selection so piece is more likely to move forward, i.e. 'down'
-            valid_moves = board.get_valid_moves(opp_choice)
-            if "down" in valid_moves:
-                valid_moves += ["down"] * 2
-
-        opp_x, opp_y = opp_choice.get_pos()
-        chosen_move = choice(valid_moves)
+        opp_x, opp_y, chosen_move = decide_opponent_move()
 
         set_console(f"{indices_to_coords(opp_x, opp_y)} {chosen_move.upper()}")
         os.system(clear)
@@ -612,6 +573,28 @@ def handle_game() -> None:
     set_game_status(False)
 
 
+def instrument(profiler) -> None:
+    """
+    Instrument board queries, challenge resolution, opponent decisions, rendering, input wait and
+    hard-coded delays with timers of `profiler`.
+    """
+    module = sys.modules[__name__]
+    for name in ("get_at", "place", "move", "get_valid_moves", "can_be_challenged", "is_surrounded",
+                 "clear_path_to_end"):
+        profiler.instrument(Board, name, f"board.{name}")
+
+    piece_classes = [Piece]
+    for piece_class in piece_classes:
+        piece_classes.extend(piece_class.__subclasses__())
+        if "attack" in vars(piece_class):
+            profiler.instrument(piece_class, "attack", "challenge")
+
+    profiler.instrument(module, "decide_opponent_move", "opponent_decision")
+    profiler.instrument(module, "board_and_console", "render")
+    setattr(module, "input", profiler.wrap("input_wait", builtins.input))
+    profiler.instrument(module, "sleep", "sleep")
+
+
 def start() -> None:
     """
     Starts the actual game. Called in the entry point of the code.
@@ -644,13 +627,58 @@ def start() -> None:
                 set_console(f"Unknown command '{cmd}'.")
 
 
+def parse_args(argv: list[str]):
+    """
+    Parse the command-line arguments `argv`. `argparse` (which takes a while to import) is only
+    imported if there are any.
+    """
+    if not argv:
+        return SimpleNamespace(profile=None, profile_dir="profile", search_workers=None,
+                               model=None)
+
+    import argparse
+    from gog.components.profiling import PROFILE_MODES
+
+    parser = argparse.ArgumentParser(description="Play Game of the Generals.")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=PROFILE_MODES,
+                        help="record per-phase statistics and a cProfile profile (default) or "
+                             "sampled call stacks, written at exit")
+    parser.add_argument("--profile-dir", default="profile", help="directory of profile output")
+    parser.add_argument("--search-workers", type=int, metavar="N",
+                        help="let the opponent search its moves on N processes (0 for all cores) "
+                             "instead of moving at random")
+    parser.add_argument("--model", metavar="PATH",
+                        help="let the opponent draw its moves from the policy/value model saved at "
+                             "PATH (see gog.tools.train) instead of moving at random")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+
     # Configure 'clear screen' command based on the OS of the user.
     if os.name == "posix":
         clear = "clear"
     else:
         clear = "cls"
 
+    profiler = None
+    if args.profile:
+        from gog.components.profiling import Profiler
+
+        profiler = Profiler(args.profile)
+        instrument(profiler)
+        profiler.start()
+
+    if args.search_workers is not None:
+        from gog.components.parallel import ParallelSearch
+
+        opponent_search = ParallelSearch(args.search_workers or None)
+    if args.model is not None:
+        from gog.components.model import PolicyValueModel
+
+        opponent_model = PolicyValueModel.load(args.model)
+
     try:
         start()
     except (KeyboardInterrupt, EOFError):
@@ -659,3 +687,9 @@ if __name__ == "__main__":
         sleep(2)
     finally:
         os.system(clear)
+        if opponent_search is not None:
+            opponent_search.close()
+        if profiler is not None:
+            profiler.stop()
+            print(profiler.summary())
+            print(f"\nProfile written to {', '.join(profiler.dump(args.profile_dir))}.")
@@ -0,0 +1,257 @@
+"""
+Module containing the `Journal` class, a crash-safe append-only log of every game hosted by the
+game server.
+
+Each record holds a CRC32 checksum, the game ID, an operation and its payload. Setup placements
+and moves are logged as they are made (opponent moves along with the state of the opponent's
+generator after choosing them, so a recovered game goes on drawing the same numbers), while any
+state change which can't be replayed (e.g. the opponent arranging its pieces at random) is logged
+as a snapshot of the whole game (see `gog.components.codec`). Records are written and `fsync`ed
+in batches by a single background task, so every command waiting on `Journal.commit` shares the
+cost of one `fsync` (group commit).
+"""
+import asyncio
+import os
+import struct
+import threading
+from typing import Iterator
+from zlib import crc32
+from gog.components.codec import deserialize_game, serialize_game
+from gog.components.game import Game
+from gog.components.operation import MOVES
+from gog.components.rng import SplitMix
+from gog.config import constants as con
+
+
+SNAPSHOT = 0
+PLACE = 1
+UNDO = 2
+MOVE = 3
+OPP_MOVE = 4
+CLOSE = 5
+
+# Checksum, game ID, operation, payload length
+RECORD_HEADER = struct.Struct("<IIBH")
+# Square and move index of a move, then the state of the opponent's generator after an opponent
+# move
+MOVE_PAYLOAD = struct.Struct("<BB")
+GENERATOR_STATE = struct.Struct("<Q")
+MOVE_NAMES = list(MOVES)
+JOURNAL_FILE = "journal.log"
+DEFAULT_COMPACT_THRESHOLD = 2 ** 24
+
+
+def iter_records(fd) -> Iterator[tuple[int, int, int, bytes]]:
+    """
+    Yields the offset, game ID, operation and payload of every intact record in the journal file
+    `fd`, stopping at the first torn or corrupt record.
+    """
+    offset = 0
+    while len(header := fd.read(RECORD_HEADER.size)) == RECORD_HEADER.size:
+        checksum, game_id, op, length = RECORD_HEADER.unpack(header)
+        payload = fd.read(length)
+        if len(payload) != length or crc32(header[4:] + payload) != checksum:
+            return
+        yield offset, game_id, op, payload
+        offset += RECORD_HEADER.size + length
+
+
+def pack_record(game_id: int, op: int, payload=b"") -> bytes:
+    """
+    Returns the journal record of operation `op` with `payload` for the game with ID `game_id`.
+    """
+    body = RECORD_HEADER.pack(0, game_id, op, len(payload))[4:] + payload
+    return struct.pack("<I", crc32(body)) + body
+
+
+def replay(games: dict[int, Game], game_id: int, op: int, payload: bytes) -> None:
+    """
+    Apply a single journal record to `games` through the game engine.
+    """
+    if op == SNAPSHOT:
+        games[game_id] = deserialize_game(payload)
+    elif op == CLOSE:
+        games.pop(game_id, None)
+    elif op == UNDO:
+        games[game_id].undo()
+    else:
+        idx, value = MOVE_PAYLOAD.unpack_from(payload)
+        x, y = idx % con.BOARD_WID, idx // con.BOARD_WID
+        if op == PLACE:
+            games[game_id].place(list(con.PIECE_COUNTS)[value], x, y)
+        elif op == MOVE:
+            games[game_id].move(x, y, MOVE_NAMES[value])
+        elif op == OPP_MOVE:
+            games[game_id].apply_opponent_move(x, y, MOVE_NAMES[value])
+            # Records written before the generator state was logged leave it as it is
+            if len(payload) == MOVE_PAYLOAD.size + GENERATOR_STATE.size:
+                games[game_id].opp_rng.setstate(
+                    GENERATOR_STATE.unpack_from(payload, MOVE_PAYLOAD.size)[0]
+                )
+
+
+class Journal:
+    """
+    Class representing the journal of the game server, stored in `directory`. The journal is
+    compacted once it grows past `compact_threshold` bytes (and twice its size after the last
+    compaction), keeping only the records since the last snapshot of every open game.
+    """
+    def __init__(self, directory: str, compact_threshold=DEFAULT_COMPACT_THRESHOLD) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, JOURNAL_FILE)
+        self.compact_threshold = compact_threshold
+        self.batches = 0
+        self.__fd = None
+        self.__size = 0
+        self.__compacted_size = 0
+        self.__buffer = bytearray()
+        self.__waiters: list[asyncio.Future] = []
+        self.__wakeup: asyncio.Event = None
+        # Held while the file is written or swapped, as both happen in executor threads
+        self.__lock = threading.Lock()
+
+    def recover(self) -> dict[int, Game]:
+        """
+        Rebuild every open game by replaying the journal, dropping any torn record at its end (left
+        by a crash mid-write). Must be called before logging.
+        """
+        games: dict[int, Game] = {}
+        end = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as fd:
+                for offset, game_id, op, payload in iter_records(fd):
+                    replay(games, game_id, op, payload)
+                    end = offset + RECORD_HEADER.size + len(payload)
+            os.truncate(self.path, end)
+
+        self.__fd = open(self.path, "ab")
+        self.__size = self.__compacted_size = end
+        return games
+
+    def log(self, game_id: int, op: int, payload=b"") -> None:
+        """
+        Append a record to the journal. It is only durable once `commit` returns.
+        """
+        self.__buffer += pack_record(game_id, op, payload)
+
+    def log_snapshot(self, game_id: int, game: Game) -> None:
+        """
+        Append a snapshot of the whole of `game`.
+        """
+        self.log(game_id, SNAPSHOT, serialize_game(game))
+
+    def log_place(self, game_id: int, piece_name: str, x: int, y: int) -> None:
+        """
+        Append the placement of a user piece named `piece_name` at position (`x`, `y`).
+        """
+        rank = list(con.PIECE_COUNTS).index(piece_name)
+        self.log(game_id, PLACE, bytes((y * con.BOARD_WID + x, rank)))
+
+    def log_move(self, game_id: int, x: int, y: int, operation: str,
+                 opp_rng: SplitMix | None = None) -> None:
+        """
+        Append the move `operation` of the piece at (`x`, `y`): an opponent move if the opponent's
+        generator `opp_rng` (in its state after choosing the move) is given, a user move otherwise.
+        """
+        move = MOVE_PAYLOAD.pack(y * con.BOARD_WID + x, MOVE_NAMES.index(operation))
+        if opp_rng is None:
+            self.log(game_id, MOVE, move)
+        else:
+            self.log(game_id, OPP_MOVE, move + GENERATOR_STATE.pack(opp_rng.getstate()))
+
+    async def commit(self) -> None:
+        """
+        Wait until every record logged so far has been written and `fsync`ed.
+        """
+        if not self.__buffer:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self.__waiters.append(waiter)
+        self.__wakeup.set()
+        await waiter
+
+    def __write(self, data: bytes) -> None:
+        with self.__lock:
+            self.__append(data)
+
+    def __append(self, data: bytes) -> None:
+        self.__fd.write(data)
+        self.__fd.flush()
+        os.fsync(self.__fd.fileno())
+
+    async def run(self) -> None:
+        """
+        Write batches of records until cancelled. Records logged while a batch is being written
+        are grouped into the next batch.
+        """
+        self.__wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.__wakeup.wait()
+            self.__wakeup.clear()
+            data, waiters = bytes(self.__buffer), self.__waiters
+            self.__buffer, self.__waiters = bytearray(), []
+            try:
+                await loop.run_in_executor(None, self.__write, data)
+            except OSError as err:
+                for waiter in waiters:
+                    waiter.set_exception(err)
+                continue
+
+            self.batches += 1
+            self.__size += len(data)
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+            if self.__size > max(self.compact_threshold, 2 * self.__compacted_size):
+                await loop.run_in_executor(None, self.compact)
+
+    def compact(self) -> None:
+        """
+        Rewrite the journal with only the records since the last snapshot of every open game.
+        """
+        with self.__lock:
+            if self.__fd is not None:
+                self.__compact()
+
+    def __compact(self) -> None:
+        last_snapshot: dict[int, int] = {}
+        with open(self.path, "rb") as fd:
+            for offset, game_id, op, _ in iter_records(fd):
+                if op == SNAPSHOT:
+                    last_snapshot[game_id] = offset
+                elif op == CLOSE:
+                    last_snapshot.pop(game_id, None)
+
+            tmp_path = self.path + ".tmp"
+            fd.seek(0)
+            with open(tmp_path, "wb") as tmp_fd:
+                for offset, game_id, op, payload in iter_records(fd):
+                    if offset >= last_snapshot.get(game_id, float("inf")):
+                        tmp_fd.write(pack_record(game_id, op, payload))
+                tmp_fd.flush()
+                os.fsync(tmp_fd.fileno())
+
+        self.__fd.close()
+        os.replace(tmp_path, self.path)
+        # The rename is only durable once the directory itself is synced
+        dir_fd = os.open(os.path.dirname(self.path), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+        self.__fd = open(self.path, "ab")
+        self.__size = self.__compacted_size = self.__fd.tell()
+
+    def close(self) -> None:
+        """
+        Write any remaining records and close the journal.
+        """
+        with self.__lock:
+            if self.__fd is None:
+                return
+            self.__append(bytes(self.__buffer))
+            self.__buffer.clear()
+            self.__fd.close()
+            self.__fd = None
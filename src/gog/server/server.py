@@ -0,0 +1,370 @@
+"""
+Module containing the game server, which hosts many games at once over TCP.
+
+Every connection plays its own `Game` with the same commands as the terminal interface, plus
+`OPP` (let the opponent make its move), `HINT` (suggest a move, searched within a fixed node budget
+so that it's deterministic and cheap) and `NEW` (start a new game). Each command is answered
+with a single line starting with `OK`, `ERR` or `END` (the latter once the game is over).
+
+A connection may instead send `WATCH <GAME ID>` to spectate a running game (see
+`gog.server.spectator`). Idle games are spilled to disk (see `gog.server.session`) and, if a
+journal directory is given, every game is journaled (see `gog.server.journal`) so that it can be
+rebuilt after a crash and taken over again with `RESUME <GAME ID>`.
+"""
+import argparse
+import asyncio
+from itertools import count
+from gog.components.game import Game, indices_to_coords, parse_coords
+from gog.components.operation import MOVES
+from gog.components.rng import SeedSequence
+from gog.config import constants as con
+from gog.server.journal import CLOSE, UNDO, Journal
+from gog.server.session import DEFAULT_CAPACITY, SessionStore
+from gog.server.spectator import Broadcaster
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Nodes searched for a hint (see `gog.components.search`). A node budget rather than the time
+# budget of the terminal interface (`HINT_BUDGET`), so that a hint doesn't depend on the load of
+# the server and is reproducible; it takes a few tens of milliseconds
+HINT_NODES = 500
+# Bytes read at a time from a spectator, whose input is discarded
+SPECTATOR_READ = 2 ** 12
+
+
+async def wait_hang_up(reader: asyncio.StreamReader) -> None:
+    """
+    Wait until the other end of `reader` closes the connection, discarding anything it sends.
+    """
+    while await reader.read(SPECTATOR_READ):
+        pass
+
+
+class GameServer:
+    """
+    Class representing the game server. Holds every running game, keyed by its game ID, keeping
+    at most `max_hot_games` of them in memory (the rest are spilled to `spill_dir`). If
+    `journal_dir` is given, games recovered from the journal are resumed. The seeds of all games
+    are spawned from the root seed `seed`.
+    """
+    def __init__(self, spill_dir: str | None = None, max_hot_games=DEFAULT_CAPACITY,
+                 journal_dir: str | None = None, seed: int | None = None) -> None:
+        self.seed = SeedSequence(seed)
+        self.games = SessionStore(spill_dir, max_hot_games)
+        self.broadcasters: dict[int, Broadcaster] = {}
+        self.attached: set[int] = set()
+        # Game ID -> turn and reply of the last hint
+        self.hints: dict[int, tuple[int, str]] = {}
+        self.journal: Journal | None = None
+        recovered: dict[int, Game] = {}
+        if journal_dir is not None:
+            self.journal = Journal(journal_dir)
+            recovered = self.journal.recover()
+            for game_id, game in recovered.items():
+                self.games[game_id] = game
+        self.__ids = count(max(recovered, default=0) + 1)
+
+    def reserve_id(self) -> int:
+        """
+        Returns a new game ID, without creating its game yet (see `new_game`).
+        """
+        return next(self.__ids)
+
+    def new_game(self, game_id: int | None = None) -> int:
+        """
+        Create a new game with the reserved ID `game_id` (a new one by default) and return its game
+        ID.
+        """
+        game_id = self.reserve_id() if game_id is None else game_id
+        self.games[game_id] = Game(self.seed.spawn(1)[0])
+        if self.journal is not None:
+            self.journal.log_snapshot(game_id, self.games[game_id])
+        return game_id
+
+    def close_game(self, game_id: int) -> None:
+        """
+        Remove the game with ID `game_id` (if it was ever created) along with its spectator stream.
+        """
+        existed = self.games.discard(game_id)
+        self.attached.discard(game_id)
+        self.hints.pop(game_id, None)
+        if (broadcaster := self.broadcasters.pop(game_id, None)) is not None:
+            broadcaster.close()
+        if existed and self.journal is not None:
+            self.journal.log(game_id, CLOSE)
+
+    def end_reply(self, game: Game, payload: str) -> str:
+        """
+        Returns the reply to a command which ended `game`, revealing the opponent pieces.
+        """
+        game.reveal_opp_pieces()
+        outcome = "VICTORY" if game.winner == con.USR_WINNER else "DEFEAT"
+        return f"END {outcome} {payload}"
+
+    def hint_reply(self, game_id: int, game: Game) -> str:
+        """
+        Returns the reply to a hint request for `game`, searched at most once per turn. The
+        determinization is seeded from the state of the game, so the hint is reproducible.
+        """
+        cached = self.hints.get(game_id)
+        if cached is not None and cached[0] == game.turn:
+            return cached[1]
+
+        # Imported here as the search takes a while to import and most games never ask for hints
+        from gog.components.search import hint
+        rng = SeedSequence(game.opp_rng.getstate(), (game.turn,)).rng()
+        move = hint(game.board, rng, game.final_state, max_nodes=HINT_NODES)
+        reply = "ERR No move available." if move is None \
+            else f"OK {indices_to_coords(move[0], move[1])} {move[2].upper()}"
+        self.hints[game_id] = game.turn, reply
+        return reply
+
+    def handle_command(self, game_id: int, cmd: str) -> str:
+        """
+        Handle the command `cmd` for the game with ID `game_id` and return the reply line.
+        """
+        game = self.games[game_id]
+        match cmd.lower():
+            case "new":
+                self.games[game_id] = Game(self.seed.spawn(1)[0])
+                self.hints.pop(game_id, None)
+                if self.journal is not None:
+                    self.journal.log_snapshot(game_id, self.games[game_id])
+                return "OK"
+            case "exit" | "e":
+                return "OK"
+
+        if game.winner:
+            return "ERR Game is over."
+        if not game.started:
+            return self.handle_setup_command(game_id, game, cmd)
+
+        match cmd.lower():
+            case "opp":
+                if not game.turn % 2:
+                    return "ERR It's your turn."
+                opp_x, opp_y, chosen_move, result = game.opponent_move()
+                if self.journal is not None:
+                    self.journal.log_move(game_id, opp_x, opp_y, chosen_move, game.opp_rng)
+                payload = f"{indices_to_coords(opp_x, opp_y)} {chosen_move.upper()} {result}"
+                return self.end_reply(game, payload) if game.winner else f"OK {payload}"
+            case "forfeit":
+                game.forfeit()
+                if self.journal is not None:
+                    self.journal.log_snapshot(game_id, game)
+                return self.end_reply(game, "FORFEIT")
+            case "hint":
+                if game.turn % 2:
+                    return "ERR Waiting for the opponent's move (OPP)."
+                return self.hint_reply(game_id, game)
+
+        cmd_tokens = cmd.split()
+        if len(cmd_tokens) != 2:
+            return f"ERR Invalid command '{cmd}'."
+
+        if cmd_tokens[0].lower() == "which":
+            x, y = parse_coords(cmd_tokens[1])
+            if x is None and y is None:
+                return f"ERR Invalid position '{cmd_tokens[1]}'."
+            selected_piece = game.board.get_at(x, y)
+            if selected_piece is None:
+                return "ERR Blank position selected."
+            return "OK UNKNOWN" if selected_piece.opp else f"OK {selected_piece.name()}"
+
+        if game.turn % 2:
+            return "ERR Waiting for the opponent's move (OPP)."
+        x, y = parse_coords(cmd_tokens[0])
+        if x is None and y is None:
+            return f"ERR Invalid position '{cmd_tokens[0]}'."
+        if MOVES.get(cmd_tokens[1].lower()) is None:
+            return f"ERR Invalid operation '{cmd_tokens[1]}'."
+
+        status, result = game.move(x, y, cmd_tokens[1].lower())
+        if status == con.SUCCESS and self.journal is not None:
+            self.journal.log_move(game_id, x, y, cmd_tokens[1].lower())
+        match status:
+            case con.ENEMY_SELECTED:
+                return "ERR Enemy piece selected."
+            case con.EMPTY_CELL:
+                return "ERR Empty cell selected."
+            case con.OUT_OF_BOUNDS:
+                return "ERR Out-of-bounds move."
+            case con.FRIENDLY_FIRE:
+                return "ERR Move blocked by a friendly piece."
+        return self.end_reply(game, str(result)) if game.winner else f"OK {result}"
+
+    def handle_setup_command(self, game_id: int, game: Game, cmd: str) -> str:
+        """
+        Handle the piece placement command `cmd` for `game`. Once all pieces are placed, the
+        opponent arranges its pieces and the reply is `OK READY`.
+        """
+        match cmd.lower():
+            case "piece" | "p":
+                return "OK " + ";".join(
+                    f"{piece}={no}" for piece, no in game.remaining_pieces.items() if no
+                )
+            case "undo" | "u":
+                removed_piece = game.undo()
+                if removed_piece is None:
+                    return "ERR Nothing to undo."
+                if self.journal is not None:
+                    self.journal.log(game_id, UNDO)
+                return f"OK {removed_piece.name()}"
+            case "!":
+                game.randomise()
+                game.start()
+                if self.journal is not None:
+                    self.journal.log_snapshot(game_id, game)
+                return "OK READY"
+
+        cmd_tokens = cmd.split()
+        if len(cmd_tokens) < 2:
+            return f"ERR Invalid command '{cmd}'."
+
+        piece_input = " ".join(cmd_tokens[:-1])
+        pos_input = cmd_tokens[-1]
+        x, y = parse_coords(pos_input)
+        status = game.place(piece_input, x, y)
+        match status:
+            case con.INVALID_PIECE:
+                return f"ERR No such piece '{piece_input}' exists."
+            case con.NO_PIECES_LEFT:
+                return f"ERR All pieces of {con.KEYWORD_MAPPER.get(piece_input.upper())} " \
+                       "have already been placed."
+            case con.FORBIDDEN_POS:
+                return f"ERR Invalid or forbidden position '{pos_input}'."
+            case con.OCCUPIED_CELL:
+                return f"ERR {pos_input.upper()} occupied by {game.board.get_at(x, y).name()}."
+
+        if self.journal is not None:
+            self.journal.log_place(game_id, con.KEYWORD_MAPPER.get(piece_input.upper()), x, y)
+        if game.empty_box():
+            game.start()
+            if self.journal is not None:
+                self.journal.log_snapshot(game_id, game)
+            return "OK READY"
+        return "OK"
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """
+        Serve a single connection until it disconnects, sends `EXIT` or a line longer than the
+        stream limit. The game of the connection is only created with its first command, so a
+        connection which spectates or resumes a game right away never creates one.
+        """
+        game_id = self.reserve_id()
+        self.attached.add(game_id)
+        writer.write(f"OK {game_id}\n".encode())
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line overran the stream limit, so the rest of it can't be told apart from
+                    # the next command
+                    writer.write(b"ERR Command too long.\n")
+                    break
+                if not line:
+                    break
+                try:
+                    cmd = line.decode().strip()
+                except UnicodeDecodeError:
+                    writer.write(b"ERR Commands must be UTF-8.\n")
+                    await writer.drain()
+                    continue
+
+                cmd_tokens = cmd.split()
+                if len(cmd_tokens) == 2 and cmd_tokens[0].lower() == "watch":
+                    self.close_game(game_id)
+                    await self.spectate(cmd_tokens[1], reader, writer)
+                    game_id = None
+                    break
+
+                if len(cmd_tokens) == 2 and cmd_tokens[0].lower() == "resume":
+                    resumed_id = int(cmd_tokens[1]) if cmd_tokens[1].isdecimal() else -1
+                    if resumed_id in self.attached or resumed_id not in self.games:
+                        reply = f"ERR No such game '{cmd_tokens[1]}' to resume."
+                    else:
+                        self.close_game(game_id)
+                        game_id = resumed_id
+                        self.attached.add(game_id)
+                        reply = f"OK {game_id}"
+                else:
+                    if game_id not in self.games:
+                        self.new_game(game_id)
+                    reply = self.handle_command(game_id, cmd)
+
+                if self.journal is not None:
+                    await self.journal.commit()
+                writer.write(f"{reply}\n".encode())
+                if (broadcaster := self.broadcasters.get(game_id)) is not None:
+                    broadcaster.publish(self.games[game_id].board, f"{cmd.upper()}: {reply}")
+                await writer.drain()
+                if cmd.lower() in ("exit", "e"):
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            if game_id is not None:
+                self.close_game(game_id)
+            writer.close()
+
+    async def spectate(self, raw_id: str, reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter) -> None:
+        """
+        Stream the game with ID `raw_id` to `writer` until the game ends or the spectator
+        disconnects.
+        """
+        game_id = int(raw_id) if raw_id.isdecimal() else -1
+        game = self.games.get(game_id)
+        if game is None:
+            writer.write(f"ERR No such game '{raw_id}'.\n".encode())
+            return
+
+        writer.write(f"OK {game_id}\n".encode())
+        if (broadcaster := self.broadcasters.get(game_id)) is None:
+            broadcaster = self.broadcasters[game_id] = Broadcaster()
+            broadcaster.publish(game.board, "")
+        subscriber = broadcaster.attach(writer)
+
+        pump = asyncio.ensure_future(subscriber.pump())
+        hang_up = asyncio.ensure_future(wait_hang_up(reader))
+        try:
+            await asyncio.wait((pump, hang_up), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            pump.cancel()
+            hang_up.cancel()
+            broadcaster.detach(subscriber)
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT) -> None:
+        """
+        Accept connections on `host`:`port` until cancelled.
+        """
+        server = await asyncio.start_server(self.handle_client, host, port, limit=2 ** 12)
+        flusher = None if self.journal is None else asyncio.ensure_future(self.journal.run())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if flusher is not None:
+                flusher.cancel()
+                self.journal.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host games of the generals over TCP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--spill-dir", help="directory for idle games (default: a temporary one)")
+    parser.add_argument("--max-hot-games", type=int, default=DEFAULT_CAPACITY,
+                        help="maximum number of games kept in memory")
+    parser.add_argument("--journal-dir", help="journal games to (and recover games from) here")
+    parser.add_argument("--seed", type=int, help="root seed of all games (default: random)")
+    args = parser.parse_args()
+
+    try:
+        game_server = GameServer(args.spill_dir, args.max_hot_games, args.journal_dir, args.seed)
+        asyncio.run(game_server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,114 @@
+"""
+Module containing the `SessionStore` class, which bounds the number of games kept in memory by
+spilling the least recently used ones to disk.
+"""
+from collections import OrderedDict
+import os
+import tempfile
+from gog.components.codec import deserialize_game, serialize_game
+from gog.components.game import Game
+
+
+DEFAULT_CAPACITY = 10000
+
+
+class SessionStore:
+    """
+    Class representing a dictionary-like store of games keyed by game ID. At most `capacity` games
+    are kept in memory; the least recently used ones are serialized to `directory` and loaded back
+    transparently the next time they are accessed. Its length counts both.
+    """
+    def __init__(self, directory: str | None = None, capacity=DEFAULT_CAPACITY) -> None:
+        if directory is None:
+            directory = tempfile.mkdtemp(prefix="gog-sessions-")
+        os.makedirs(directory, exist_ok=True)
+        # Spilled games of a previous run would otherwise be resumed under a reused game ID
+        for name in os.listdir(directory):
+            if name.endswith(".game"):
+                os.remove(os.path.join(directory, name))
+
+        self.directory = directory
+        self.capacity = max(1, capacity)
+        self.spills = 0
+        self.loads = 0
+        self.__hot: OrderedDict[int, Game] = OrderedDict()
+        self.__spilled: set[int] = set()
+
+    def __path(self, game_id: int) -> str:
+        return os.path.join(self.directory, f"{game_id}.game")
+
+    def __spill(self) -> None:
+        while len(self.__hot) > self.capacity:
+            game_id, game = self.__hot.popitem(last=False)
+            tmp_path = self.__path(game_id) + ".tmp"
+            with open(tmp_path, "wb") as fd:
+                fd.write(serialize_game(game))
+            os.replace(tmp_path, self.__path(game_id))
+            self.__spilled.add(game_id)
+            self.spills += 1
+
+    def __contains__(self, game_id: int) -> bool:
+        return game_id in self.__hot or game_id in self.__spilled
+
+    def __len__(self) -> int:
+        return len(self.__hot) + len(self.__spilled)
+
+    def __getitem__(self, game_id: int) -> Game:
+        game = self.get(game_id)
+        if game is None:
+            raise KeyError(game_id)
+        return game
+
+    def __setitem__(self, game_id: int, game: Game) -> None:
+        self.__hot[game_id] = game
+        self.__hot.move_to_end(game_id)
+        if game_id in self.__spilled:
+            self.__spilled.discard(game_id)
+            os.remove(self.__path(game_id))
+        self.__spill()
+
+    def __delitem__(self, game_id: int) -> None:
+        if not self.discard(game_id):
+            raise KeyError(game_id)
+
+    def get(self, game_id: int, default: Game | None = None) -> Game | None:
+        """
+        Returns the game with ID `game_id` (loading it from disk if it was spilled), or `default`
+        if there is no such game.
+        """
+        game = self.__hot.get(game_id)
+        if game is not None:
+            self.__hot.move_to_end(game_id)
+            return game
+        if game_id not in self.__spilled:
+            return default
+
+        with open(self.__path(game_id), "rb") as fd:
+            game = deserialize_game(fd.read())
+        self.loads += 1
+        self[game_id] = game
+        return game
+
+    def pop(self, game_id: int, default: Game | None = None) -> Game | None:
+        """
+        Remove the game with ID `game_id` and return it (loading it from disk if it was spilled),
+        or `default` if there is no such game. Use `discard` if the game itself isn't needed.
+        """
+        game = self.get(game_id)
+        if game is None:
+            return default
+        del self.__hot[game_id]
+        return game
+
+    def discard(self, game_id: int) -> bool:
+        """
+        Remove the game with ID `game_id` without loading it if it was spilled. Returns whether
+        there was such a game.
+        """
+        if self.__hot.pop(game_id, None) is not None:
+            return True
+        if game_id not in self.__spilled:
+            return False
+        self.__spilled.discard(game_id)
+        os.remove(self.__path(game_id))
+        return True
@@ -0,0 +1,138 @@
+"""
+Module containing the `Broadcaster` class, which streams board updates of a running game to
+read-only spectators.
+
+Spectators receive one line per frame: `D <seq> <idx>=<symbol>;...` for the squares which changed
+since their last frame (`idx` being `y * BOARD_WID + x` and an empty symbol an empty square) and
+`C <seq> <line>` when the console line changed. Slow spectators never block the game; instead,
+their intermediate frames are merged so they skip straight to the latest state.
+"""
+import asyncio
+from gog.components.board import Board
+from gog.config import constants as con
+
+
+def render_cells(board: Board) -> list[str]:
+    """
+    Returns the symbol of every square of `board` as seen by the user (opposing pieces are masked
+    by `Piece.__str__`), indexed by `y * BOARD_WID + x`.
+    """
+    return [
+        "" if piece is None else str(piece)
+        for row in board.list_repr for piece in row
+    ]
+
+
+class Subscriber:
+    """
+    Class representing a single spectator. Holds at most one pending frame, into which any newer
+    frames are merged until the spectator has caught up.
+    """
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer = writer
+        self.dropped = 0
+        self.closed = False
+        self.__changes: dict[int, str] = {}
+        self.__console: str | None = None
+        self.__seq = 0
+        self.__ready = asyncio.Event()
+
+    def push(self, seq: int, changes: dict[int, str], console: str | None) -> None:
+        """
+        Queue the frame `seq` (changed squares `changes` and the new `console` line, if any),
+        merging it with the pending frame if the spectator hasn't received that one yet.
+        """
+        if self.__ready.is_set():
+            self.dropped += 1
+        self.__changes.update(changes)
+        if console is not None:
+            self.__console = console
+        self.__seq = seq
+        self.__ready.set()
+
+    def close(self) -> None:
+        """
+        Stop the spectator once all pending frames have been sent.
+        """
+        self.closed = True
+        self.__ready.set()
+
+    async def pump(self) -> None:
+        """
+        Send pending frames to the spectator until it is closed.
+        """
+        while True:
+            await self.__ready.wait()
+            self.__ready.clear()
+            changes, console, seq = self.__changes, self.__console, self.__seq
+            self.__changes, self.__console = {}, None
+
+            if changes:
+                delta = ";".join(f"{idx}={symb}" for idx, symb in sorted(changes.items()))
+                self.writer.write(f"D {seq} {delta}\n".encode())
+            if console is not None:
+                self.writer.write(f"C {seq} {console}\n".encode())
+            await self.writer.drain()
+
+            if self.closed and not self.__ready.is_set():
+                return
+
+
+class Broadcaster:
+    """
+    Class representing the spectator stream of a single game. Keeps the last published state so
+    only the squares which changed are sent out.
+    """
+    def __init__(self) -> None:
+        self.cells = [""] * (con.BOARD_LEN * con.BOARD_WID)
+        self.console = ""
+        self.seq = 0
+        self.subscribers: set[Subscriber] = set()
+
+    def attach(self, writer: asyncio.StreamWriter) -> Subscriber:
+        """
+        Add a spectator writing to `writer`. Its first frame contains every occupied square (as
+        spectators start from an empty board) and the current console line.
+        """
+        subscriber = Subscriber(writer)
+        subscriber.push(
+            self.seq,
+            {idx: symb for idx, symb in enumerate(self.cells) if symb},
+            self.console or None
+        )
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def detach(self, subscriber: Subscriber) -> None:
+        """
+        Remove `subscriber` from the stream.
+        """
+        self.subscribers.discard(subscriber)
+
+    def publish(self, board: Board, console: str) -> None:
+        """
+        Send the changes of `board` and `console` since the last published state to every
+        spectator. Never blocks.
+        """
+        cells = render_cells(board)
+        changes = {
+            idx: symb for idx, (symb, old_symb) in enumerate(zip(cells, self.cells))
+            if symb != old_symb
+        }
+        new_console = console if console != self.console else None
+        if not changes and new_console is None:
+            return
+
+        self.seq += 1
+        self.cells = cells
+        self.console = console
+        for subscriber in self.subscribers:
+            subscriber.push(self.seq, changes, new_console)
+
+    def close(self) -> None:
+        """
+        End the stream (e.g. when the player disconnects).
+        """
+        for subscriber in self.subscribers:
+            subscriber.close()
+        self.subscribers.clear()
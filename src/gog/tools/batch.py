@@ -0,0 +1,57 @@
+"""
+Module containing the batch mode, which plays scripted games without any terminal interaction.
+
+Commands are read from a file (or `stdin`), one per line, and processed at full speed: no screen
+clears, delays, prompts or confirmations. The command set is that of the game server (see
+`gog.server.server`), except that the opponent replies to every move on its own. Blank lines and
+lines starting with `#` are skipped. The transcript is written as JSON lines, one per command,
+holding its line number, the index of the game (incremented by `NEW`), the command and its reply
+(plus the opponent's reply to a move, under `opp`).
+"""
+import argparse
+import json
+import sys
+from typing import Iterable, Iterator
+from gog.server.server import GameServer
+
+
+def run_batch(lines: Iterable[str], seed: int | None = None) -> Iterator[dict]:
+    """
+    Process the commands of `lines` and yield the transcript entry of each. The seeds of all games
+    are spawned from the root seed `seed`, so a script replays identically with the same seed.
+    """
+    server = GameServer(seed=seed)
+    game_id = server.new_game()
+    game_no = 0
+    for line_no, line in enumerate(lines, 1):
+        cmd = line.strip()
+        if not cmd or cmd.startswith("#"):
+            continue
+
+        reply = server.handle_command(game_id, cmd)
+        if cmd.lower() == "new":
+            game_no += 1
+        entry = {"line": line_no, "game": game_no, "cmd": cmd, "reply": reply}
+
+        game = server.games[game_id]
+        if game.started and not game.winner and game.turn % 2:
+            entry["opp"] = server.handle_command(game_id, "OPP")
+        yield entry
+
+        if cmd.lower() in ("exit", "e"):
+            break
+    server.close_game(game_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play scripted games without interaction.")
+    parser.add_argument("input", nargs="?", help="file of commands (default: stdin)")
+    parser.add_argument("--seed", type=int, default=0, help="root seed of all games")
+    parser.add_argument("--output", help="write the transcript to this file")
+    args = parser.parse_args()
+
+    in_fd = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    out_fd = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    with in_fd, out_fd:
+        for entry in run_batch(in_fd, args.seed):
+            out_fd.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
@@ -0,0 +1,339 @@
+"""
+Module containing the micro-benchmark suite for the engine hot paths.
+
+Every benchmark runs on the same fixed positions, generated from `--seed` by playing random games
+for a number of turns, and reports its best and median time per operation. Results are written as
+JSON, and comparing them against a baseline report (`--compare`) flags every benchmark slower than
+the baseline by more than `--threshold`.
+"""
+import argparse
+from collections.abc import Callable
+from contextlib import redirect_stdout
+import gc
+from io import StringIO
+import json
+import os
+import platform
+from statistics import median
+import subprocess
+import sys
+from time import perf_counter_ns
+from gog import run as game_ui
+from gog.components.codec import deserialize_game, serialize_game
+from gog.components.game import Game
+from gog.components.operation import MOVES
+from gog.components.piece import Piece, PIECES
+from gog.components.rng import SeedSequence
+from gog.config import constants as con
+
+
+REPORT_VERSION = 1
+MIN_SAMPLE_NS = 5_000_000
+FACTORIES = list(PIECES.values())
+MOVE_OFFSETS: dict[str, tuple[int, int]] = {
+    "up": (0, 1), "down": (0, -1), "left": (-1, 0), "right": (1, 0)
+}
+REVERSE_MOVES: dict[str, str] = {"up": "down", "down": "up", "left": "right", "right": "left"}
+
+# A benchmark returns a function running a batch of operations, the number of operations in a
+# batch and a function (or `None`) restoring the state mutated by a batch, called before each one
+# without being timed
+Benchmark = tuple[Callable[[], None], int, Callable[[], None] | None]
+
+
+def make_positions(seed: SeedSequence, n_positions: int, n_turns: int) -> list[Game]:
+    """
+    Returns `n_positions` started games, each advanced by up to `n_turns` turns of random user
+    moves and opponent replies. Games are never over, so every position supports every benchmark.
+    """
+    positions = []
+    for position_seed in seed.spawn(n_positions):
+        game_seed, user_seed = position_seed.spawn(2)
+        user_rng = user_seed.rng()
+        game = Game(game_seed)
+        game.randomise()
+        game.start()
+        for _ in range(n_turns):
+            snapshot = serialize_game(game)
+            user_moves = [
+                (x, y, move) for game_piece, (x, y) in all_pieces([game])
+                if not game_piece.opp for move, (dx, dy) in MOVE_OFFSETS.items()
+                if 0 <= x + dx < con.BOARD_WID and 0 <= y + dy < con.BOARD_LEN
+                and ((target := game.board.get_at(x + dx, y + dy)) is None or target.opp)
+            ]
+            game.move(*user_rng.choice(user_moves))
+            if not game.winner:
+                game.opponent_move()
+            if game.winner or game.final_state:
+                game = deserialize_game(snapshot)
+                break
+        positions.append(game)
+    return positions
+
+
+def all_pieces(games: list[Game]) -> list[tuple[Piece, tuple[int, int]]]:
+    """
+    Returns every piece on the boards of `games` along with its position.
+    """
+    return [
+        (piece, (x, y)) for game in games for y, row in enumerate(game.board.list_repr)
+        for x, piece in enumerate(row) if piece is not None
+    ]
+
+
+def bench_get_at(games: list[Game]) -> Benchmark:
+    """
+    Queries every square of each board, plus the surrounding walls.
+    """
+    queries = [
+        (game.board, x, y) for game in games
+        for y in range(-1, con.BOARD_LEN + 1) for x in range(-1, con.BOARD_WID + 1)
+    ]
+
+    def run() -> None:
+        for board, x, y in queries:
+            board.get_at(x, y)
+    return run, len(queries), None
+
+
+def bench_place(games: list[Game]) -> Benchmark:
+    """
+    Places a piece on every square of each board, challenging the pieces already there.
+    """
+    snapshots = [serialize_game(game) for game in games]
+    placements = []
+
+    def reset() -> None:
+        placements.clear()
+        for i, data in enumerate(snapshots):
+            board = deserialize_game(data).board
+            for y in range(con.BOARD_LEN):
+                for x in range(con.BOARD_WID):
+                    piece = FACTORIES[(i + x + y) % len(FACTORIES)].generate_piece()
+                    if y >= con.BOARD_LEN // 2:
+                        piece.set_opp()
+                    placements.append((board, piece, x, y))
+
+    def run() -> None:
+        for board, piece, x, y in placements:
+            board.place(piece, x, y)
+    reset()
+    return run, len(placements), reset
+
+
+def bench_piece_query(method: str) -> Callable[[list[Game]], Benchmark]:
+    """
+    Returns the benchmark calling the `Board` query `method` on every piece of each board.
+    """
+    def bench(games: list[Game]) -> Benchmark:
+        queries = [
+            (getattr(game.board, method), piece) for game in games
+            for piece, _ in all_pieces([game])
+        ]
+
+        def run() -> None:
+            for query, piece in queries:
+                query(piece)
+        return run, len(queries), None
+    return bench
+
+
+def bench_clear_path_to_end(games: list[Game]) -> Benchmark:
+    """
+    Checks the path of the opposing flag on each board.
+    """
+    boards = [game.board for game in games]
+
+    def run() -> None:
+        for board in boards:
+            board.clear_path_to_end()
+    return run, len(boards), None
+
+
+def bench_attack(games: list[Game]) -> Benchmark:
+    """
+    Resolves a challenge between each pair of ranks.
+    """
+    pairs = [
+        (attacker.generate_piece(), target.generate_piece())
+        for attacker in FACTORIES for target in FACTORIES
+    ]
+
+    def run() -> None:
+        for attacker, target in pairs:
+            attacker.attack(target)
+    return run, len(pairs), None
+
+
+def bench_move_execute(games: list[Game]) -> Benchmark:
+    """
+    Executes every move to an empty square of each board, each followed by its reverse move.
+    """
+    # Pairs of a move to an empty square and its reverse, which restores the position
+    moves = []
+    for game in games:
+        for _, (x, y) in all_pieces([game]):
+            for move, (dx, dy) in MOVE_OFFSETS.items():
+                if 0 <= x + dx < con.BOARD_WID and 0 <= y + dy < con.BOARD_LEN \
+                        and game.board.get_at(x + dx, y + dy) is None:
+                    moves.append((game.board, move, x, y))
+                    moves.append((game.board, REVERSE_MOVES[move], x + dx, y + dy))
+
+    def run() -> None:
+        for board, move, x, y in moves:
+            MOVES[move].generate_move().execute(board, x, y)
+    return run, len(moves), None
+
+
+def bench_opponent_turn(games: list[Game]) -> Benchmark:
+    """
+    Plays one full opponent turn (decision, move and end detection) on each board.
+    """
+    snapshots = [serialize_game(game) for game in games]
+    fresh: list[Game] = []
+
+    def reset() -> None:
+        fresh[:] = [deserialize_game(data) for data in snapshots]
+
+    def run() -> None:
+        for game in fresh:
+            game.opponent_move()
+    reset()
+    return run, len(fresh), reset
+
+
+def bench_render_frame(games: list[Game]) -> Benchmark:
+    """
+    Renders the console, banner and board of each position, as every frame of the game does.
+    """
+    def run() -> None:
+        with redirect_stdout(StringIO()):
+            for game in games:
+                game_ui.board = game.board
+                game_ui.board_and_console()
+    return run, len(games), None
+
+
+def bench_startup(games: list[Game]) -> Benchmark:
+    """
+    Starts a new interpreter importing the game, as every launch of the game does.
+    """
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(game_ui.__file__)))
+
+    def run() -> None:
+        subprocess.run([sys.executable, "-c", "import gog.run"], cwd=src_dir, check=True)
+    return run, 1, None
+
+
+BENCHMARKS: dict[str, Callable[[list[Game]], Benchmark]] = {
+    "Board.get_at": bench_get_at,
+    "Board.place": bench_place,
+    "Board.get_valid_moves": bench_piece_query("get_valid_moves"),
+    "Board.can_be_challenged": bench_piece_query("can_be_challenged"),
+    "Board.is_surrounded": bench_piece_query("is_surrounded"),
+    "Board.clear_path_to_end": bench_clear_path_to_end,
+    "Piece.attack": bench_attack,
+    "Move.execute": bench_move_execute,
+    "opponent_turn": bench_opponent_turn,
+    "render_frame": bench_render_frame,
+    "startup": bench_startup,
+}
+
+
+def time_batches(run: Callable[[], None], n_batches: int) -> int:
+    """
+    Returns the time (in nanoseconds) taken to call `run` `n_batches` times in a row, with the
+    garbage collector disabled (as in `timeit`).
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = perf_counter_ns()
+        for _ in range(n_batches):
+            run()
+        return perf_counter_ns() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def measure(benchmark: Benchmark, repeat: int) -> dict:
+    """
+    Time `repeat` samples of `benchmark` and return the best and median time per operation. A
+    sample of a benchmark without state to restore runs as many batches as needed to last at least
+    `MIN_SAMPLE_NS`.
+    """
+    run, n_ops, reset = benchmark
+    n_batches = 1
+    if reset is None:
+        n_batches = max(1, -(-MIN_SAMPLE_NS // max(1, time_batches(run, 1))))
+
+    timings = []
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        timings.append(time_batches(run, n_batches) / (n_ops * n_batches))
+    return {"ops": n_ops * n_batches, "best_ns": min(timings), "median_ns": median(timings)}
+
+
+def run_benchmarks(args: argparse.Namespace) -> dict:
+    """
+    Run the benchmarks selected by `args` and return the report.
+    """
+    games = make_positions(SeedSequence(args.seed), args.positions, args.turns)
+    names = args.only or list(BENCHMARKS)
+    return {
+        "version": REPORT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"seed": args.seed, "positions": args.positions, "turns": args.turns,
+                   "repeat": args.repeat},
+        "results": {name: measure(BENCHMARKS[name](games), args.repeat) for name in names},
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Returns a line for every benchmark of `report` whose best time per operation exceeds that of
+    `baseline` by more than `threshold` (a fraction).
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = result["best_ns"] / base["best_ns"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {base['best_ns']:.1f} -> {result['best_ns']:.1f} ns/op ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the engine hot paths.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--positions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=20, help="turns played per position")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="slowdown (fraction) above which a benchmark has regressed")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fd:
+            json.dump(report, fd, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fd:
+            regressions = compare(report, json.load(fd), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
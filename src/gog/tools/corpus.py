@@ -0,0 +1,280 @@
+"""
+Module containing the corpus of recorded games and the macro benchmark replaying it.
+
+A corpus is a JSON lines file with one finished game per line: both setups (as ranks and setup
+squares, see `gog.components.setups`), every move in order along with its result code, and the
+winner. Games are recorded from the journal of the game server (`extract`) or by scripted play
+(`record`), and replayed end to end through the engine (`replay`), which reports games per second,
+a per-phase time breakdown and any game whose replay diverged from its record.
+"""
+import argparse
+import json
+import os
+import sys
+from time import perf_counter_ns
+from gog.components.game import Game
+from gog.components.opponent import choose_move
+from gog.components.operation import MOVES
+from gog.components.piece import PIECES
+from gog.components.rng import SeedSequence, SplitMix
+from gog.config import constants as con
+from gog.server.journal import CLOSE, JOURNAL_FILE, MOVE, MOVE_PAYLOAD, OPP_MOVE, SNAPSHOT, \
+    iter_records, replay
+
+
+DEFAULT_CORPUS = "../resources/corpus.jsonl"
+PIECE_NAMES = list(PIECES)
+MOVE_OFFSETS: dict[str, tuple[int, int]] = {
+    "up": (0, 1), "down": (0, -1), "left": (-1, 0), "right": (1, 0)
+}
+QUIET_RESULTS = (con.MOVE_MADE, con.USR_END, con.OPP_END, con.USR_AUTO_WIN, con.OPP_AUTO_WIN)
+PHASES = ("setup", "opponent_decision", "move", "challenge", "end_detection")
+
+
+def setup_square(x: int, y: int, opp: bool) -> int:
+    """
+    Convert the board coordinates (`x`, `y`) of a user (or opponent, if `opp` is `True`) piece
+    into its setup square.
+    """
+    return (con.BOARD_LEN - 1 - y if opp else y) * con.BOARD_WID + x
+
+
+def setup_of(game: Game, opp: bool) -> list[list[int]]:
+    """
+    Returns the setup of the user (or opponent, if `opp` is `True`) in the started game `game`, as
+    pairs of ranks and setup squares.
+    """
+    pieces = game.opp_pieces if opp else [
+        piece for row in game.board.list_repr for piece in row
+        if piece is not None and not piece.opp
+    ]
+    return [[piece.rank, setup_square(*piece.get_pos(), opp)] for piece in pieces]
+
+
+def new_record(game: Game, source: str) -> dict:
+    """
+    Returns the corpus record of the started game `game`, before its first move.
+    """
+    return {
+        "source": source,
+        "user_setup": setup_of(game, False),
+        "opp_setup": setup_of(game, True),
+        "moves": [],
+        "winner": 0,
+    }
+
+
+def record_move(record: dict, game: Game, x: int, y: int, operation: str, opp: bool) -> int:
+    """
+    Make the move `operation` of the (opponent, if `opp` is `True`) piece at (`x`, `y`) in `game`,
+    append it to `record` and return its result code.
+    """
+    if opp:
+        result = game.apply_opponent_move(x, y, operation)
+    else:
+        result = game.move(x, y, operation)[1]
+    record["moves"].append([int(opp), y * con.BOARD_WID + x, operation, result])
+    record["winner"] = game.winner
+    return result
+
+
+def random_user_move(game: Game, rng) -> tuple[int, int, str] | None:
+    """
+    Returns a random legal move of the user in `game` (drawing from `rng`), or `None` if there is
+    none.
+    """
+    candidates = [
+        (x, y, move) for y, row in enumerate(game.board.list_repr)
+        for x, piece in enumerate(row) if piece is not None and not piece.opp
+        for move, (dx, dy) in MOVE_OFFSETS.items()
+        if 0 <= x + dx < con.BOARD_WID and 0 <= y + dy < con.BOARD_LEN
+        and ((target := game.board.get_at(x + dx, y + dy)) is None or target.opp)
+    ]
+    return rng.choice(candidates) if candidates else None
+
+
+def record_games(seed: SeedSequence, n_games: int, max_turns: int) -> list[dict]:
+    """
+    Returns the records of `n_games` games played by a scripted user (random legal moves and a
+    random setup) against the simulated opponent. Games lasting more than `max_turns` turns are
+    dropped.
+    """
+    records = []
+    for game_seed in seed.spawn(n_games):
+        engine_seed, user_seed = game_seed.spawn(2)
+        user_rng = user_seed.rng()
+        game = Game(engine_seed)
+        game.randomise()
+        game.start()
+        record = new_record(game, "scripted")
+        for _ in range(max_turns):
+            user_move = random_user_move(game, user_rng)
+            if user_move is None:
+                break
+            record_move(record, game, *user_move, opp=False)
+            if game.winner:
+                break
+            opp_choice, chosen_move = choose_move(game.board, game.opp_pieces, game.opp_rng)
+            record_move(record, game, *opp_choice.get_pos(), chosen_move, opp=True)
+            if game.winner:
+                break
+        if game.winner:
+            records.append(record)
+    return records
+
+
+def extract_games(journal_dir: str) -> list[dict]:
+    """
+    Returns the records of every game played to the end (forfeits excluded) in the journal of the
+    game server in `journal_dir`. Games are only recorded from the snapshot taken when they start,
+    so games started before the last compaction of the journal are skipped.
+    """
+    games: dict[int, Game] = {}
+    records: dict[int, dict] = {}
+    finished = []
+    with open(os.path.join(journal_dir, JOURNAL_FILE), "rb") as fd:
+        for _, game_id, op, payload in iter_records(fd):
+            if op in (MOVE, OPP_MOVE) and game_id in records:
+                idx, value = MOVE_PAYLOAD.unpack_from(payload)
+                record_move(records[game_id], games[game_id], idx % con.BOARD_WID,
+                            idx // con.BOARD_WID, list(MOVES)[value], op == OPP_MOVE)
+                if games[game_id].winner:
+                    finished.append(records.pop(game_id))
+                continue
+
+            replay(games, game_id, op, payload)
+            records.pop(game_id, None)
+            if op == SNAPSHOT and games[game_id].started and not games[game_id].turn \
+                    and not games[game_id].winner:
+                records[game_id] = new_record(games[game_id], "journal")
+            if op == CLOSE:
+                games.pop(game_id, None)
+    return finished
+
+
+def replay_game(record: dict, times: dict[str, int], counts: dict[str, int]) -> bool:
+    """
+    Replay the game of `record` through the engine, adding the time (in nanoseconds) and number of
+    operations of each phase to `times` and `counts`. Returns whether every result code and the
+    winner matched the record.
+    """
+    start = perf_counter_ns()
+    game = Game(SeedSequence(0))
+    for rank, square in record["user_setup"]:
+        game.place(PIECE_NAMES[rank], square % con.BOARD_WID, square // con.BOARD_WID)
+    game.start(opp_setup=record["opp_setup"])
+    times["setup"] += perf_counter_ns() - start
+    counts["setup"] += 1
+
+    decision_rng = SplitMix(0)
+    matched = True
+    for opp, idx, operation, expected in record["moves"]:
+        x, y = idx % con.BOARD_WID, idx // con.BOARD_WID
+        if opp:
+            # The recorded move is replayed, but the opponent still makes its decision so that its
+            # cost is part of every turn, as it is in a real game
+            start = perf_counter_ns()
+            choose_move(game.board, game.opp_pieces, decision_rng)
+            times["opponent_decision"] += perf_counter_ns() - start
+            counts["opponent_decision"] += 1
+
+        start = perf_counter_ns()
+        result = MOVES[operation].generate_move().execute(game.board, x, y)[1]
+        phase = "move" if result in QUIET_RESULTS else "challenge"
+        times[phase] += perf_counter_ns() - start
+        counts[phase] += 1
+
+        start = perf_counter_ns()
+        game.turn += 1
+        game.resolve(result)
+        times["end_detection"] += perf_counter_ns() - start
+        counts["end_detection"] += 1
+        matched &= result == expected
+    return matched and game.winner == record["winner"]
+
+
+def replay_corpus(records: list[dict], repeat: int) -> dict:
+    """
+    Replay every game of `records` `repeat` times and return the report of the fastest run.
+    """
+    best = None
+    for _ in range(repeat):
+        times = dict.fromkeys(PHASES, 0)
+        counts = dict.fromkeys(PHASES, 0)
+        start = perf_counter_ns()
+        diverged = [i for i, record in enumerate(records) if not replay_game(record, times, counts)]
+        elapsed = perf_counter_ns() - start
+        if best is None or elapsed < best[0]:
+            best = elapsed, times, counts, diverged
+
+    elapsed, times, counts, diverged = best
+    n_moves = sum(len(record["moves"]) for record in records)
+    return {
+        "games": len(records),
+        "moves": n_moves,
+        "duration_s": elapsed / 1e9,
+        "games_per_s": len(records) / elapsed * 1e9 if elapsed else 0.0,
+        "moves_per_s": n_moves / elapsed * 1e9 if elapsed else 0.0,
+        "phases": {
+            phase: {
+                "count": counts[phase],
+                "total_ms": times[phase] / 1e6,
+                "mean_us": times[phase] / counts[phase] / 1e3 if counts[phase] else 0.0,
+            }
+            for phase in PHASES
+        },
+        "diverged": diverged,
+    }
+
+
+def load_corpus(path: str) -> list[dict]:
+    """
+    Returns the records of the corpus file at `path`.
+    """
+    with open(path, encoding="utf-8") as fd:
+        return [json.loads(line) for line in fd if line.strip()]
+
+
+def save_corpus(path: str, records: list[dict], append=False) -> None:
+    """
+    Write `records` to the corpus file at `path` (appending them, if `append` is `True`).
+    """
+    with open(path, "a" if append else "w", encoding="utf-8") as fd:
+        for record in records:
+            fd.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record and replay a corpus of games.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="record games of scripted play")
+    record_parser.add_argument("--games", type=int, default=100)
+    record_parser.add_argument("--max-turns", type=int, default=500)
+    record_parser.add_argument("--seed", type=int, default=0)
+    extract_parser = subparsers.add_parser("extract", help="record games from a server journal")
+    extract_parser.add_argument("journal_dir")
+    replay_parser = subparsers.add_parser("replay", help="benchmark replaying the corpus")
+    replay_parser.add_argument("--repeat", type=int, default=5)
+    replay_parser.add_argument("--output", help="write the JSON report to this file")
+    for subparser in (record_parser, extract_parser, replay_parser):
+        subparser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    for subparser in (record_parser, extract_parser):
+        subparser.add_argument("--append", action="store_true",
+                               help="append to the corpus instead of overwriting it")
+    args = parser.parse_args()
+
+    match args.command:
+        case "record":
+            save_corpus(args.corpus, record_games(SeedSequence(args.seed), args.games,
+                                                  args.max_turns), args.append)
+        case "extract":
+            save_corpus(args.corpus, extract_games(args.journal_dir), args.append)
+        case "replay":
+            report = replay_corpus(load_corpus(args.corpus), args.repeat)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as fd:
+                    json.dump(report, fd, indent=2)
+            else:
+                json.dump(report, sys.stdout, indent=2)
+                print()
+            sys.exit(1 if report["diverged"] else 0)
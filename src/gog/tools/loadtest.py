@@ -0,0 +1,203 @@
+"""
+Module containing the load-testing harness for the game server (see `gog.server.server`).
+
+Spawns many scripted clients, each placing the 21 pieces of `con.PIECE_COUNTS` and playing random
+legal moves, and reports per-command latency percentiles and throughput as JSON.
+"""
+import argparse
+import asyncio
+import json
+from random import Random
+import sys
+from time import perf_counter
+from gog.components.game import indices_to_coords
+from gog.components.rng import SeedSequence
+from gog.config import constants as con
+from gog.server.server import DEFAULT_HOST, DEFAULT_PORT
+
+
+COMMAND_KINDS = ("placement", "move", "opponent", "forfeit", "new")
+MOVE_OFFSETS: dict[str, tuple[int, int]] = {
+    "up": (0, 1), "down": (0, -1), "left": (-1, 0), "right": (1, 0)
+}
+
+
+def ramp_delays(profile: str, n_clients: int, duration: float) -> list[float]:
+    """
+    Returns the start delay (in seconds) of each of the `n_clients` clients according to the
+    ramp-up `profile`: `instant` (all at once), `linear` (evenly spread over `duration`) or
+    `step:<N>` (`N` equally sized waves spread over `duration`).
+    """
+    if profile == "instant" or n_clients < 2:
+        return [0.0] * n_clients
+    if profile == "linear":
+        return [duration * i / (n_clients - 1) for i in range(n_clients)]
+    if profile.startswith("step:"):
+        n_steps = max(1, int(profile.split(":")[1]))
+        wave_size = -(-n_clients // n_steps)
+        step = duration / max(1, n_steps - 1)
+        return [step * (i // wave_size) for i in range(n_clients)]
+    raise ValueError(f"Unknown ramp-up profile '{profile}'.")
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """
+    Returns the `pct`th percentile (nearest-rank) of the sorted list `ordered`.
+    """
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))]
+
+
+class Client:
+    """
+    Class representing a scripted client playing against the server over a single connection.
+    """
+    def __init__(self, host: str, port: int, rng: Random, max_turns: int) -> None:
+        self.host = host
+        self.port = port
+        self.rng = rng
+        self.max_turns = max_turns
+        self.latencies: dict[str, list[float]] = {kind: [] for kind in COMMAND_KINDS}
+        self.errors = 0
+        self.games = 0
+        self.__reader: asyncio.StreamReader = None
+        self.__writer: asyncio.StreamWriter = None
+
+    async def send(self, kind: str, cmd: str) -> list[str]:
+        """
+        Send `cmd` to the server, recording its round-trip latency under `kind`. Returns the reply
+        split into tokens.
+        """
+        start = perf_counter()
+        self.__writer.write(f"{cmd}\n".encode())
+        reply = (await self.__reader.readline()).decode().split()
+        self.latencies[kind].append(perf_counter() - start)
+        if not reply or reply[0] == "ERR":
+            self.errors += 1
+        return reply
+
+    async def play_game(self) -> None:
+        """
+        Place all pieces at random and play random legal moves until the game ends (forfeiting
+        after `max_turns` moves).
+        """
+        squares = [(x, y) for y in range(3) for x in range(con.BOARD_WID)]
+        self.rng.shuffle(squares)
+        own: set[tuple[int, int]] = set()
+        for piece, n_pieces in con.PIECE_COUNTS.items():
+            for _ in range(n_pieces):
+                x, y = squares.pop()
+                own.add((x, y))
+                await self.send("placement", f"{piece} {indices_to_coords(x, y)}")
+
+        for _ in range(self.max_turns):
+            candidates = [
+                (x, y, move) for x, y in own for move, (dx, dy) in MOVE_OFFSETS.items()
+                if 0 <= x + dx < con.BOARD_WID and 0 <= y + dy < con.BOARD_LEN
+                and (x + dx, y + dy) not in own
+            ]
+            if not candidates:
+                break
+            x, y, move = self.rng.choice(sorted(candidates))
+            dx, dy = MOVE_OFFSETS[move]
+            reply = await self.send("move", f"{indices_to_coords(x, y)} {move.upper()}")
+            if reply[0] != "ERR":
+                own.discard((x, y))
+                if int(reply[-1]) in (con.MOVE_MADE, con.OPP_ELIM, con.USR_END,
+                                      con.USR_AUTO_WIN, con.USR_WINNER):
+                    own.add((x + dx, y + dy))
+            if reply[0] != "OK":
+                break
+
+            reply = await self.send("opponent", "OPP")
+            if reply[0] == "OK" and int(reply[-1]) in (con.USR_ELIM, con.SPLIT):
+                opp_x, opp_y = ord(reply[1][0]) - con.CHR_OFFSET, int(reply[1][1]) - 1
+                dx, dy = MOVE_OFFSETS[reply[2].lower()]
+                own.discard((opp_x + dx, opp_y + dy))
+            if reply[0] != "OK":
+                break
+        else:
+            await self.send("forfeit", "FORFEIT")
+
+        self.games += 1
+
+    async def run(self, delay: float, n_games: int) -> None:
+        """
+        Wait `delay` seconds, then connect and play `n_games` games in a row.
+        """
+        await asyncio.sleep(delay)
+        self.__reader, self.__writer = await asyncio.open_connection(self.host, self.port)
+        await self.__reader.readline()
+        try:
+            for i in range(n_games):
+                if i:
+                    await self.send("new", "NEW")
+                await self.play_game()
+            self.__writer.write(b"EXIT\n")
+            await self.__writer.drain()
+        finally:
+            self.__writer.close()
+
+
+async def run_load_test(args: argparse.Namespace) -> dict:
+    """
+    Run the load test described by `args` and return the report.
+    """
+    clients = [
+        Client(args.host, args.port, seed.rng(), args.max_turns)
+        for seed in SeedSequence(args.seed).spawn(args.clients)
+    ]
+    delays = ramp_delays(args.ramp, args.clients, args.ramp_duration)
+
+    start = perf_counter()
+    results = await asyncio.gather(
+        *(client.run(delay, args.games) for client, delay in zip(clients, delays)),
+        return_exceptions=True
+    )
+    elapsed = perf_counter() - start
+
+    report = {
+        "config": vars(args),
+        "duration_s": elapsed,
+        "clients_failed": sum(isinstance(res, Exception) for res in results),
+        "games": sum(client.games for client in clients),
+        "errors": sum(client.errors for client in clients),
+        "commands": {},
+    }
+    total = 0
+    for kind in COMMAND_KINDS:
+        ordered = sorted(lat for client in clients for lat in client.latencies[kind])
+        total += len(ordered)
+        report["commands"][kind] = {
+            "count": len(ordered),
+            "mean_ms": 1000 * sum(ordered) / len(ordered) if ordered else 0.0,
+            "p50_ms": 1000 * percentile(ordered, 50),
+            "p95_ms": 1000 * percentile(ordered, 95),
+            "p99_ms": 1000 * percentile(ordered, 99),
+            "max_ms": 1000 * ordered[-1] if ordered else 0.0,
+        }
+    report["throughput_cmds_per_s"] = total / elapsed if elapsed else 0.0
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test a running game server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--games", type=int, default=1, help="games played by each client")
+    parser.add_argument("--max-turns", type=int, default=200)
+    parser.add_argument("--ramp", default="linear", help="instant, linear or step:<N>")
+    parser.add_argument("--ramp-duration", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fd:
+            json.dump(report, fd, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
@@ -0,0 +1,76 @@
+"""
+Module containing the command-line front end of the perft counter (see `gog.components.perft`).
+
+Counts the leaf nodes of a position (in the notation of `gog.components.notation`) at every depth
+up to `--depth` along with the nodes per second, or, with `--check`, checks the counts of every
+reference position in the fixtures file.
+"""
+import argparse
+import json
+import sys
+from time import perf_counter
+from gog.components.notation import from_notation
+from gog.components.perft import divide, perft
+
+
+DEFAULT_FIXTURES = "../resources/perft.json"
+
+
+def timed_perft(notation: str, depth: int) -> tuple[int, float]:
+    """
+    Returns the perft count of the position `notation` at `depth` and the time it took.
+    """
+    board, opp = from_notation(notation)
+    start = perf_counter()
+    nodes = perft(board, depth, opp)
+    return nodes, perf_counter() - start
+
+
+def check_fixtures(path: str) -> bool:
+    """
+    Check the counts of every position of the fixtures file at `path`, printing a line for each
+    depth. Returns whether all counts matched.
+    """
+    with open(path, encoding="utf-8") as fd:
+        fixtures = json.load(fd)
+
+    passed = True
+    total_nodes, total_time = 0, 0.0
+    for fixture in fixtures:
+        for depth, expected in enumerate(fixture["counts"], 1):
+            nodes, elapsed = timed_perft(fixture["position"], depth)
+            total_nodes += nodes
+            total_time += elapsed
+            status = "ok" if nodes == expected else f"FAILED (expected {expected})"
+            print(f"{fixture['name']} depth {depth}: {nodes} {status}")
+            passed &= nodes == expected
+    print(f"{total_nodes} nodes in {total_time:.2f} s ({total_nodes / total_time:.0f} nodes/s)")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count the leaf nodes of a game tree.")
+    parser.add_argument("--position", help="position in the notation of gog.components.notation")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--divide", action="store_true",
+                        help="print the count below each move at the root instead")
+    parser.add_argument("--check", nargs="?", const=DEFAULT_FIXTURES, metavar="FIXTURES",
+                        help="check the counts of the reference positions instead")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check_fixtures(args.check) else 1)
+    if args.position is None:
+        parser.error("a --position (or --check) is required")
+
+    if args.divide:
+        board, opp = from_notation(args.position)
+        counts = divide(board, args.depth, opp)
+        for move, nodes in counts.items():
+            print(f"{move}: {nodes}")
+        print(f"total: {sum(counts.values())}")
+    else:
+        for depth in range(1, args.depth + 1):
+            nodes, elapsed = timed_perft(args.position, depth)
+            rate = nodes / elapsed if elapsed else 0.0
+            print(f"depth {depth}: {nodes} nodes in {elapsed:.3f} s ({rate:.0f} nodes/s)")
@@ -0,0 +1,112 @@
+"""
+Module containing the builder of the database of position statistics (see
+`gog.components.positiondb`) from the shards of self-play data (see `gog.tools.selfplay`).
+
+Every shard not merged yet (those merged are listed beside the database, in `<db>.json`) is
+aggregated and merged into the database `--db`, so running it again after generating more shards
+only merges the new ones. With `--decisive N`, it then reports the `N` positions seen at least
+`--min-visits` times whose results were the most one-sided for the side to move, in notation (see
+`gog.components.notation`), with their statistics and best observed move.
+"""
+import argparse
+import json
+import os
+import numpy as np
+from gog.components.board import Board
+from gog.components.codec import decode_square
+from gog.components.features import SIDE_PLANE, canonical_moves, list_shards, open_shard
+from gog.components.notation import to_notation
+from gog.components.positiondb import NO_RECORD, STAT_FIELDS, PositionDB, aggregate, \
+    position_keys
+from gog.components.search import index_move
+from gog.config import constants as con
+from gog.tools.selfplay import DEFAULT_OUTPUT
+
+
+DEFAULT_DB = "../positions.npy"
+
+
+def shard_positions(shard: dict[str, np.ndarray]) -> tuple[np.ndarray, ...]:
+    """
+    Returns the hashes, moves (on the board as it is) and results of the positions of `shard`,
+    along with their squares and side to move.
+    """
+    squares = np.asarray(shard["squares"])
+    opp_to_move = shard["planes"][:, SIDE_PLANE, 0, 0].astype(bool)
+    moves = canonical_moves(np.asarray(shard["moves"]), opp_to_move).astype(np.uint16)
+    return position_keys(squares, opp_to_move), moves, np.asarray(shard["results"]), squares, \
+        opp_to_move
+
+
+def squares_notation(squares: np.ndarray, opp_to_move: bool) -> str:
+    """
+    Returns the notation of the position `squares` with the opponent (if `opp_to_move` is `True`)
+    or the user to move.
+    """
+    board = Board()
+    for index, code in enumerate(squares):
+        piece = decode_square(int(code))
+        if piece is not None:
+            board.place(piece, index % con.BOARD_WID, index // con.BOARD_WID)
+    return to_notation(board, opp_to_move)
+
+
+def decisive_positions(db: PositionDB, shards: list[str], count: int,
+                       min_visits: int) -> list[dict]:
+    """
+    Returns the `count` positions of `db` seen at least `min_visits` times with the most one-sided
+    mean results, located in `shards` to give their notation.
+    """
+    records = db.records
+    visits = records["visits"].astype(float)
+    margin = np.abs(records["wins"].astype(float) - records["losses"]) / np.maximum(visits, 1)
+    candidates = np.flatnonzero(visits >= min_visits)
+    chosen = candidates[np.lexsort((-visits[candidates], -margin[candidates]))[:count]]
+
+    notations = {}
+    for path in shards:
+        keys, _, _, squares, opp_to_move = shard_positions(open_shard(path))
+        indices = db.find(keys)
+        for position in np.flatnonzero(np.isin(indices, chosen)):
+            notations.setdefault(int(indices[position]),
+                                 squares_notation(squares[position], bool(opp_to_move[position])))
+        if len(notations) == len(chosen):
+            break
+    return [
+        {"position": notations.get(int(index))} | {
+            name: int(records[index][name]) for name in STAT_FIELDS
+        } | {"best_move": index_move(int(records[index]["move"]))}
+        for index in chosen if index != NO_RECORD
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the database of position statistics.")
+    parser.add_argument("--data", default=DEFAULT_OUTPUT, help="directory of the shards")
+    parser.add_argument("--db", default=DEFAULT_DB, help="file of the database")
+    parser.add_argument("--decisive", type=int, metavar="N",
+                        help="report the N most decisive positions")
+    parser.add_argument("--min-visits", type=int, default=10,
+                        help="visits of the positions reported by --decisive")
+    args = parser.parse_args()
+
+    merged_path = f"{args.db}.json"
+    merged = []
+    if os.path.exists(merged_path):
+        with open(merged_path, encoding="utf-8") as fd:
+            merged = json.load(fd)
+    db = PositionDB(args.db)
+    shards = list_shards(args.data)
+    for path in shards:
+        name = os.path.basename(path)
+        if name in merged:
+            continue
+        keys, moves, results, _, _ = shard_positions(open_shard(path))
+        db.merge(aggregate(keys, moves, results))
+        merged.append(name)
+        with open(merged_path, "w", encoding="utf-8") as fd:
+            json.dump(merged, fd)
+        print(f"{name} merged, {len(db)} positions")
+
+    if args.decisive:
+        print(json.dumps(decisive_positions(db, shards, args.decisive, args.min_visits), indent=2))
@@ -0,0 +1,180 @@
+"""
+Module containing the search benchmark, which measures the effect of the transposition table (see
+`gog.components.transposition`) on nodes per second and search quality.
+
+Every position (generated as in `gog.tools.bench`, then determinized) is searched:
+- to a fixed `--depth` without a table, with an empty table and with a table already filled by
+  another process having searched the same position, reporting the nodes and time each took;
+- for a fixed `--budget` with and without a table, reporting the depth reached.
+The moves chosen with and without a table are compared, as a table only changes the move found
+within the same depth when it cuts off a transposition searched to a different depth.
+
+With `--scaling`, it instead measures the strength of the opponent's parallel search (see
+`gog.components.parallel`) at a fixed `--budget` for every given number of workers: the regret of
+each chosen move (how much worse it is than the best move, scored by a `--reference-depth` search
+of the true position, ranks included) and the share of best moves chosen.
+"""
+import argparse
+import json
+from multiprocessing import Process
+import os
+import sys
+from time import perf_counter
+from gog.components.notation import from_notation, to_notation
+from gog.components.parallel import ParallelSearch
+from gog.components.rng import SeedSequence
+from gog.components.search import Search, determinize
+from gog.components.transposition import DEFAULT_SIZE_MB, TranspositionTable
+from gog.tools.bench import make_positions
+
+
+def timed_search(notation: str, table: TranspositionTable | None, depth: int | None = None,
+                 budget: float | None = None) -> dict:
+    """
+    Returns the nodes, time, depth reached and move of a search of the position `notation` to
+    `depth` plies or for `budget` seconds.
+    """
+    board, opp = from_notation(notation)
+    search = Search(board, budget, table=table)
+    start = perf_counter()
+    move = search.best_move(opp, max_depth=depth) if depth else search.best_move(opp)
+    elapsed = perf_counter() - start
+    return {"nodes": search.nodes, "seconds": elapsed, "depth": search.depth, "move": move}
+
+
+def warm(notation: str, table: TranspositionTable, depth: int) -> None:
+    """
+    Search the position `notation` to `depth` plies, filling `table` (run in another process).
+    """
+    timed_search(notation, table, depth)
+
+
+def summarize(runs: list[dict]) -> dict:
+    """
+    Returns the total nodes and time, nodes per second and mean depth of `runs`.
+    """
+    nodes = sum(run["nodes"] for run in runs)
+    seconds = sum(run["seconds"] for run in runs)
+    return {
+        "nodes": nodes, "seconds": round(seconds, 3), "nodes_per_s": round(nodes / seconds),
+        "mean_depth": sum(run["depth"] for run in runs) / len(runs)
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+    """
+    Returns the report of the benchmark configured by `args`.
+    """
+    seed = SeedSequence(args.seed)
+    positions_seed, determinize_seed = seed.spawn(2)
+    notations = [
+        to_notation(determinize(game.board, rng))
+        for game, rng in zip(make_positions(positions_seed, args.positions, args.turns),
+                             (child.rng() for child in determinize_seed.spawn(args.positions)))
+    ]
+
+    table = TranspositionTable(args.table_mb)
+    runs: dict[str, list[dict]] = {
+        "depth_no_table": [], "depth_table": [], "depth_warm_table": [],
+        "budget_no_table": [], "budget_table": []
+    }
+    try:
+        for notation in notations:
+            runs["depth_no_table"].append(timed_search(notation, None, args.depth))
+            table.clear()
+            runs["depth_table"].append(timed_search(notation, table, args.depth))
+            table.clear()
+            worker = Process(target=warm, args=(notation, table, args.depth))
+            worker.start()
+            worker.join()
+            runs["depth_warm_table"].append(timed_search(notation, table, args.depth))
+            runs["budget_no_table"].append(timed_search(notation, None, budget=args.budget))
+            table.clear()
+            runs["budget_table"].append(timed_search(notation, table, budget=args.budget))
+    finally:
+        table.close()
+
+    same_moves = sum(
+        plain["move"] == tabled["move"]
+        for plain, tabled in zip(runs["depth_no_table"], runs["depth_table"])
+    )
+    return {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": {name: summarize(name_runs) for name, name_runs in runs.items()},
+        "same_move_fraction": same_moves / len(notations),
+    }
+
+
+def reference_scores(notation: str, depth: int) -> dict[tuple[int, int, str], float]:
+    """
+    Returns the score of every opponent move of the full-information position `notation`, each
+    searched `depth` plies deep.
+    """
+    board, _ = from_notation(notation)
+    search = Search(board)
+    return {
+        move: search.make_move(move, True, depth, -float("inf"), float("inf"), 0)
+        for move in search.ordered_moves(True)
+    }
+
+
+def run_scaling(args: argparse.Namespace) -> dict:
+    """
+    Returns the report of the scaling benchmark configured by `args`.
+    """
+    seed = SeedSequence(args.seed)
+    positions_seed, search_seed = seed.spawn(2)
+    notations = [
+        to_notation(game.board, True)
+        for game in make_positions(positions_seed, args.positions, args.turns)
+    ]
+    references = [reference_scores(notation, args.reference_depth) for notation in notations]
+
+    curve = []
+    for workers in args.scaling:
+        regrets, nodes, depths = [], 0, []
+        rng = search_seed.child(workers).rng()
+        with ParallelSearch(workers) as search:
+            start = perf_counter()
+            for notation, scores in zip(notations, references):
+                move = search.best_move(from_notation(notation)[0], rng, budget=args.budget)
+                regrets.append(max(scores.values()) - scores[move])
+                nodes += sum(search.nodes)
+                depths.extend(search.depths)
+            elapsed = perf_counter() - start
+        curve.append({
+            "workers": workers, "mean_regret": round(sum(regrets) / len(regrets), 3),
+            "best_move_fraction": sum(not regret for regret in regrets) / len(regrets),
+            "nodes_per_s": round(nodes / elapsed), "mean_depth": sum(depths) / len(depths),
+            "seconds_per_move": round(elapsed / len(notations), 3)
+        })
+    return {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "cpu_count": os.cpu_count(), "scaling": curve
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the search.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--positions", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=10, help="turns played per position")
+    parser.add_argument("--depth", type=int, default=3, help="depth of the fixed-depth searches")
+    parser.add_argument("--budget", type=float, default=0.5,
+                        help="time (s) of the fixed-time searches")
+    parser.add_argument("--table-mb", type=float, default=DEFAULT_SIZE_MB,
+                        help="size of the transposition table")
+    parser.add_argument("--scaling", type=int, nargs="+", metavar="WORKERS",
+                        help="measure the parallel search with each number of workers instead")
+    parser.add_argument("--reference-depth", type=int, default=2,
+                        help="depth of the searches scoring the moves of the scaling benchmark")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_scaling(args) if args.scaling else run_benchmark(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fd:
+            json.dump(report, fd, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
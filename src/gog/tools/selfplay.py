@@ -0,0 +1,101 @@
+"""
+Module containing the self-play pipeline, which plays games headlessly and stores every position as
+training data (see `gog.components.features`).
+
+The opponent plays with its own policy (`gog.components.opponent`) and the user with uniformly
+random legal moves. Every position is stored with the move played from it and the final result for
+the side to move, in shards of `--games-per-shard` games each. Shard `i` is generated from child
+`i` of the root `--seed` and only appears once complete, so the pipeline can be stopped at any time
+and resumed (or extended with more `--shards`) by running it again, which skips complete shards.
+Shards are generated in parallel by `--workers` processes, each holding one shard in memory.
+"""
+import argparse
+from multiprocessing import Pool
+import os
+import numpy as np
+from gog.components.codec import encode_board
+from gog.components.features import canonical_moves, encode_planes, list_shards, write_shard
+from gog.components.game import Game
+from gog.components.perft import legal_moves
+from gog.components.rng import SeedSequence
+from gog.components.search import move_index
+from gog.config import constants as con
+
+
+DEFAULT_OUTPUT = "../selfplay"
+# Plies after which a game is stopped unfinished
+MAX_PLIES = 500
+
+
+def play_game(seed: SeedSequence) -> tuple[list[bytes], list[int], int]:
+    """
+    Returns the squares (see `gog.components.codec`) of every position of a game played from
+    `seed`, the index of the move played from each position (the user moving first, the sides
+    alternating) and the winner (`0` if the game was stopped unfinished).
+    """
+    game_seed, user_seed = seed.spawn(2)
+    user_rng = user_seed.rng()
+    game = Game(game_seed)
+    game.randomise()
+    game.start()
+
+    positions, moves = [], []
+    while not game.winner and game.turn < MAX_PLIES:
+        positions.append(encode_board(game.board))
+        if game.turn % 2:
+            x, y, name, _ = game.opponent_move()
+        else:
+            x, y, name = user_rng.choice(legal_moves(game.board, False))
+            game.move(x, y, name)
+        moves.append(move_index((x, y, name)))
+    return positions, moves, game.winner
+
+
+def generate_shard(task: tuple[int, int, str, int]) -> tuple[int, int]:
+    """
+    Generate shard `index` of `games` games from the root seed `seed`, written to `output`.
+    Returns the index of the shard and its number of positions.
+    """
+    seed, index, output, games = task
+    squares, moves, sides, results = [], [], [], []
+    for game_seed in SeedSequence(seed).child(index).spawn(games):
+        positions, game_moves, winner = play_game(game_seed)
+        game_sides = [bool(ply % 2) for ply in range(len(positions))]
+        squares.extend(positions)
+        moves.extend(game_moves)
+        sides.extend(game_sides)
+        results.extend(
+            0 if not winner else 1 if (winner == con.OPP_WINNER) == opp else -1
+            for opp in game_sides
+        )
+
+    opp_to_move = np.array(sides, dtype=bool)
+    square_array = np.frombuffer(b"".join(squares), dtype=np.uint8).reshape(len(squares), -1)
+    write_shard(os.path.join(output, f"shard-{index:05d}"), {
+        "planes": encode_planes(square_array, opp_to_move),
+        "squares": square_array,
+        "moves": canonical_moves(np.array(moves, dtype=np.int16), opp_to_move),
+        "results": np.array(results, dtype=np.int8),
+    })
+    return index, len(squares)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate self-play training data.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shards", type=int, default=8, help="total number of shards")
+    parser.add_argument("--games-per-shard", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="directory of the shards")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    done = {os.path.basename(path) for path in list_shards(args.output)}
+    pending = [
+        (args.seed, index, args.output, args.games_per_shard) for index in range(args.shards)
+        if f"shard-{index:05d}" not in done
+    ]
+    print(f"{len(done)} shards already complete, {len(pending)} to generate.")
+    with Pool(args.workers) as pool:
+        for index, n_positions in pool.imap_unordered(generate_shard, pending):
+            print(f"shard-{index:05d}: {n_positions} positions")
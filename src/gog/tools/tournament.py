@@ -0,0 +1,102 @@
+"""
+Module containing the tournament, which rates opponent configurations (variants of the biases of
+`gog.components.opponent.DEFAULT_BIASES`) with a `RatingTable` (see `gog.components.rating`).
+
+The opponent's decision logic only plays the opponent side, so every game pits an opponent
+configuration against a user-side player (one moving at random, or one searching a fixed number of
+nodes per move, see `gog.components.search.hint`), and the configurations are compared through
+the user-side players they have in common. A game stopped after `MAX_PLIES` plies is a draw. Every
+round refits the ratings and schedules the `--batch` games that narrow them the most, which are
+played in parallel by `--workers` processes. The results are kept in `--state`, so a tournament
+can be stopped and resumed, or extended with more rounds.
+"""
+import argparse
+import json
+from multiprocessing import Pool
+import os
+import sys
+import numpy as np
+from gog.components.game import Game
+from gog.components.perft import legal_moves
+from gog.components.rating import RatingTable
+from gog.components.rng import SeedSequence
+from gog.components.search import hint
+from gog.config import constants as con
+from gog.tools.selfplay import MAX_PLIES
+
+
+# Opponent configuration -> biases overriding `DEFAULT_BIASES`
+CONFIGURATIONS = {
+    "default": {},
+    "no-front-bias": {"favour_copies": 0},
+    "strong-front-bias": {"favour_copies": 10},
+    "minimal-high-rank-bias": {"high_rank_share": 1_000},
+    "no-flag-escape": {"flag_escape": 0.0},
+    "always-flag-escape": {"flag_escape": 1.0},
+    "no-forward-bias": {"forward_copies": 0},
+    "no-challenge-bias": {"challenge_copies": 0},
+}
+# User-side player -> nodes searched per move (0 to move at random)
+USER_PLAYERS = {"random-user": 0, "search-user": 64}
+DEFAULT_STATE = "../tournament.npz"
+
+
+def play_game(task: tuple[str, str, int, int]) -> float:
+    """
+    Returns the score (1 for a win, 0.5 for a draw and 0 for a loss) of the opponent configuration
+    in a game against the user-side player of the `task` (the names of both, the root seed and the
+    index of the game).
+    """
+    configuration, user_player, seed, index = task
+    game_seed, user_seed = SeedSequence(seed).child(index).spawn(2)
+    user_rng = user_seed.rng()
+    game = Game(game_seed, CONFIGURATIONS[configuration])
+    game.randomise()
+    game.start()
+    nodes = USER_PLAYERS[user_player]
+    while not game.winner and game.turn < MAX_PLIES:
+        if game.turn % 2:
+            game.opponent_move()
+            continue
+        move = hint(game.board, user_rng, game.final_state, max_nodes=nodes) if nodes else \
+            user_rng.choice(legal_moves(game.board, False))
+        game.move(*move)
+    return 0.5 if not game.winner else float(game.winner == con.OPP_WINNER)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate the opponent configurations.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=64, help="games per round")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--state", default=DEFAULT_STATE, help="file the results are kept in")
+    args = parser.parse_args()
+
+    players = list(CONFIGURATIONS) + list(USER_PLAYERS)
+    table = RatingTable.load(args.state) if os.path.exists(args.state) else RatingTable(players)
+    if table.players != players:
+        parser.error(f"'{args.state}' rates other players")
+    # Only games between an opponent configuration and a user-side player can be played
+    allowed = np.zeros((len(players), len(players)), dtype=bool)
+    allowed[:len(CONFIGURATIONS), len(CONFIGURATIONS):] = True
+
+    with Pool(args.workers) as pool:
+        for _ in range(args.rounds):
+            pairs = table.schedule(args.batch, allowed)
+            # Games are numbered by how many were played before, so every game has its own seed
+            played = int(table.games.sum()) // 2
+            tasks = [
+                (players[first], players[second], args.seed, played + index)
+                for index, (first, second) in enumerate(pairs)
+            ]
+            scores = pool.map(play_game, tasks)
+            first, second = zip(*pairs)
+            table.add_results(np.array(first), np.array(second), np.array(scores))
+            table.fit()
+            table.save(args.state)
+            print(f"{played + len(pairs)} games played, widest interval "
+                  f"{table.intervals().max():.0f}", file=sys.stderr)
+
+    json.dump(table.report(), sys.stdout, indent=2)
+    print()
@@ -0,0 +1,82 @@
+"""
+Module containing the training loop of the policy/value model (see `gog.components.model`) on the
+shards of self-play data (see `gog.tools.selfplay`).
+
+Every epoch visits the training shards in a random order, and the positions of each shard (mapped
+into memory, so only the current batch is read) in a random order, taking one step of Adam per
+batch. The last shard is held out (unless there is only one) to report the losses and policy
+accuracy of the model after every epoch, which is then saved to `--output`.
+"""
+import argparse
+import os
+import numpy as np
+from gog.components.features import list_shards, open_shard
+from gog.components.model import HIDDEN, LEARNING_RATE, PolicyValueModel
+from gog.tools.selfplay import DEFAULT_OUTPUT
+
+
+DEFAULT_MODEL = "../model.npz"
+BATCH_SIZE = 256
+
+
+def batches(shards: list[dict[str, np.ndarray]], batch_size: int, rng: np.random.Generator):
+    """
+    Yields the feature planes, moves and results of batches of at most `batch_size` positions
+    covering the positions of `shards` once, in a random order drawn from `rng`.
+    """
+    for shard_index in rng.permutation(len(shards)):
+        shard = shards[shard_index]
+        order = rng.permutation(len(shard["moves"]))
+        for start in range(0, len(order), batch_size):
+            # Sorted, so the batch is read from the memory map in one forward pass
+            indices = np.sort(order[start:start + batch_size])
+            yield shard["planes"][indices], shard["moves"][indices], shard["results"][indices]
+
+
+def validate(model: PolicyValueModel, shard: dict[str, np.ndarray],
+             batch_size: int) -> tuple[float, float, float]:
+    """
+    Returns the mean policy loss, value loss and policy accuracy of `model` over `shard`.
+    """
+    totals, n = np.zeros(3), len(shard["moves"])
+    for start in range(0, n, batch_size):
+        batch = slice(start, start + batch_size)
+        size = len(shard["moves"][batch])
+        totals += size * np.array(
+            model.losses(shard["planes"][batch], shard["moves"][batch], shard["results"][batch])
+        )
+    return tuple(totals / n)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the policy/value model on self-play data.")
+    parser.add_argument("--data", default=DEFAULT_OUTPUT, help="directory of the shards")
+    parser.add_argument("--output", default=DEFAULT_MODEL, help="file the model is saved to")
+    parser.add_argument("--resume", action="store_true", help="continue training the saved model")
+    parser.add_argument("--epochs", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--learning-rate", type=float, default=LEARNING_RATE)
+    parser.add_argument("--hidden", type=int, default=HIDDEN, help="number of hidden units")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    shards = [open_shard(path) for path in list_shards(args.data)]
+    if not shards:
+        parser.error(f"no shards in '{args.data}'")
+    training, held_out = (shards[:-1], shards[-1]) if len(shards) > 1 else (shards, None)
+    model = PolicyValueModel.load(args.output) if args.resume and os.path.exists(args.output) \
+        else PolicyValueModel(args.hidden, args.seed)
+
+    rng = np.random.default_rng(args.seed)
+    for epoch in range(1, args.epochs + 1):
+        losses = np.array([
+            model.train_step(planes, moves, results, args.learning_rate)
+            for planes, moves, results in batches(training, args.batch_size, rng)
+        ])
+        report = f"epoch {epoch}: train policy {losses[:, 0].mean():.3f} " \
+                 f"value {losses[:, 1].mean():.3f}"
+        if held_out is not None:
+            policy, value, accuracy = validate(model, held_out, args.batch_size)
+            report += f", held-out policy {policy:.3f} value {value:.3f} accuracy {accuracy:.1%}"
+        print(report)
+        model.save(args.output)
@@ -0,0 +1,35 @@
+"""
+Module containing the command-line front end of the bulk setup validator (see
+`gog.components.validation`).
+
+Reads one setup per line (placements separated by commas, e.g. `FLG A1, PVT B1, ...`) and writes
+one JSON object per setup with its validity and errors.
+"""
+import argparse
+import json
+import sys
+from gog.components.validation import validate_setups
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate setups in bulk.")
+    parser.add_argument("input", nargs="?", help="file of setups, one per line (default: stdin)")
+    parser.add_argument("--output", help="write the JSON lines to this file")
+    args = parser.parse_args()
+
+    in_fd = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    with in_fd:
+        lines = [line.strip() for line in in_fd if line.strip()]
+    setups = [[placement.strip() for placement in line.split(",")] for line in lines]
+
+    out_fd = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    with out_fd:
+        for setup_id, setup_errors in enumerate(validate_setups(setups)):
+            out_fd.write(json.dumps({
+                "setup": setup_id,
+                "valid": not setup_errors,
+                "errors": [
+                    {"code": code, "entry": entry, "message": message}
+                    for code, entry, message in setup_errors
+                ],
+            }) + "\n")
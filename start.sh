@@ -1,4 +1,4 @@
 #!/bin/bash
 
 cd src/
-python3 -m gog.run
+python3 -m gog.run "$@"